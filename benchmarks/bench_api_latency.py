@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Load test: /api/posts/latest latency while the ingest pipeline is busy.
+
+API requests and ingest share one event loop, as in the app. Each mode is
+measured idle and then with a poller feeding new posts continuously:
+
+- sync sessions: the endpoint and the pipeline's queries run on blocking
+  SQLAlchemy sessions on the loop, as the app did before the async engines
+- async sessions: the real endpoint and pipeline on aiosqlite
+
+Requests arrive at a fixed rate (open loop), and the poller ingests at a
+fixed rate, so both modes carry the same load.
+
+    python benchmarks/bench_api_latency.py [--seconds 5] [--rate 100] [--polls-per-second 10] [--seed-posts 20000]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+# The app's engines are created at import, so point them at a scratch database first
+workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+os.environ["LOCAL_MODEL_PATH"] = ""
+os.environ["ANALYSIS_CACHE_PATH"] = ":memory:"
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+
+from src.database.bulk import insert_posts
+from src.database.connection import close_db, get_async_session, get_db, get_session, init_db
+from src.database.models import MonitoredFigure, Post
+from src.main import app
+from src.pipeline.ingest import IngestPipeline, snapshot_figure
+
+POSTS_PER_POLL = 20
+_post_ids = itertools.count(1)
+
+def fetched_posts():
+    return [
+        {'platform_post_id': f"live-{next(_post_ids)}", 'content': "Live post about rates", 'posted_at': datetime.utcnow()}
+        for _ in range(POSTS_PER_POLL)
+    ]
+
+# The endpoint as it was: a blocking session inside an async handler
+sync_app = FastAPI()
+
+@sync_app.get("/api/posts/latest")
+async def sync_latest_posts(limit: int = 10, db: Session = Depends(get_db)):
+    posts = db.query(Post).order_by(Post.posted_at.desc()).limit(limit).all()
+    return [{"id": post.id, "content": post.content, "author": post.author.name if post.author else None} for post in posts]
+
+class BlockingSession:
+    """AsyncSession stand-in that runs each call synchronously on the loop, as the pipeline's queries used to"""
+
+    def __init__(self):
+        self.db = get_session()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.db.close()
+
+    def add(self, instance):
+        self.db.add(instance)
+
+    async def get(self, *args, **kwargs):
+        return self.db.get(*args, **kwargs)
+
+    async def scalars(self, statement):
+        return self.db.scalars(statement)
+
+    async def execute(self, statement):
+        return self.db.execute(statement)
+
+    async def merge(self, instance):
+        return self.db.merge(instance)
+
+    async def refresh(self, instance):
+        self.db.refresh(instance)
+
+    async def commit(self):
+        self.db.commit()
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.db, *args, **kwargs)
+
+class FakeFetcher:
+    async def fetch_posts(self, platform_id, since_id=None, since=None):
+        return fetched_posts()
+
+    async def fetch_posts_since(self, platform_id, since_id, since=None):
+        return await self.fetch_posts(platform_id), True
+
+class FakeAnalyzer:
+    async def score_post(self, post):
+        return {'market_impact_score': 0.2}
+
+    async def enrich_post(self, post, scored):
+        return {**scored, 'sentiment': {'label': 'neutral', 'score': 0.5}, 'summary': "", 'tags': [], 'context': ""}
+
+class FakeNotifier:
+    async def send_notification(self, alert):
+        pass
+
+async def no_broadcast(update_type, data):
+    pass
+
+def poller(session_factory):
+    async def poll(figure: MonitoredFigure, stop: asyncio.Event, counts: dict, interval: float):
+        """The ingest pipeline, fed one poll per interval"""
+        pipeline = IngestPipeline(FakeFetcher(), FakeAnalyzer(), FakeNotifier(), no_broadcast, session_factory=session_factory)
+        pipeline.start()
+        try:
+            async for _ in ticks(interval, stop):
+                await pipeline.submit(figure)
+        finally:
+            await pipeline.drain()
+            await pipeline.stop()
+            counts['posts'] += pipeline.stages['enrich'].processed
+    return poll
+
+async def ticks(interval: float, stop: asyncio.Event):
+    """Yield every `interval` seconds on a fixed schedule until stopped"""
+    loop = asyncio.get_running_loop()
+    next_at = loop.time()
+    while not stop.is_set():
+        yield
+        next_at += interval
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+
+async def measure(target_app, seconds: float, rate: float, poller=None, figure=None, poll_interval: float = 0.0):
+    latencies, counts = [], {'posts': 0}
+    stop = asyncio.Event()
+
+    async def request(http, scheduled: float):
+        response = await http.get("/api/posts/latest?limit=10")
+        response.raise_for_status()
+        # From when the request was due, so time spent waiting for the loop counts
+        latencies.append(time.perf_counter() - scheduled)
+
+    async with httpx.AsyncClient(app=target_app, base_url="http://bench") as http:
+        background = []
+        if poller is not None:
+            background.append(asyncio.create_task(poller(figure, stop, counts, poll_interval)))
+        requests = []
+        started = time.perf_counter()
+        for i in range(int(seconds * rate)):
+            scheduled = started + i / rate
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            requests.append(asyncio.create_task(request(http, scheduled)))
+        await asyncio.gather(*requests)
+        stop.set()
+        await asyncio.gather(*background)
+
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+    return {
+        "requests_per_second": len(ordered) / seconds,
+        "p50": statistics.median(ordered) * 1000,
+        "p99": pick(0.99),
+        "max": ordered[-1] * 1000,
+        "posts_per_second": counts['posts'] / seconds
+    }
+
+def report(label: str, result: dict):
+    print(f"  {label:6} {result['requests_per_second']:5.0f} req/s   p50 {result['p50']:7.2f} ms"
+          f"   p99 {result['p99']:7.2f} ms   max {result['max']:8.2f} ms   ingest {result['posts_per_second']:6.0f} posts/s")
+
+def seed(count: int) -> MonitoredFigure:
+    init_db()
+    db = get_session()
+    try:
+        figure = MonitoredFigure(name="Bench", title="Benchmark", platform="twitter", platform_id="bench")
+        db.add(figure)
+        db.commit()
+        start = datetime(2025, 1, 1)
+        insert_posts(db, figure, [
+            {'platform_post_id': f"seed-{i}", 'content': f"Seed post {i}", 'posted_at': start + timedelta(minutes=i)}
+            for i in range(count)
+        ])
+        db.commit()
+        return snapshot_figure(figure)
+    finally:
+        db.close()
+
+async def run(args):
+    figure = seed(args.seed_posts)
+    # Full collections over the app's import-time heap stall the loop for ~100 ms in
+    # either mode; keep them out of the comparison
+    gc.collect()
+    gc.freeze()
+    for name, target_app, session_factory in (
+        ("sync sessions", sync_app, BlockingSession),
+        ("async sessions", app, get_async_session)
+    ):
+        print(f"{name}:")
+        report("idle", await measure(target_app, args.seconds, args.rate))
+        with contextlib.redirect_stdout(io.StringIO()):  # the pipeline's per-post progress lines
+            busy = await measure(target_app, args.seconds, args.rate, poller(session_factory), figure, 1 / args.polls_per_second)
+        report("busy", busy)
+    await close_db()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate", type=float, default=100.0, help="API requests per second")
+    parser.add_argument("--polls-per-second", type=float, default=10.0, help=f"polls of {POSTS_PER_POLL} new posts")
+    parser.add_argument("--seed-posts", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: API read latency while the ingest loop is writing.
+
+Seeds a throwaway database, then runs a writer thread inserting and scoring
+posts in small transactions (like the pipeline) while reader threads run the
+/api/posts/latest query. Compares one default engine shared by everyone with
+the pragma-tuned single-writer engine plus read-only pool.
+
+    python benchmarks/bench_db_contention.py [--seconds 5] [--readers 4] [--seed-posts 50000]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from src.config import settings
+from src.database.bulk import insert_posts
+from src.database.connection import create_reader_engine, create_writer_engine
+from src.database.models import Base, MonitoredFigure, Post
+
+def seed(engine, count: int) -> MonitoredFigure:
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    figure = MonitoredFigure(name="Bench", title="Benchmark", platform="twitter", platform_id="bench")
+    db.add(figure)
+    db.commit()
+    start = datetime(2025, 1, 1)
+    insert_posts(db, figure, [
+        {'platform_post_id': f"seed-{i}", 'content': f"Seed post {i} about rates and inflation",
+         'posted_at': start + timedelta(minutes=i)}
+        for i in range(count)
+    ])
+    db.commit()
+    figure = MonitoredFigure(id=figure.id, platform=figure.platform)
+    db.close()
+    return figure
+
+def writer_loop(engine, figure, stop: threading.Event, counts: dict):
+    Session = sessionmaker(bind=engine)
+    i = 0
+    while not stop.is_set():
+        db = Session()
+        try:
+            # One fetched batch: insert, then score each post in its own commit, like the pipeline
+            posts = insert_posts(db, figure, [
+                {'platform_post_id': f"live-{i}-{j}", 'content': f"Live post {i}-{j}", 'posted_at': datetime.utcnow()}
+                for j in range(20)
+            ])
+            db.commit()
+            for post in posts:
+                db.execute(update(Post).where(Post.id == post.id).values(impact_score=0.5))
+                db.commit()
+            counts['rows'] += len(posts)
+        except Exception:
+            counts['errors'] += 1
+            db.rollback()
+        finally:
+            db.close()
+        i += 1
+
+def reader_loop(engine, stop: threading.Event, latencies: list, counts: dict):
+    Session = sessionmaker(bind=engine)
+    while not stop.is_set():
+        started = time.perf_counter()
+        db = Session()
+        try:
+            db.query(Post).filter(Post.impact_score >= 0.3).order_by(Post.posted_at.desc()).limit(10).all()
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            counts['errors'] += 1
+        finally:
+            db.close()
+
+def run(name: str, write_engine, read_engine, figure, seconds: float, readers: int):
+    stop = threading.Event()
+    latencies, counts = [], {'rows': 0, 'errors': 0}
+    threads = [threading.Thread(target=writer_loop, args=(write_engine, figure, stop, counts))]
+    threads += [threading.Thread(target=reader_loop, args=(read_engine, stop, latencies, counts)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+    print(f"{name}:")
+    print(f"  reads   {len(ordered) / seconds:8.0f}/s   p50 {statistics.median(ordered) * 1000:6.2f} ms"
+          f"   p95 {pick(0.95):6.2f} ms   p99 {pick(0.99):6.2f} ms   max {ordered[-1] * 1000:7.2f} ms")
+    print(f"  writes  {counts['rows'] / seconds:8.0f} posts/s   errors {counts['errors']}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seed-posts", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/baseline.db"
+        # The engine as it was: defaults, rollback journal, one pool for reads and writes
+        shared = create_engine(url, connect_args={"check_same_thread": False, "timeout": 20})
+        figure = seed(shared, args.seed_posts)
+        run("default shared engine", shared, shared, figure, args.seconds, args.readers)
+        shared.dispose()
+
+        url = f"sqlite:///{tmp}/tuned.db"
+        writer = create_writer_engine(url, settings.SQLITE_PRAGMAS)
+        reader = create_reader_engine(url, settings.SQLITE_PRAGMAS, pool_size=args.readers)
+        figure = seed(writer, args.seed_posts)
+        run("tuned writer + read-only pool", writer, reader, figure, args.seconds, args.readers)
+        writer.dispose()
+        reader.dispose()
+
+if __name__ == "__main__":
+    main()
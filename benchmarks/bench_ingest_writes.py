@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ingest pipeline throughput (posts/sec) and commits per post.
+
+Runs the real IngestPipeline against a scratch database with an instant
+fetcher and analyzer, so storage is the bottleneck. Every fourth post scores
+above the alert threshold. Pass --synchronous FULL to fsync every commit.
+
+    python benchmarks/bench_ingest_writes.py [--posts 5000] [--posts-per-poll 20] [--synchronous NORMAL]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+workdir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/unused.db"
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config import settings
+from src.database.connection import create_async_writer_engine
+from src.database.models import Alert, Base, MonitoredFigure, Post
+from src.pipeline.ingest import IngestPipeline, snapshot_figure
+
+_post_ids = itertools.count(1)
+
+class FakeFetcher:
+    def __init__(self, posts_per_poll: int):
+        self.posts_per_poll = posts_per_poll
+
+    async def fetch_posts(self, platform_id, since_id=None, since=None):
+        return [
+            {'platform_post_id': str(next(_post_ids)), 'content': "Post about rates", 'posted_at': datetime.utcnow()}
+            for _ in range(self.posts_per_poll)
+        ]
+
+    async def fetch_posts_since(self, platform_id, since_id, since=None):
+        return await self.fetch_posts(platform_id), True
+
+class FakeAnalyzer:
+    async def score_post(self, post):
+        return {'market_impact_score': 0.9 if int(post.platform_post_id) % 4 == 0 else 0.2}
+
+    async def enrich_post(self, post, scored):
+        return {**scored, 'sentiment': {'label': 'neutral', 'score': 0.5}, 'summary': "", 'tags': [], 'context': ""}
+
+class FakeNotifier:
+    async def send_notification(self, alert):
+        pass
+
+async def no_broadcast(update_type, data):
+    pass
+
+async def run(args):
+    pragmas = {**settings.SQLITE_PRAGMAS, "synchronous": args.synchronous}
+    engine = create_async_writer_engine(f"sqlite:///{workdir}/ingest.db", pragmas)
+    commits = {'count': 0}
+    event.listen(engine.sync_engine, "commit", lambda conn: commits.__setitem__('count', commits['count'] + 1))
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async with session_factory() as db:
+        await db.run_sync(lambda session: Base.metadata.create_all(session.connection()))
+        figures = [
+            MonitoredFigure(name=f"Figure {i}", title="", platform="twitter", platform_id=f"figure{i}")
+            for i in range(10)
+        ]
+        db.add_all(figures)
+        await db.commit()
+        figures = [snapshot_figure(figure) for figure in figures]
+    commits['count'] = 0
+
+    pipeline = IngestPipeline(
+        FakeFetcher(args.posts_per_poll), FakeAnalyzer(), FakeNotifier(), no_broadcast, session_factory=session_factory
+    )
+    polls = args.posts // args.posts_per_poll
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # per-post progress lines
+        pipeline.start()
+        for i in range(polls):
+            await pipeline.submit(figures[i % len(figures)])
+        await pipeline.drain()
+        await pipeline.stop()
+    elapsed = time.perf_counter() - started
+
+    async with session_factory() as db:
+        stored = await db.scalar(select(func.count()).select_from(Post))
+        alerts = await db.scalar(select(func.count()).select_from(Alert))
+    await engine.dispose()
+
+    print(f"synchronous={args.synchronous}: {stored} posts, {alerts} alerts in {elapsed:.2f}s")
+    print(f"  {stored / elapsed:8.0f} posts/s   {commits['count']} commits ({commits['count'] / stored:.2f} per post)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--posts-per-poll", type=int, default=20)
+    parser.add_argument("--synchronous", default="NORMAL", help="SQLite synchronous pragma, e.g. NORMAL or FULL")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
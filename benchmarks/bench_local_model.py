@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: scoring posts with the local impact model.
+
+Trains a model on synthetic posts (or loads the one at LOCAL_MODEL_PATH with
+--trained) and times vectorized batch scoring against scoring posts one by one.
+
+    python benchmarks/bench_local_model.py [--trained]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.analyzers.local_model import load_model, train
+
+WORDS = (
+    "the fed rate hike inflation tariffs earnings guidance market stocks bonds today great "
+    "team thanks everyone launch product customers growth economy jobs report china trade"
+).split()
+
+def synthetic_posts(count: int) -> list:
+    return [" ".join(random.choices(WORDS, k=random.randint(15, 45))) for _ in range(count)]
+
+def main():
+    random.seed(0)
+    if "--trained" in sys.argv:
+        model = load_model()
+        if model is None:
+            print("❌ No trained model found at LOCAL_MODEL_PATH")
+            return 1
+    else:
+        posts = synthetic_posts(2000)
+        model = train(posts, [random.random() for _ in posts], epochs=20)
+
+    authors = ["twitter:44196397"] * 5000
+    for size in (1, 16, 256, 5000):
+        posts = synthetic_posts(size)
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            model.score_batch(posts, authors[:size])
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        print(f"batch {size:5d}: {best * 1000:8.2f} ms  ({best / size * 1e6:7.1f} µs/post)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
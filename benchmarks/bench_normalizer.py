@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: decoding and extracting tweets from user-tweets responses.
+
+Compares the original inline extraction (json + strptime + per-tweet debug
+formatting) with src.fetchers.normalizer. Pass paths to recorded response
+bodies to benchmark those; otherwise a large synthetic payload is generated.
+
+    python benchmarks/bench_normalizer.py [recorded.json ...]
+"""
+
+import json
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from src.fetchers.normalizer import decode_json, normalize_tweets, parse_twitter_date
+
+logger = logging.getLogger("bench")
+
+def synthetic_payload(count: int = 5000) -> bytes:
+    """A user-tweets response shaped like ScrapeCreators' GraphQL output"""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    tweets = []
+    for i in range(count):
+        created = (start + timedelta(seconds=random.randint(0, 10_000_000))).strftime('%a %b %d %H:%M:%S %z %Y')
+        legacy = {
+            "full_text": f"Tweet {i} about interest rates, inflation and the economy " * 3,
+            "created_at": created,
+            "favorite_count": random.randint(0, 100000),
+            "retweet_count": random.randint(0, 10000),
+            "reply_count": random.randint(0, 1000),
+            "entities": {"hashtags": [], "urls": [], "user_mentions": []}
+        }
+        tweet = {"rest_id": str(1800000000000000000 + i), "legacy": legacy}
+        if i % 5 == 0:
+            tweet["retweeted_status_result"] = {"result": {"rest_id": str(i), "legacy": dict(legacy)}}
+        tweets.append(tweet)
+    return json.dumps({"success": True, "tweets": tweets}).encode()
+
+def baseline(body: bytes) -> list:
+    """The extraction loop as it was inline in TwitterFetcher.fetch_posts"""
+    data = json.loads(body)
+    logger.debug(f"API Response structure: {data.keys()}")
+    tweets = [t for t in data.get('tweets', []) if t is not None]
+    logger.debug(f"Found {len(tweets)} valid tweets in response")
+    extracted = []
+    for tweet in tweets:
+        tweet_id = tweet.get('rest_id')
+        legacy_data = tweet.get('legacy', {})
+        if 'retweeted_status_result' in tweet and tweet['retweeted_status_result'] and tweet['retweeted_status_result'].get('result'):
+            legacy_data = tweet['retweeted_status_result']['result'].get('legacy', legacy_data)
+        content = legacy_data.get('full_text', '')
+        posted_at_str = legacy_data.get('created_at')
+        if content and tweet_id:
+            posted_at = datetime.strptime(posted_at_str, '%a %b %d %H:%M:%S %z %Y') if posted_at_str else None
+            extracted.append({
+                'platform_post_id': str(tweet_id),
+                'content': content,
+                'posted_at': posted_at,
+                'metrics': {
+                    'likes': legacy_data.get('favorite_count', 0),
+                    'retweets': legacy_data.get('retweet_count', 0),
+                    'replies': legacy_data.get('reply_count', 0)
+                }
+            })
+    return extracted
+
+def optimized(body: bytes) -> list:
+    return normalize_tweets(decode_json(body))
+
+def best_of(fn, body: bytes, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        parse_twitter_date.cache_clear()
+        started = time.perf_counter()
+        fn(body)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 1:
+        bodies = [(path, Path(path).read_bytes()) for path in sys.argv[1:]]
+    else:
+        bodies = [("synthetic (5000 tweets)", synthetic_payload())]
+
+    for name, body in bodies:
+        assert len(baseline(body)) == len(optimized(body))
+        count = len(optimized(body))
+        before = best_of(baseline, body)
+        after = best_of(optimized, body)
+        print(f"{name}: {len(body) / 1e6:.1f} MB, {count} tweets")
+        print(f"  baseline  {before * 1000:8.1f} ms  ({before / count * 1e6:.2f} µs/tweet)")
+        print(f"  optimized {after * 1000:8.1f} ms  ({after / count * 1e6:.2f} µs/tweet)")
+        print(f"  speedup   {before / after:8.2f}x")
+
+if __name__ == "__main__":
+    main()
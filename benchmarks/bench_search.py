@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/posts/search latency on a large corpus.
+
+Builds a synthetic corpus once (reused on later runs with the same --db):
+posts with Zipf-distributed words over a 30k-word vocabulary, a few topic
+words at fixed rates, and analyses for half the posts. Then times each query
+through the real endpoint, after one warm-up request, and reports p50/p99.
+
+    python benchmarks/bench_search.py [--posts 2000000] [--db /tmp/search_bench.db] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = str(Path(__file__).parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+FIGURES = 50
+VOCABULARY = 30000
+WORDS_PER_POST = 25
+# Topic words and the share of posts mentioning each
+TOPICS = {'tariffs': 0.02, 'inflation': 0.05, 'rates': 0.10, 'bitcoin': 0.001, 'powell': 0.01}
+START = datetime(2023, 1, 1)
+SPAN = timedelta(days=3 * 365)
+
+def vocabulary(rng: random.Random):
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 9))))
+    return sorted(words, key=lambda w: rng.random())
+
+def build(path: str, posts: int):
+    from src.database.connection import create_writer_engine
+    from src.database.migrate import upgrade
+
+    engine = create_writer_engine(f"sqlite:///{path}")
+    upgrade(engine)
+    engine.dispose()
+
+    rng = random.Random(7)
+    words = np.array(vocabulary(rng))
+    weights = 1 / np.arange(1, VOCABULARY + 1) ** 1.07
+    weights /= weights.sum()
+    generator = np.random.default_rng(7)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executemany(
+        "INSERT INTO monitored_figures (id, name, title, platform, platform_id) VALUES (?, ?, '', 'twitter', ?)",
+        [(i, f"Figure {i}", f"figure{i}") for i in range(1, FIGURES + 1)]
+    )
+    step = SPAN / posts
+    chunk = 50000
+    started = time.perf_counter()
+    for first in range(0, posts, chunk):
+        count = min(chunk, posts - first)
+        tokens = words[generator.choice(VOCABULARY, size=(count, WORDS_PER_POST), p=weights)]
+        rows, analyses = [], []
+        for i in range(count):
+            post_id = first + i + 1
+            text = list(tokens[i])
+            for topic, share in TOPICS.items():
+                if rng.random() < share:
+                    text[rng.randrange(WORDS_PER_POST)] = topic
+            if rng.random() < 0.01:
+                text[3:5] = ['rate', 'cut']
+            rows.append((post_id, str(post_id), ' '.join(text), rng.randint(1, FIGURES),
+                         (START + step * post_id).isoformat(' '), rng.random(), 'enriched'))
+            if post_id % 2 == 0:
+                analyses.append((post_id, ' '.join(text[:8]), json.dumps(list(text[8:11]))))
+        conn.executemany(
+            "INSERT INTO posts (id, platform, platform_post_id, content, author_id, posted_at, impact_score, status) "
+            "VALUES (?, 'twitter', ?, ?, ?, ?, ?, ?)", rows
+        )
+        conn.executemany("INSERT INTO post_analyses (post_id, summary, tags) VALUES (?, ?, ?)", analyses)
+        conn.commit()
+        print(f"  {first + count:,} posts ({time.perf_counter() - started:.0f}s)", end="\r", flush=True)
+    conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+    print(f"\n  built in {time.perf_counter() - started:.0f}s")
+
+QUERIES = [
+    ("rare word", {"q": "bitcoin"}),
+    ("topic word (2%)", {"q": "tariffs"}),
+    ("topic word (10%)", {"q": "rates"}),
+    ("two words", {"q": "inflation rates"}),
+    ("phrase", {"q": '"rate cut"'}),
+    ("prefix", {"q": "tarif*"}),
+    ("figure", {"q": "rates", "figure_id": 7}),
+    ("date range (1 month)", {"q": "rates", "since": "2024-06-01T00:00:00", "until": "2024-07-01T00:00:00"}),
+    ("since (18 months)", {"q": "rates", "since": "2024-06-15T00:00:00"}),
+    ("page 10", {"q": "tariffs", "offset": 180}),
+    ("common word (most posts)", {"q": "{top}"}),
+]
+
+async def run(args):
+    import httpx
+    from src.database.connection import close_db
+    from src.main import app
+
+    top = sqlite3.connect(args.db).execute("SELECT content FROM posts WHERE id = 1").fetchone()[0]
+    top_word = max(set(top.split()), key=top.split().count)
+    gc.collect()
+    gc.freeze()
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as http:
+        for label, params in QUERIES:
+            params = {k: v.format(top=top_word) if isinstance(v, str) else v for k, v in params.items()}
+            timings = []
+            await http.get("/api/posts/search", params=params)  # warm the page cache
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = await http.get("/api/posts/search", params=params)
+                timings.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            timings.sort()
+            results = len(response.json()["results"])
+            print(f"  {label:26} p50 {statistics.median(timings):7.2f} ms   "
+                  f"p99 {timings[min(len(timings) - 1, int(len(timings) * 0.99))]:7.2f} ms   {results} results")
+    await close_db()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=2000000)
+    parser.add_argument("--db", default=os.path.join(os.environ.get("TMPDIR", "/tmp"), "search_bench.db"))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    os.environ["LOCAL_MODEL_PATH"] = ""
+    os.environ["ANALYSIS_CACHE_PATH"] = ":memory:"
+    if not os.path.exists(args.db):
+        print(f"Building a corpus of {args.posts:,} posts in {args.db}")
+        build(args.db, args.posts)
+    print(f"/api/posts/search over {sqlite3.connect(args.db).execute('SELECT max(id) FROM posts').fetchone()[0]:,} posts:")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
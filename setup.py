@@ -8,6 +8,7 @@ setup(
         "fastapi>=0.115.0",
         "uvicorn>=0.24.0",
         "sqlalchemy>=2.0.0",
+        "aiosqlite>=0.19.0",
         "tweepy>=4.14.0",
         "httpx>=0.26.0",
         "python-dotenv>=1.0.0",
@@ -17,7 +18,9 @@ setup(
         "selenium>=4.15.0",
         "pydantic>=2.0.0",
         "pydantic-settings>=2.0.0",
-        "pandas>=2.0.0"
+        "pandas>=2.0.0",
+        "orjson>=3.9.0",
+        "numpy>=1.24.0"
     ],
     python_requires=">=3.9",
 )
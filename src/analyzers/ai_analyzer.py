@@ -1,10 +1,18 @@
 import json
 import asyncio
+import time
 import httpx
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import google.generativeai as genai
 from .base import BaseAnalyzer
-from ..database.models import Post
+from .batcher import ImpactScoreBatcher
+from .cache import AnalysisCache, content_key
+from .executor import ModelExecutor
+from .local_model import ImpactModel, load_model
+from .neardup import NearDuplicateIndex
+from .prefilter import RelevancePrefilter
+from .router import Deadline, HedgedRouter
+from ..database.models import Post, SCORE_SOURCE_LOCAL, SCORE_SOURCE_MODEL
 from ..config import settings
 
 MARKET_KEYWORDS = [
@@ -12,11 +20,102 @@ MARKET_KEYWORDS = [
     'policy', 'regulation', 'AI', 'technology', 'trade'
 ]
 
+def parse_combined_analysis(text: str) -> Optional[Dict[str, Any]]:
+    """Validate a combined-analysis response, or return None if it doesn't fit the schema"""
+    text = text.strip()
+    if text.startswith('```'):
+        # Tolerate a fenced code block around the JSON
+        text = text.strip('`').removeprefix('json').strip()
+    try:
+        data = json.loads(text)
+        sentiment = data['sentiment']
+        label = str(sentiment['label']).lower()
+        if label not in SENTIMENT_LABELS:
+            return None
+        summary = str(data['summary']).strip()
+        context = str(data['context']).strip()
+        if not summary or not context or not isinstance(data['tags'], list):
+            return None
+        keywords = {k.lower(): k for k in MARKET_KEYWORDS}
+        return {
+            'sentiment': {
+                'label': label,
+                'score': min(max(float(sentiment['score']), 0.0), 1.0)
+            },
+            'summary': summary,
+            'tags': [keywords[str(t).strip().lower()] for t in data['tags'] if str(t).strip().lower() in keywords],
+            'market_impact_score': min(max(float(data['market_impact_score']), 0.0), 1.0),
+            'context': context
+        }
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+def parse_batch_scores(text: str, count: int) -> List[Optional[float]]:
+    """Read a JSON array of scores; a wrong-length or unreadable reply yields all None"""
+    try:
+        values = json.loads(text.strip())
+        if isinstance(values, list) and len(values) == count:
+            return [
+                min(max(float(v), 0.0), 1.0) if isinstance(v, (int, float)) else None
+                for v in values
+            ]
+    except (json.JSONDecodeError, TypeError, ValueError):
+        pass
+    return [None] * count
+
+def _author_key(post: Post) -> str:
+    if post.author is not None:
+        return f"{post.author.platform}:{post.author.platform_id or post.author.name}"
+    return str(post.author_id)
+
+SENTIMENT_LABELS = ('positive', 'negative', 'neutral')
+
+# Shape of the single response requested in combined analysis mode
+COMBINED_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sentiment": {
+            "type": "object",
+            "properties": {
+                "label": {"type": "string", "enum": list(SENTIMENT_LABELS)},
+                "score": {"type": "number", "minimum": 0, "maximum": 1}
+            },
+            "required": ["label", "score"]
+        },
+        "market_impact_score": {"type": "number", "minimum": 0, "maximum": 1},
+        "summary": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string", "enum": MARKET_KEYWORDS}},
+        "context": {"type": "string"}
+    },
+    "required": ["sentiment", "market_impact_score", "summary", "tags", "context"]
+}
+
+# Keys of a complete analysis, as opposed to a first-phase score
+ANALYSIS_FIELDS = ('sentiment', 'summary', 'tags', 'market_impact_score', 'context')
+
+def is_complete(analysis: Dict[str, Any]) -> bool:
+    """Whether an analysis has every field or still needs enriching"""
+    return all(name in analysis for name in ANALYSIS_FIELDS)
+
+# Remote model calls made per post in each analysis mode
+MODEL_CALLS_PER_MODE = {'combined': 1, 'per_field': 5}
+
+# Impact score used when neither Nemotron nor a local model can give one
+NEUTRAL_IMPACT_SCORE = 0.5
+
 class AIAnalyzer(BaseAnalyzer):
-    def __init__(self):
+    def __init__(self, cache: Optional[AnalysisCache] = None, local_model: Optional[ImpactModel] = None):
         # Initialize Gemini API
         genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.gemini_model = genai.GenerativeModel('gemini-pro')
+        self.gemini_model_name = 'gemini-pro'
+        self.gemini_model = genai.GenerativeModel(self.gemini_model_name)
+        
+        # The Gemini SDK blocks, so its calls get their own capped threads and deadlines
+        self.model_executor = ModelExecutor(
+            settings.MODEL_EXECUTOR_THREADS,
+            settings.MODEL_CONCURRENCY,
+            settings.MODEL_CALL_TIMEOUT_SECONDS
+        )
         
         # Initialize Nemotron API client
         self.nemotron_client = httpx.AsyncClient(
@@ -28,16 +127,258 @@ class AIAnalyzer(BaseAnalyzer):
             timeout=30.0  # 30 second timeout
         )
         self.nemotron_model = "nvidia/llama-3.1-nemotron-70b-instruct"
+        
+        # Plainly irrelevant posts are scored locally without a model call
+        self.prefilter = RelevancePrefilter(MARKET_KEYWORDS)
+        
+        # Identical statements from the same author get the same analysis
+        self.cache = cache if cache is not None else AnalysisCache()
+        # Lightly edited reposts and copy-paste statements reuse an earlier analysis
+        self.near_duplicates = NearDuplicateIndex()
+        
+        # Trained offline from stored scores; stands in when Nemotron is slow or down
+        self.local_model = local_model if local_model is not None else load_model()
+        self.local_model_stats = {'posts': 0, 'seconds': 0.0}
+        
+        # Impact scores go to Nemotron first, hedged to a secondary when it runs long
+        secondary, secondary_batch = {
+            'local': (self._local_score, self._local_score_batch),
+            'gemini': (self._gemini_score, self._gemini_score_batch),
+            'none': (None, None)
+        }[settings.IMPACT_HEDGE_SECONDARY]
+        # Whether a hedged answer from the secondary is an LLM's judgement
+        self.secondary_source = SCORE_SOURCE_MODEL if settings.IMPACT_HEDGE_SECONDARY == 'gemini' else SCORE_SOURCE_LOCAL
+        self.impact_router = HedgedRouter(
+            'impact', self._nemotron_score, secondary,
+            settings.IMPACT_DEADLINE_SECONDS,
+            settings.IMPACT_HEDGE_QUANTILE,
+            settings.IMPACT_HEDGE_DEFAULT_DELAY_SECONDS
+        )
+        self.batch_router = HedgedRouter(
+            'impact_batch', self._nemotron_score_batch, secondary_batch,
+            settings.IMPACT_DEADLINE_SECONDS,
+            settings.IMPACT_HEDGE_QUANTILE,
+            settings.IMPACT_HEDGE_DEFAULT_DELAY_SECONDS
+        )
+        
+        self.impact_batcher = ImpactScoreBatcher(
+            self._score_batch,
+            self._score_single,
+            settings.IMPACT_BATCH_MAX_ITEMS,
+            settings.IMPACT_BATCH_MAX_WAIT_MS,
+            settings.IMPACT_DEADLINE_SECONDS
+        )
+        
+        self.mode_stats = {
+            mode: {'posts': 0, 'seconds': 0.0, 'fallbacks': 0}
+            for mode in MODEL_CALLS_PER_MODE
+        }
+
+    async def close(self):
+        """Close the Nemotron client and stop the model threads"""
+        await self.nemotron_client.aclose()
+        self.model_executor.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        """Analysis cache hit rates and savings, and latency per analysis mode"""
+        modes = {}
+        for mode, counts in self.mode_stats.items():
+            modes[mode] = {
+                'posts': counts['posts'],
+                'fallbacks': counts['fallbacks'],
+                'model_calls': counts['posts'] * MODEL_CALLS_PER_MODE[mode],
+                'avg_seconds': round(counts['seconds'] / counts['posts'], 3) if counts['posts'] else None
+            }
+        return {
+            "mode": settings.ANALYSIS_MODE,
+            "cache": self.cache.stats(),
+            "near_duplicates": self.near_duplicates.stats(),
+            "modes": modes,
+            "impact_batching": self.impact_batcher.stats(),
+            "model_executor": self.model_executor.stats(),
+            "routing": {
+                "impact": self.impact_router.stats(),
+                "impact_batch": self.batch_router.stats()
+            },
+            "tiers": self.prefilter.stats(),
+            "local_model": {
+                "loaded": self.local_model is not None,
+                "posts": self.local_model_stats['posts'],
+                "us_per_post": round(self.local_model_stats['seconds'] / self.local_model_stats['posts'] * 1e6, 1)
+                if self.local_model_stats['posts'] else None
+            }
+        }
 
     async def analyze_post(self, post: Post) -> Dict[str, Any]:
-        """Perform comprehensive analysis of a post"""
+        """Perform comprehensive analysis of a post, reusing cached results for repeated content"""
+        key, analysis = self._lookup(post)
+        if analysis is not None:
+            return analysis
+        
+        analysis = await self._analyze_uncached(post)
+        if analysis is not None:
+            self._remember(key, post, analysis)
+            return analysis
+        return self._fallback_analysis(post)
+
+    async def reanalyze_post(self, post: Post, use_cache: bool = False) -> Optional[Dict[str, Any]]:
+        """Analysis for batch jobs: fresh unless `use_cache`, and None rather than a fallback if the models fail"""
+        key = content_key(post.content or "", _author_key(post))
+        if use_cache:
+            key, analysis = self._lookup(post)
+            if analysis is not None:
+                return analysis
+        elif settings.PREFILTER_ENABLED:
+            candidate, relevance, matched = self.prefilter.is_candidate(post.content or "")
+            if not candidate:
+                self.prefilter.record('local')
+                return self._local_analysis(post, relevance, matched)
+            self.prefilter.record('llm')
+        
+        analysis = await self._analyze_uncached(post)
+        if analysis is not None:
+            self._remember(key, post, analysis)
+        return analysis
+
+    async def score_post(self, post: Post) -> Dict[str, Any]:
+        """First phase: just the impact score, or a complete analysis if one needs no model calls"""
+        _, analysis = self._lookup(post)
+        if analysis is not None:
+            return analysis
+        score, source = await self._impact_score(post)
+        return {'market_impact_score': score, 'score_source': source}
+
+    async def enrich_post(self, post: Post, scored: Dict[str, Any]) -> Dict[str, Any]:
+        """Second phase: fill in sentiment, summary, tags and context around a first-phase score"""
+        if is_complete(scored):
+            return scored
+        score, source = scored['market_impact_score'], scored.get('score_source')
+        analysis = await self._analyze_uncached(post, impact_score=score, score_source=source)
+        if analysis is None:
+            return self._fallback_analysis(post, impact_score=score, score_source=source)
+        # The score already alerted on stays authoritative
+        analysis['market_impact_score'] = score
+        analysis['score_source'] = source
+        self._remember(content_key(post.content or "", _author_key(post)), post, analysis)
+        return analysis
+
+    def _lookup(self, post: Post) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Cache key for a post and any analysis available without model calls, recording which tier served it"""
+        key = content_key(post.content or "", _author_key(post))
+        if settings.PREFILTER_ENABLED:
+            candidate, relevance, matched = self.prefilter.is_candidate(post.content or "")
+            if not candidate:
+                self.prefilter.record('local')
+                return key, self._local_analysis(post, relevance, matched)
+        
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.prefilter.record('cache')
+            return key, cached
+        
+        if settings.NEAR_DUPLICATE_ENABLED:
+            match = self.near_duplicates.lookup(post.content or "")
+            if match is not None:
+                self.prefilter.record('near_duplicate')
+                if match.cluster_id is not None:
+                    match.analysis['cluster_id'] = match.cluster_id
+                return key, match.analysis
+        
+        self.prefilter.record('llm')
+        return key, None
+
+    def _remember(self, key: str, post: Post, analysis: Dict[str, Any]):
+        """Cache a fresh model analysis and index it for near-duplicates, starting a cluster at this post"""
+        if post.id is not None:
+            analysis.setdefault('cluster_id', post.id)
+        self.cache.put(key, analysis)
+        if settings.NEAR_DUPLICATE_ENABLED:
+            self.near_duplicates.add(post.content or "", analysis, analysis.get('cluster_id'))
+
+    async def _analyze_uncached(
+        self,
+        post: Post,
+        impact_score: Optional[float] = None,
+        score_source: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Run the model calls for a post, or return None if analysis failed; a known impact score isn't asked for again"""
+        if settings.ANALYSIS_MODE == 'combined':
+            started = time.monotonic()
+            analysis = await self._analyze_combined(post)
+            if analysis is not None:
+                self._record_mode('combined', started)
+                return analysis
+            self.mode_stats['combined']['fallbacks'] += 1
+        
+        started = time.monotonic()
+        analysis = await self._analyze_per_field(post, impact_score, score_source)
+        if analysis is not None:
+            self._record_mode('per_field', started)
+        return analysis
+
+    def _record_mode(self, mode: str, started: float):
+        self.mode_stats[mode]['posts'] += 1
+        self.mode_stats[mode]['seconds'] += time.monotonic() - started
+
+    async def _analyze_combined(self, post: Post) -> Optional[Dict[str, Any]]:
+        """Get sentiment, impact score, summary, tags and context from one schema-constrained call"""
         try:
-            # Run analyses in parallel for better performance
-            sentiment, market_impact = await asyncio.gather(
-                self._analyze_sentiment(post.content),
-                self.get_market_impact_score(post)
+            prompt = f"""Analyze this post by {post.author.name} ({post.author.title}) for its effect on financial markets:
+            {post.content}
+            
+            Respond with only a JSON object matching this JSON schema:
+            {json.dumps(COMBINED_ANALYSIS_SCHEMA)}
+            - sentiment: overall sentiment label and confidence from 0.0 to 1.0
+            - market_impact_score: potential impact on financial markets from 0.0 (no impact) to 1.0 (major impact)
+            - summary: the post in 50 words or less
+            - tags: the relevant market categories
+            - context: relevant context given the author's role, including implications for financial markets"""
+
+            response = await self.nemotron_client.post(
+                "/completions",
+                json={
+                    "model": self.nemotron_model,
+                    "messages": [
+                        {"role": "system", "content": "You are an expert in financial market analysis. You answer only with JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": 0.1,
+                    "max_tokens": 600,
+                    "response_format": {"type": "json_object"},
+                    "nvext": {"guided_json": COMBINED_ANALYSIS_SCHEMA}
+                },
+                timeout=20.0
             )
             
+            if response.status_code == 200:
+                result = response.json()
+                analysis = parse_combined_analysis(result['choices'][0]['message']['content'])
+                if analysis is not None:
+                    analysis['score_source'] = SCORE_SOURCE_MODEL
+                return analysis
+            return None
+        except Exception as e:
+            print(f"Error in combined analysis: {e}")
+            return None
+
+    async def _analyze_per_field(
+        self,
+        post: Post,
+        impact_score: Optional[float] = None,
+        score_source: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Run a separate model call for each part of the analysis"""
+        try:
+            if impact_score is not None:
+                sentiment = await self._analyze_sentiment(post.content)
+                market_impact = impact_score
+            else:
+                # Run analyses in parallel for better performance
+                sentiment, (market_impact, score_source) = await asyncio.gather(
+                    self._analyze_sentiment(post.content),
+                    self._impact_score(post)
+                )
+            
             # Generate summary and tags (these use Gemini API)
             summary = await self._generate_summary(post.content)
             tags = await self.extract_tags(post)
@@ -48,28 +389,100 @@ class AIAnalyzer(BaseAnalyzer):
                 'summary': summary,
                 'tags': tags,
                 'market_impact_score': market_impact,
+                'score_source': score_source,
                 'context': context
             }
         except Exception as e:
             print(f"Error analyzing post: {e}")
-            return {
-                'sentiment': {'label': 'neutral', 'score': 0.5},
-                'summary': post.content[:100] + "..." if post.content else "",
-                'tags': [],
-                'market_impact_score': 0.5,
-                'context': f"Post by {post.author.name} on {post.posted_at}" if post.author else ""
-            }
+            return None
+
+    def _local_analysis(self, post: Post, relevance: float, matched: set) -> Dict[str, Any]:
+        """Analysis for a post the pre-filter judged irrelevant to markets"""
+        analysis = self._fallback_analysis(post, impact_score=round(relevance, 3))
+        analysis['tags'] = [k for k in MARKET_KEYWORDS if k.lower() in matched]
+        return analysis
+
+    def _fallback_analysis(
+        self,
+        post: Post,
+        impact_score: Optional[float] = None,
+        score_source: Optional[str] = SCORE_SOURCE_LOCAL
+    ) -> Dict[str, Any]:
+        """Neutral analysis used when the models can't be reached, scored by the local model if there is one"""
+        if impact_score is None:
+            impact_score, score_source = self._local_scores([post])[0], SCORE_SOURCE_LOCAL
+        return {
+            'sentiment': {'label': 'neutral', 'score': 0.5},
+            'summary': post.content[:100] + "..." if post.content else "",
+            'tags': [],
+            'market_impact_score': impact_score,
+            'score_source': score_source,
+            'context': f"Post by {post.author.name} on {post.posted_at}" if post.author else ""
+        }
+
+    def _local_scores(self, posts: List[Post]) -> List[float]:
+        """Score posts with the local model in one vectorized pass, or neutrally without one"""
+        if self.local_model is None:
+            return [NEUTRAL_IMPACT_SCORE] * len(posts)
+        started = time.perf_counter()
+        scores = self.local_model.score_batch(
+            [post.content or "" for post in posts],
+            [_author_key(post) for post in posts]
+        )
+        self.local_model_stats['posts'] += len(posts)
+        self.local_model_stats['seconds'] += time.perf_counter() - started
+        return [round(float(score), 3) for score in scores]
 
     async def get_market_impact_score(self, post: Post) -> float:
         """Calculate market impact score based on content and author"""
-        try:
-            # Add author context for better analysis
-            prompt = f"""Analyze the market impact of this post by {post.author.name} ({post.author.title}):
-            {post.content}
-            
-            Rate the potential impact on financial markets from 0.0 (no impact) to 1.0 (major impact).
-            Respond with only a number between 0.0 and 1.0."""
+        score, _ = await self._impact_score(post)
+        return score
+
+    async def _impact_score(self, post: Post) -> Tuple[float, str]:
+        """A post's impact score and its SCORE_SOURCE_*"""
+        if settings.IMPACT_BATCH_MAX_ITEMS > 1:
+            # Concurrent requests are coalesced into multi-item prompts
+            return await self.impact_batcher.score(post)
+        return await self._score_single(post)
+
+    def _route_source(self, route: str) -> str:
+        return SCORE_SOURCE_MODEL if route == 'primary' else self.secondary_source
+
+    async def _score_single(self, post: Post, deadline: Optional[Deadline] = None) -> Tuple[float, str]:
+        """Score one post, hedged and within the impact deadline or what's left of `deadline`"""
+        if deadline is not None and deadline.remaining() < self.impact_router.hedge_delay():
+            # Too little time left for a model call to usually answer
+            return self._local_scores([post])[0], SCORE_SOURCE_LOCAL
+        score, route = await self.impact_router.call_route(post, deadline=deadline)
+        if score is None:
+            return self._local_scores([post])[0], SCORE_SOURCE_LOCAL
+        return score, self._route_source(route)
+
+    async def _score_batch(
+        self,
+        posts: List[Post],
+        deadline: Optional[Deadline] = None
+    ) -> List[Optional[Tuple[float, str]]]:
+        """Score several posts, each with its source; None for items the response didn't cover"""
+        scores, route = await self.batch_router.call_route(posts, deadline=deadline)
+        if scores is not None:
+            source = self._route_source(route)
+            return [(score, source) if score is not None else None for score in scores]
+        if self.local_model is not None:
+            # The endpoint is failing; retrying each post against it would only pile on
+            return [(score, SCORE_SOURCE_LOCAL) for score in self._local_scores(posts)]
+        return [None] * len(posts)
 
+    async def _nemotron_score(self, post: Post, deadline: Deadline) -> float:
+        """Score one post with its own Nemotron call; raises if there's no usable answer"""
+        # Add author context for better analysis
+        prompt = f"""Analyze the market impact of this post by {post.author.name} ({post.author.title}):
+        {post.content}
+        
+        Rate the potential impact on financial markets from 0.0 (no impact) to 1.0 (major impact).
+        Respond with only a number between 0.0 and 1.0."""
+
+        try:
             response = await self.nemotron_client.post(
                 "/completions",
                 json={
@@ -81,21 +494,76 @@ class AIAnalyzer(BaseAnalyzer):
                     "temperature": 0.1,
                     "max_tokens": 10
                 },
-                timeout=10.0
+                timeout=min(10.0, deadline.remaining())
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                score_text = result['choices'][0]['message']['content'].strip()
-                try:
-                    score = float(score_text)
-                    return min(max(score, 0.0), 1.0)
-                except ValueError:
-                    return 0.5
-            return 0.5
+            response.raise_for_status()
+            result = response.json()
+            score = float(result['choices'][0]['message']['content'].strip())
+            return min(max(score, 0.0), 1.0)
         except Exception as e:
             print(f"Error getting market impact score: {e}")
-            return 0.5
+            raise
+
+    async def _nemotron_score_batch(self, posts: List[Post], deadline: Deadline) -> List[Optional[float]]:
+        """Score several posts with one Nemotron call; raises if the call fails"""
+        items = "\n".join(
+            f"{i + 1}. {post.author.name} ({post.author.title}): {json.dumps(post.content)}"
+            for i, post in enumerate(posts)
+        )
+        prompt = f"""Analyze the market impact of each of these {len(posts)} posts:
+        {items}
+        
+        Rate the potential impact of each on financial markets from 0.0 (no impact) to 1.0 (major impact).
+        Respond with only a JSON array of {len(posts)} numbers, in the same order as the posts."""
+
+        try:
+            response = await self.nemotron_client.post(
+                "/completions",
+                json={
+                    "model": self.nemotron_model,
+                    "messages": [
+                        {"role": "system", "content": "You are an expert in financial market analysis."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": 0.1,
+                    "max_tokens": 8 * len(posts) + 10
+                },
+                timeout=min(15.0, deadline.remaining())
+            )
+            response.raise_for_status()
+            result = response.json()
+            return parse_batch_scores(result['choices'][0]['message']['content'], len(posts))
+        except Exception as e:
+            print(f"Error getting batched market impact scores: {e}")
+            raise
+
+    async def _gemini_score(self, post: Post, deadline: Deadline) -> float:
+        """Score one post with Gemini, the secondary model"""
+        prompt = f"""Rate the potential impact of this post by {post.author.name} ({post.author.title}) on financial markets
+        from 0.0 (no impact) to 1.0 (major impact). Respond with only the number.
+        Post: {post.content}"""
+        response = await self.model_executor.run(
+            self.gemini_model_name,
+            self.gemini_model.generate_content,
+            prompt,
+            timeout=deadline.remaining()
+        )
+        return min(max(float(response.text.strip()), 0.0), 1.0)
+
+    async def _gemini_score_batch(self, posts: List[Post], deadline: Deadline) -> List[Optional[float]]:
+        scores = await asyncio.gather(*(self._gemini_score(post, deadline) for post in posts), return_exceptions=True)
+        return [score if isinstance(score, float) else None for score in scores]
+
+    async def _local_score(self, post: Post, deadline: Deadline) -> float:
+        """The local model's score as a hedge; raises without a trained model so the primary keeps going"""
+        if self.local_model is None:
+            raise LookupError("no local impact model loaded")
+        return self._local_scores([post])[0]
+
+    async def _local_score_batch(self, posts: List[Post], deadline: Deadline) -> List[Optional[float]]:
+        if self.local_model is None:
+            raise LookupError("no local impact model loaded")
+        return self._local_scores(posts)
 
     async def extract_tags(self, post: Post) -> List[str]:
         """Extract relevant tags from the post content"""
@@ -155,11 +623,15 @@ class AIAnalyzer(BaseAnalyzer):
     async def _async_generate_content(self, prompt: str) -> str:
         """Wrapper for async Gemini API calls"""
         try:
-            response = await asyncio.to_thread(
+            response = await self.model_executor.run(
+                self.gemini_model_name,
                 self.gemini_model.generate_content,
                 prompt
             )
             return response.text if response and response.text else ""
+        except asyncio.TimeoutError:
+            print(f"Gemini call exceeded its {settings.MODEL_CALL_TIMEOUT_SECONDS}s deadline")
+            return ""
         except Exception as e:
             print(f"Error generating content: {e}")
             return ""
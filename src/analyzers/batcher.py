@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from ..database.models import Post
+from .router import Deadline
+
+class ImpactScoreBatcher:
+    """Coalesces concurrent impact-score requests into multi-item model calls.
+
+    A request arriving while nothing is in flight is sent straight away, so a
+    lone post pays no batching delay. Requests arriving while a call is in
+    flight wait up to `max_wait_ms` (or until `max_items` are pending) and then
+    go out together. Results are scattered back to each waiting caller; items
+    the batch response didn't cover (None) are scored one by one, within what
+    is left of the batch's `deadline_seconds`. Results are passed through as
+    they are, e.g. a score with its source.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[Post], Deadline], Awaitable[List[Optional[Any]]]],
+        score_one: Callable[[Post, Deadline], Awaitable[Any]],
+        max_items: int,
+        max_wait_ms: float,
+        deadline_seconds: float
+    ):
+        self.score_batch = score_batch
+        self.score_one = score_one
+        self.max_items = max_items
+        self.max_wait = max_wait_ms / 1000
+        self.deadline_seconds = deadline_seconds
+        self._pending: List[Tuple[Post, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = 0
+
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+
+    async def score(self, post: Post) -> Any:
+        """Queue a post for scoring and wait for its score"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((post, future))
+        if self._in_flight == 0 or len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_items]
+            del self._pending[:self.max_items]
+            self._in_flight += 1
+            asyncio.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[Tuple[Post, asyncio.Future]]):
+        try:
+            posts = [post for post, _ in batch]
+            # One budget covers the batch call and any per-item retries after it
+            deadline = Deadline(self.deadline_seconds)
+            if len(batch) == 1:
+                scores = [await self.score_one(posts[0], deadline)]
+            else:
+                scores = await self.score_batch(posts, deadline)
+                self.batches += 1
+                self.items += len(batch)
+                missing = [i for i, score in enumerate(scores) if score is None]
+                if missing:
+                    self.fallbacks += len(missing)
+                    retried = await asyncio.gather(*(self.score_one(posts[i], deadline) for i in missing))
+                    for i, score in zip(missing, retried):
+                        scores[i] = score
+            for (_, future), score in zip(batch, scores):
+                if not future.done():
+                    future.set_result(score)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Multi-item calls sent and how full they were"""
+        return {
+            "batches": self.batches,
+            "batched_items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "fallbacks": self.fallbacks
+        }
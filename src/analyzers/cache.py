@@ -0,0 +1,151 @@
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from ..config import settings
+
+_URL_RE = re.compile(r'https?://\S+')
+_RETWEET_PREFIX_RE = re.compile(r'^rt @\w+:\s*')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Expired and excess rows are pruned after this many writes
+PRUNE_EVERY_WRITES = 100
+
+def normalize_content(content: str) -> str:
+    """Reduce a post to the text that decides its analysis"""
+    text = content.lower()
+    # Shortened links differ between copies of the same statement
+    text = _URL_RE.sub('', text)
+    text = _RETWEET_PREFIX_RE.sub('', text)
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+def content_key(content: str, author: str) -> str:
+    """Cache key for a post: its normalized content plus who said it"""
+    digest = hashlib.sha256()
+    digest.update(author.encode())
+    digest.update(b'\x00')
+    digest.update(normalize_content(content).encode())
+    return digest.hexdigest()
+
+class AnalysisCache:
+    """Two-tier cache of post analyses: an in-memory LRU in front of a SQLite table with TTL and a row cap"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_rows: Optional[int] = None
+    ):
+        self.path = path if path is not None else settings.ANALYSIS_CACHE_PATH
+        self.memory_size = memory_size if memory_size is not None else settings.ANALYSIS_CACHE_MEMORY_SIZE
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.ANALYSIS_CACHE_TTL_SECONDS
+        self.max_rows = max_rows if max_rows is not None else settings.ANALYSIS_CACHE_MAX_ROWS
+
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=wal")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            "key TEXT PRIMARY KEY, analysis TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_analysis_cache_last_used ON analysis_cache (last_used)")
+        self._conn.commit()
+        self._writes_since_prune = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up an analysis, promoting disk hits into memory"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, analysis = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return copy.deepcopy(analysis)
+                del self._memory[key]
+
+            try:
+                row = self._conn.execute(
+                    "SELECT analysis, created_at FROM analysis_cache WHERE key = ? AND created_at > ?",
+                    (key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE analysis_cache SET last_used = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Analysis cache read failed: {e}")
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+            analysis = json.loads(row[0])
+            self._remember(key, row[1], analysis)
+            self.disk_hits += 1
+            return copy.deepcopy(analysis)
+
+    def put(self, key: str, analysis: Dict[str, Any]):
+        """Store an analysis in both tiers"""
+        now = time.time()
+        try:
+            serialized = json.dumps(analysis)
+        except (TypeError, ValueError) as e:
+            print(f"⚠️ Analysis not cacheable: {e}")
+            return
+        with self._lock:
+            self._remember(key, now, copy.deepcopy(analysis))
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, analysis, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, serialized, now, now)
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= PRUNE_EVERY_WRITES:
+                    self._prune(now)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Analysis cache write failed: {e}")
+
+    def _remember(self, key: str, created_at: float, analysis: Dict[str, Any]):
+        self._memory[key] = (created_at, analysis)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _prune(self, now: float):
+        """Drop expired rows, then the least recently used beyond the row cap"""
+        self._writes_since_prune = 0
+        self._conn.execute("DELETE FROM analysis_cache WHERE created_at <= ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM analysis_cache WHERE key IN ("
+            "SELECT key FROM analysis_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate per tier and the model spend it avoided"""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "dollars_saved": round(hits * settings.ANALYSIS_COST_USD, 4)
+        }
+
+    def close(self):
+        self._conn.close()
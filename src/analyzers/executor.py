@@ -0,0 +1,111 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Latency samples kept per model for the percentiles in stats()
+LATENCY_SAMPLES = 1000
+
+def _summarize(samples: deque) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"avg": None, "p95": None}
+    ordered = sorted(samples)
+    return {
+        "avg": round(sum(ordered) / len(ordered), 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4)
+    }
+
+class _ModelLane:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.slots = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.running = 0
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.queue_wait: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.execution: deque = deque(maxlen=LATENCY_SAMPLES)
+
+class ModelExecutor:
+    """Runs blocking model SDK calls on a dedicated thread pool.
+
+    Each model gets its own concurrency cap, so one slow model can't occupy
+    every thread, and nothing here competes with `asyncio.to_thread` users.
+    Every call has a deadline covering both the wait for a slot and the call
+    itself. A call that overruns is abandoned, but keeps its slot until its
+    thread actually finishes, so the cap always matches the threads in use.
+    """
+
+    def __init__(self, max_workers: int, limits: Dict[str, int], timeout: float):
+        self.max_workers = max_workers
+        self.limits = limits
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-sdk")
+        self._lanes: Dict[str, _ModelLane] = {}
+
+    def _lane(self, model: str) -> _ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            limit = min(self.limits.get(model, self.max_workers), self.max_workers)
+            lane = self._lanes[model] = _ModelLane(limit)
+        return lane
+
+    async def run(self, model: str, fn: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """Run `fn(*args)` under `model`'s cap; raises asyncio.TimeoutError past the deadline"""
+        lane = self._lane(model)
+        deadline = timeout if timeout is not None else self.timeout
+        queued = time.monotonic()
+
+        lane.waiting += 1
+        try:
+            await asyncio.wait_for(lane.slots.acquire(), deadline)
+        except asyncio.TimeoutError:
+            lane.timeouts += 1
+            raise
+        finally:
+            lane.waiting -= 1
+
+        started = time.monotonic()
+        lane.queue_wait.append(started - queued)
+        lane.calls += 1
+        lane.running += 1
+        future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+        def finished(f: asyncio.Future):
+            lane.running -= 1
+            lane.execution.append(time.monotonic() - started)
+            lane.slots.release()
+            if not f.cancelled() and f.exception() is not None:
+                lane.errors += 1
+
+        future.add_done_callback(finished)
+        try:
+            # Shielded so an overrun doesn't release the slot while the thread still runs
+            return await asyncio.wait_for(asyncio.shield(future), max(deadline - (started - queued), 0))
+        except asyncio.TimeoutError:
+            lane.timeouts += 1
+            raise
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-model concurrency, deadline overruns, and queue wait versus execution time"""
+        return {
+            "threads": self.max_workers,
+            "models": {
+                model: {
+                    "limit": lane.limit,
+                    "waiting": lane.waiting,
+                    "running": lane.running,
+                    "calls": lane.calls,
+                    "timeouts": lane.timeouts,
+                    "errors": lane.errors,
+                    "queue_wait_seconds": _summarize(lane.queue_wait),
+                    "execution_seconds": _summarize(lane.execution)
+                }
+                for model, lane in self._lanes.items()
+            }
+        }
@@ -0,0 +1,202 @@
+"""
+Local impact model: hashed n-gram features and logistic regression in NumPy.
+
+Trained offline from the remote LLMs' impact scores stored on posts, and used by
+AIAnalyzer in place of the constant 0.5 when Nemotron is slow or down.
+
+    python -m src.analyzers.local_model train [--output PATH] [--epochs N]
+"""
+
+import argparse
+import re
+import sys
+import time
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .cache import normalize_content
+from ..config import settings
+
+_TOKEN_RE = re.compile(r"[a-z0-9$%&'.]+")
+
+@lru_cache(maxsize=1 << 16)
+def _token_hash(token: str) -> int:
+    return zlib.crc32(token.encode())
+
+def tokenize(content: str) -> List[str]:
+    """Unigrams and bigrams of a post's normalized text"""
+    words = [w.strip(".'") for w in _TOKEN_RE.findall(normalize_content(content))]
+    words = [w for w in words if w]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def hash_features(
+    contents: Sequence[str],
+    authors: Optional[Sequence[str]],
+    n_features: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sparse rows for a batch: (row ids, feature ids, values), each row L2-normalized"""
+    rows, columns, values = [], [], []
+    for i, content in enumerate(contents):
+        tokens = tokenize(content or "")
+        if authors is not None and authors[i]:
+            # Who said it matters as much as what was said
+            tokens.append(f"@author {authors[i]}")
+        ids = {_token_hash(token) % n_features for token in tokens}
+        if not ids:
+            continue
+        rows.extend([i] * len(ids))
+        columns.extend(ids)
+        values.extend([1 / np.sqrt(len(ids))] * len(ids))
+    return (
+        np.asarray(rows, dtype=np.int64),
+        np.asarray(columns, dtype=np.int64),
+        np.asarray(values, dtype=np.float64)
+    )
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-np.clip(z, -30, 30)))
+
+class ImpactModel:
+    """Logistic regression over hashed features; scores a whole batch with one gather and one bincount"""
+
+    def __init__(self, weights: np.ndarray, bias: float):
+        self.weights = weights
+        self.bias = float(bias)
+        self.n_features = len(weights)
+
+    def score_batch(self, contents: Sequence[str], authors: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Impact scores in [0, 1] for each post"""
+        rows, columns, values = hash_features(contents, authors, self.n_features)
+        logits = np.bincount(rows, weights=self.weights[columns] * values, minlength=len(contents))
+        return _sigmoid(logits + self.bias)
+
+    def save(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, weights=self.weights, bias=np.array(self.bias))
+
+    @classmethod
+    def load(cls, path: str) -> "ImpactModel":
+        with np.load(path) as data:
+            return cls(data['weights'], float(data['bias']))
+
+def load_model(path: Optional[str] = None) -> Optional[ImpactModel]:
+    """The trained model at `path`, or None if there isn't a usable one"""
+    path = path if path is not None else settings.LOCAL_MODEL_PATH
+    if not path or not Path(path).exists():
+        return None
+    try:
+        return ImpactModel.load(path)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"⚠️ Could not load local impact model from {path}: {e}")
+        return None
+
+def train(
+    contents: Sequence[str],
+    targets: Sequence[float],
+    authors: Optional[Sequence[str]] = None,
+    n_features: Optional[int] = None,
+    epochs: int = 300,
+    learning_rate: float = 2.0,
+    l2: float = 1e-4
+) -> ImpactModel:
+    """Fit logistic regression to soft labels in [0, 1] with full-batch gradient descent"""
+    n_features = n_features or settings.LOCAL_MODEL_FEATURES
+    y = np.clip(np.asarray(targets, dtype=np.float64), 0.0, 1.0)
+    rows, columns, values = hash_features(contents, authors, n_features)
+    weights = np.zeros(n_features)
+    bias = float(np.log((y.mean() + 1e-6) / (1 - y.mean() + 1e-6)))
+    n = len(y)
+    for _ in range(epochs):
+        logits = np.bincount(rows, weights=weights[columns] * values, minlength=n) + bias
+        residual = _sigmoid(logits) - y
+        gradient = np.bincount(columns, weights=residual[rows] * values, minlength=n_features) / n
+        weights -= learning_rate * (gradient + l2 * weights)
+        bias -= learning_rate * residual.mean()
+    return ImpactModel(weights, bias)
+
+def load_training_data(db, include_unlabelled: bool = False) -> Tuple[List[str], List[float], List[str]]:
+    """Content, stored impact score and author key of every post a remote LLM scored.
+
+    Scores from the pre-filter and from this model are left out, so retraining
+    never fits the model to its own output. `include_unlabelled` adds posts
+    scored before score sources were recorded, except flat 0.5s.
+    """
+    from ..database.models import MonitoredFigure, Post, SCORE_SOURCE_MODEL
+
+    labelled = Post.impact_score_source == SCORE_SOURCE_MODEL
+    if include_unlabelled:
+        # A flat 0.5 is what failed model calls used to return, not a judgement
+        labelled = labelled | (Post.impact_score_source.is_(None) & (Post.impact_score != 0.5))
+    query = (
+        db.query(Post.content, Post.impact_score, MonitoredFigure.platform,
+                 MonitoredFigure.platform_id, MonitoredFigure.name)
+        .join(MonitoredFigure, Post.author_id == MonitoredFigure.id)
+        .filter(Post.impact_score.isnot(None))
+        .filter(labelled)
+    )
+    contents, targets, authors = [], [], []
+    for content, score, platform, platform_id, name in query.yield_per(10000):
+        contents.append(content or "")
+        targets.append(score)
+        authors.append(f"{platform}:{platform_id or name}")
+    return contents, targets, authors
+
+def evaluate(model: ImpactModel, contents, targets, authors) -> Dict[str, Any]:
+    """Mean absolute error and scoring cost over a set of posts"""
+    started = time.perf_counter()
+    predicted = model.score_batch(contents, authors)
+    elapsed = time.perf_counter() - started
+    return {
+        "posts": len(contents),
+        "mae": float(np.mean(np.abs(predicted - np.asarray(targets)))) if contents else None,
+        "us_per_post": elapsed / len(contents) * 1e6 if contents else None
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train the local impact model from stored post scores")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    train_parser = subcommands.add_parser("train", help="fit the model on the posts table")
+    train_parser.add_argument("--output", default=settings.LOCAL_MODEL_PATH)
+    train_parser.add_argument("--features", type=int, default=settings.LOCAL_MODEL_FEATURES)
+    train_parser.add_argument("--epochs", type=int, default=300)
+    train_parser.add_argument("--learning-rate", type=float, default=2.0)
+    train_parser.add_argument("--holdout", type=float, default=0.1, help="fraction of posts kept for evaluation")
+    train_parser.add_argument("--min-posts", type=int, default=50)
+    train_parser.add_argument("--include-unlabelled", action="store_true",
+                              help="also train on posts scored before score sources were recorded")
+    args = parser.parse_args(argv)
+
+    from ..database.connection import get_session
+
+    with get_session() as db:
+        contents, targets, authors = load_training_data(db, args.include_unlabelled)
+    if len(contents) < args.min_posts:
+        print(f"❌ Only {len(contents)} LLM-scored posts; need at least {args.min_posts}")
+        return 1
+
+    order = np.random.default_rng(0).permutation(len(contents))
+    split = int(len(order) * (1 - args.holdout))
+    pick = lambda items, idx: [items[i] for i in idx]
+    train_idx, test_idx = order[:split], order[split:]
+
+    print(f"🧠 Training on {len(train_idx)} posts ({args.features} hashed features)...")
+    started = time.perf_counter()
+    model = train(
+        pick(contents, train_idx), pick(targets, train_idx), pick(authors, train_idx),
+        n_features=args.features, epochs=args.epochs, learning_rate=args.learning_rate
+    )
+    print(f"✅ Trained in {time.perf_counter() - started:.1f}s")
+    for name, idx in (("train", train_idx), ("holdout", test_idx)):
+        result = evaluate(model, pick(contents, idx), pick(targets, idx), pick(authors, idx))
+        if result["posts"]:
+            print(f"   {name}: MAE {result['mae']:.3f} over {result['posts']} posts, {result['us_per_post']:.1f} µs/post")
+
+    model.save(args.output)
+    print(f"💾 Saved model to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from .local_model import tokenize
+from ..config import settings
+
+FINGERPRINT_BITS = 64
+_BIT_POSITIONS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'little')
+
+def simhash(content: str) -> int:
+    """64-bit SimHash of a post's normalized unigrams and bigrams; similar text gives nearby fingerprints"""
+    tokens = tokenize(content)
+    if not tokens:
+        return 0
+    hashes = np.fromiter((_token_hash(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+    bits = (hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(tokens)
+    return int(sum(1 << int(i) for i in np.flatnonzero(votes > 0)))
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+@dataclass
+class NearDuplicate:
+    """An indexed analysis close enough to reuse"""
+    cluster_id: Optional[int]
+    analysis: Dict[str, Any]
+    distance: int
+
+@dataclass
+class _Entry:
+    fingerprint: int
+    cluster_id: Optional[int]
+    analysis: Dict[str, Any]
+    added_at: float
+
+class NearDuplicateIndex:
+    """Recent analyses keyed by SimHash, found again for text within `max_distance` differing bits.
+
+    Fingerprints are split into `max_distance + 1` bands. Two fingerprints that
+    differ in at most `max_distance` bits must agree exactly on at least one
+    band, so a lookup only compares against entries sharing a band. The index
+    holds at most `max_entries` analyses, and none older than `ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        max_distance: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_distance = max_distance if max_distance is not None else settings.NEAR_DUPLICATE_MAX_DISTANCE
+        self.max_entries = max_entries if max_entries is not None else settings.NEAR_DUPLICATE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.NEAR_DUPLICATE_TTL_SECONDS
+        self.clock = clock
+
+        bands = self.max_distance + 1
+        edges = [round(i * FINGERPRINT_BITS / bands) for i in range(bands + 1)]
+        self._bands: List[Tuple[int, int]] = [
+            (start, (1 << (end - start)) - 1) for start, end in zip(edges, edges[1:])
+        ]
+        self._entries: OrderedDict = OrderedDict()
+        self._buckets: Dict[Tuple[int, int], set] = {}
+        self._next_key = 0
+
+        self.lookups = 0
+        self.hits = 0
+        self.evicted = 0
+
+    def _band_keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        return [(i, (fingerprint >> start) & mask) for i, (start, mask) in enumerate(self._bands)]
+
+    def lookup(self, content: str) -> Optional[NearDuplicate]:
+        """The closest indexed analysis within the distance threshold, if any"""
+        self.lookups += 1
+        self._evict()
+        fingerprint = simhash(content)
+        best = None
+        for band_key in self._band_keys(fingerprint):
+            for key in self._buckets.get(band_key, ()):
+                entry = self._entries[key]
+                distance = hamming_distance(fingerprint, entry.fingerprint)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, entry)
+        if best is None:
+            return None
+        self.hits += 1
+        distance, entry = best
+        return NearDuplicate(entry.cluster_id, copy.deepcopy(entry.analysis), distance)
+
+    def add(self, content: str, analysis: Dict[str, Any], cluster_id: Optional[int] = None):
+        """Index an analysis under its post's text"""
+        fingerprint = simhash(content)
+        key = self._next_key
+        self._next_key += 1
+        self._entries[key] = _Entry(fingerprint, cluster_id, copy.deepcopy(analysis), self.clock())
+        for band_key in self._band_keys(fingerprint):
+            self._buckets.setdefault(band_key, set()).add(key)
+        self._evict()
+
+    def _evict(self):
+        """Drop entries past their TTL, then the oldest beyond the size cap"""
+        cutoff = self.clock() - self.ttl_seconds
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.added_at >= cutoff and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+            for band_key in self._band_keys(entry.fingerprint):
+                bucket = self._buckets[band_key]
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+            self.evicted += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and how often new posts matched an earlier one"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else None,
+            "evicted": self.evicted
+        }
@@ -0,0 +1,76 @@
+import math
+import re
+from typing import Any, Dict, Iterable, Tuple
+from ..config import settings
+
+# Market vocabulary beyond the tag keywords, with how strongly each suggests relevance
+RELEVANCE_TERMS = {
+    'rates': 1.0, 'rate hike': 1.5, 'rate cut': 1.5, 'fed': 1.0, 'federal reserve': 1.5,
+    'fomc': 1.5, 'basis points': 1.5, 'bps': 1.0, 'treasury': 1.0, 'bond': 0.8, 'bonds': 0.8,
+    'yield': 0.8, 'yields': 0.8, 'dollar': 0.6, 'currency': 0.8, 'gdp': 1.0, 'jobs report': 1.0,
+    'unemployment': 1.0, 'recession': 1.2, 'tariff': 1.5, 'tariffs': 1.5, 'sanctions': 1.2,
+    'export': 0.6, 'exports': 0.6, 'tax': 0.6, 'taxes': 0.6, 'deficit': 0.8, 'debt': 0.6,
+    'budget': 0.5, 'earnings': 1.2, 'revenue': 1.0, 'guidance': 0.8, 'profit': 0.8,
+    'layoffs': 1.0, 'acquisition': 1.2, 'acquire': 1.0, 'merger': 1.2, 'ipo': 1.2,
+    'shares': 1.0, 'shareholders': 1.0, 'investors': 0.8, 'buyback': 1.2, 'dividend': 1.0,
+    'wall street': 1.0, 'nasdaq': 1.2, 'dow': 0.8, 's&p': 1.2, 'bank': 0.6, 'banks': 0.6,
+    'banking': 0.8, 'crypto': 1.0, 'bitcoin': 1.0, 'oil': 0.8, 'opec': 1.2, 'energy': 0.5,
+    'semiconductor': 1.0, 'chips': 0.6, 'antitrust': 1.0, 'sec': 0.8, 'prices': 0.5,
+    'price': 0.4, 'launch': 0.3, 'product': 0.3, 'deal': 0.4, 'invest': 0.6, 'investment': 0.6
+}
+
+# Cheap structural signals: cashtags, percentages and money amounts
+_PATTERN_WEIGHTS = (
+    (re.compile(r'\$[A-Za-z]{1,5}\b'), 1.5),
+    (re.compile(r'\d+(?:\.\d+)?\s?%'), 0.6),
+    (re.compile(r'\$\d[\d,.]*\s?(?:[kmbt]|million|billion|trillion)?\b', re.IGNORECASE), 0.8)
+)
+
+class RelevancePrefilter:
+    """Local first tier: scores market relevance with one compiled multi-term regex.
+
+    Posts scoring under the threshold get their analysis locally and never
+    reach the remote models.
+    """
+
+    def __init__(self, keywords: Iterable[str] = (), threshold: float = None):
+        self.threshold = threshold if threshold is not None else settings.PREFILTER_THRESHOLD
+        self.weights = {term.lower(): weight for term, weight in RELEVANCE_TERMS.items()}
+        for keyword in keywords:
+            self.weights[keyword.lower()] = max(self.weights.get(keyword.lower(), 0.0), 1.0)
+        # Longest first so multi-word terms win over their prefixes
+        alternation = '|'.join(re.escape(term) for term in sorted(self.weights, key=len, reverse=True))
+        self.pattern = re.compile(rf'(?<!\w)(?:{alternation})(?!\w)', re.IGNORECASE)
+
+        self.tier_counts = {'local': 0, 'cache': 0, 'near_duplicate': 0, 'llm': 0}
+
+    def score(self, text: str) -> Tuple[float, set]:
+        """Relevance in [0, 1] and the distinct terms that matched"""
+        matched = {m.group(0).lower() for m in self.pattern.finditer(text)}
+        total = sum(self.weights[term] for term in matched)
+        for pattern, weight in _PATTERN_WEIGHTS:
+            if pattern.search(text):
+                total += weight
+        return 1 - math.exp(-0.5 * total), matched
+
+    def is_candidate(self, text: str) -> Tuple[bool, float, set]:
+        """Whether a post should go on to the model tier"""
+        score, matched = self.score(text)
+        return score >= self.threshold, score, matched
+
+    def record(self, tier: str):
+        """Count which tier produced a post's analysis"""
+        self.tier_counts[tier] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Share of posts handled by each tier"""
+        total = sum(self.tier_counts.values())
+        return {
+            "threshold": self.threshold,
+            "posts": total,
+            "by_tier": dict(self.tier_counts),
+            "fraction_by_tier": {
+                tier: round(count / total, 4) if total else None
+                for tier, count in self.tier_counts.items()
+            }
+        }
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Primary latencies kept for the hedge delay percentile
+LATENCY_SAMPLES = 500
+# Below this many observed latencies the configured default delay is used
+MIN_LATENCY_SAMPLES = 20
+
+class Deadline:
+    """An overall time budget shared by every model call made for one request"""
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - self.clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+Route = Callable[..., Awaitable[Any]]
+
+class HedgedRouter:
+    """Sends a request to a primary model and hedges to a secondary one when it runs long.
+
+    Routes are coroutines called as `route(*args, deadline)` that return an
+    answer or raise. The secondary is started once the primary has been
+    outstanding for its recent `quantile` latency, or straight away if the
+    primary fails. The first answer wins and the other call is cancelled.
+    Nothing waits past the deadline: `call` then returns None and the caller
+    falls back.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        primary: Route,
+        secondary: Optional[Route],
+        deadline_seconds: float,
+        quantile: float,
+        default_delay: float
+    ):
+        self.name = name
+        self.primary = primary
+        self.secondary = secondary
+        self.deadline_seconds = deadline_seconds
+        self.quantile = quantile
+        self.default_delay = default_delay
+        self.latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+
+        self.calls = 0
+        self.hedges = 0
+        self.failovers = 0
+        self.wins = {'primary': 0, 'secondary': 0}
+        self.failures = {'primary': 0, 'secondary': 0}
+        self.deadline_exceeded = 0
+
+    def hedge_delay(self) -> float:
+        """How long the primary gets before the secondary is started"""
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return self.default_delay
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+
+    async def _timed_primary(self, *args) -> Any:
+        started = time.monotonic()
+        result = await self.primary(*args)
+        self.latencies.append(time.monotonic() - started)
+        return result
+
+    async def call(self, *args, deadline: Optional[Deadline] = None) -> Optional[Any]:
+        """The first answer from either route, or None if both failed or the deadline ran out.
+
+        Pass `deadline` to spend what's left of a budget already started, instead of a fresh one.
+        """
+        answer, _ = await self.call_route(*args, deadline=deadline)
+        return answer
+
+    async def call_route(self, *args, deadline: Optional[Deadline] = None) -> Tuple[Optional[Any], Optional[str]]:
+        """Like `call`, also naming the route that answered: 'primary', 'secondary' or None"""
+        self.calls += 1
+        if deadline is None:
+            deadline = Deadline(self.deadline_seconds)
+        hedge_at = time.monotonic() + self.hedge_delay()
+        routes = {asyncio.create_task(self._timed_primary(*args, deadline)): 'primary'}
+        hedged = self.secondary is None
+        try:
+            while routes:
+                timeout = deadline.remaining()
+                if not hedged:
+                    timeout = min(timeout, max(hedge_at - time.monotonic(), 0.0))
+                done, _ = await asyncio.wait(routes, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    route = routes.pop(task)
+                    if task.exception() is None:
+                        self.wins[route] += 1
+                        return task.result(), route
+                    self.failures[route] += 1
+                if deadline.expired:
+                    self.deadline_exceeded += 1
+                    return None, None
+                if not hedged and (not routes or time.monotonic() >= hedge_at):
+                    hedged = True
+                    if routes:
+                        self.hedges += 1
+                    else:
+                        self.failovers += 1
+                    routes[asyncio.create_task(self.secondary(*args, deadline))] = 'secondary'
+            return None, None
+        finally:
+            # Whichever call lost is no longer needed
+            for task in routes:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """How often the secondary was needed and which route answered"""
+        ordered = sorted(self.latencies)
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "failovers": self.failovers,
+            "wins": dict(self.wins),
+            "failures": dict(self.failures),
+            "deadline_exceeded": self.deadline_exceeded,
+            "hedge_delay_seconds": round(self.hedge_delay(), 3),
+            "primary_p50_seconds": round(ordered[len(ordered) // 2], 3) if ordered else None
+        }
@@ -6,14 +6,19 @@ class Settings(BaseSettings):
     # API Settings
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    LOG_LEVEL: str = "INFO"
       # Database Settings
     DATABASE_URL: str = "sqlite:///./lambda_monitor.db"
-    SQLITE_PRAGMAS: dict = {
+    SQLITE_PRAGMAS: dict = {  # applied to every new connection
         "journal_mode": "wal",
         "cache_size": -64 * 1000,  # 64MB cache
         "foreign_keys": "ON",
-        "synchronous": "NORMAL"
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,  # read through a 256MB memory map
+        "busy_timeout": 5000,  # ms to wait for a lock instead of failing
+        "temp_store": "MEMORY"
     }
+    DB_READ_POOL_SIZE: int = 8  # read-only connections for API queries
     MCP_SERVER_PORT: int = 5000
     MCP_SERVER_HOST: str = "localhost"
     
@@ -29,9 +34,72 @@ class Settings(BaseSettings):
     # AI Model Settings
     NEMOTRON_API_KEY: str = ""
     GEMINI_API_KEY: str = ""
+    ANALYSIS_MODE: str = "combined"  # combined (one structured call) or per_field (five calls)
+    PREFILTER_ENABLED: bool = True
+    PREFILTER_THRESHOLD: float = 0.15  # local relevance below this skips the models
+    IMPACT_BATCH_MAX_ITEMS: int = 16  # posts per batched impact-score call; 1 disables batching
+    IMPACT_BATCH_MAX_WAIT_MS: float = 25.0
+    IMPACT_DEADLINE_SECONDS: float = 10.0  # overall budget for scoring a post or batch
+    IMPACT_HEDGE_SECONDARY: str = "local"  # local, gemini or none
+    IMPACT_HEDGE_QUANTILE: float = 0.95  # hedge once Nemotron runs longer than this share of recent calls
+    IMPACT_HEDGE_DEFAULT_DELAY_SECONDS: float = 2.0  # until enough latencies have been seen
+    ANALYSIS_CACHE_PATH: str = "./analysis_cache.db"
+    ANALYSIS_CACHE_MEMORY_SIZE: int = 10000  # analyses kept in the in-memory tier
+    ANALYSIS_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    ANALYSIS_CACHE_MAX_ROWS: int = 500000
+    ANALYSIS_COST_USD: float = 0.002  # estimated model spend per full post analysis
+    NEAR_DUPLICATE_ENABLED: bool = True  # reuse analyses of recent posts with near-identical text
+    NEAR_DUPLICATE_MAX_DISTANCE: int = 6  # differing SimHash bits (of 64) still counted as the same text
+    NEAR_DUPLICATE_MAX_ENTRIES: int = 20000
+    NEAR_DUPLICATE_TTL_SECONDS: int = 72 * 3600
+    LOCAL_MODEL_PATH: str = "./models/impact_model.npz"  # scores posts when Nemotron can't
+    LOCAL_MODEL_FEATURES: int = 2 ** 18  # hashed n-gram buckets
+    MODEL_EXECUTOR_THREADS: int = 8  # threads dedicated to blocking model SDK calls
+    MODEL_CONCURRENCY: dict = {  # concurrent calls allowed per model
+        "gemini-pro": 4
+    }
+    MODEL_CALL_TIMEOUT_SECONDS: float = 30.0  # deadline per SDK call, including the wait for a slot
       # Notification Settings
     NOTIFICATION_ENABLED: bool = True
     NOTIFICATION_DELAY: int = 30  # seconds
+
+    # Polling Settings
+    POLL_INTERVAL_SECONDS: int = 300  # for figures with no observed posts yet
+    POLL_MIN_INTERVAL_SECONDS: int = 30
+    POLL_MAX_INTERVAL_SECONDS: int = 3600
+    POLL_BURST_INTERVAL_SECONDS: int = 60  # right after a figure posts
+    POLL_CATEGORY_PRIORITY: dict = {  # higher polls more often
+        "political": 2.0,
+        "financial": 2.0,
+        "industry_leader": 1.0
+    }
+    FETCH_CONCURRENCY: int = 8  # figures fetched at once
+    FETCH_MAX_PAGES: int = 10  # pages followed per poll when catching up
+    TWITTER_RATE_LIMIT_PER_SECOND: float = 2.0  # shared across all concurrent fetches
+    TWITTER_RATE_LIMIT_BURST: int = 5
+    FETCH_BACKOFF_BASE_SECONDS: float = 1.0
+    FETCH_BACKOFF_MAX_SECONDS: float = 60.0
+    FETCH_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures before an endpoint is skipped
+    FETCH_BREAKER_RESET_SECONDS: float = 120.0
+    SELENIUM_POOL_SIZE: int = 2  # warm browser sessions (and threads driving them)
+    SELENIUM_IDLE_TIMEOUT_SECONDS: float = 300.0
+    SELENIUM_MAX_PAGES_PER_SESSION: int = 50  # recycle the browser after this many pages
+
+    # Ingest Pipeline Settings
+    PIPELINE_QUEUE_SIZE: int = 100  # max items waiting in front of each stage
+    PIPELINE_STAGE_WORKERS: dict = {
+        "dedupe": 1,
+        "persist": 2,  # waits on a group commit, so a second worker fills the next batch meanwhile
+        "score": 4,
+        "alert": 4,  # likewise; alerts still commit before they are broadcast
+        "fanout": 2,
+        "enrich": 4  # off the alert path; summary, tags and context
+    }
+    ALERT_IMPACT_THRESHOLD: float = 0.7
+    PIPELINE_WRITE_BATCH_SIZE: int = 200  # pipeline writes (posts, scores, alerts, analyses) per transaction
+    PIPELINE_WRITE_MAX_WAIT_MS: float = 10.0  # longest a write waits for others to share its commit
+    SEEN_FILTER_MAX_IDS: int = 100000  # recently stored post IDs kept in memory
+    SEARCH_RANK_WINDOW: int = 2000  # newest matches ranked per search, bounding the cost of common terms
     
     model_config = ConfigDict(
         env_file=".env",
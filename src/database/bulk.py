@@ -0,0 +1,122 @@
+# src/database/bulk.py
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import bindparam, case, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .models import (
+    MonitoredFigure, Post, PostAnalysis, POST_STATUS_ENRICHED, POST_STATUS_PENDING, POST_STATUS_SCORED
+)
+
+# Rows per INSERT statement, well under SQLite's bound-parameter limit
+INSERT_CHUNK_SIZE = 500
+
+def existing_post_ids(db: Session, platform: str, platform_post_ids: Iterable[str]) -> Set[str]:
+    """Return which of the given platform post IDs are already stored, in one query per chunk"""
+    ids = list(set(platform_post_ids))
+    found = set()
+    for start in range(0, len(ids), INSERT_CHUNK_SIZE):
+        chunk = ids[start:start + INSERT_CHUNK_SIZE]
+        found.update(db.execute(
+            select(Post.platform_post_id)
+            .where(Post.platform == platform)
+            .where(Post.platform_post_id.in_(chunk))
+        ).scalars())
+    return found
+
+def insert_posts(db: Session, figure: MonitoredFigure, posts: List[Dict[str, Any]]) -> List[Post]:
+    """Insert fetched posts, silently skipping ones already stored.
+
+    Posts without a posting date are skipped with a warning rather than failing
+    the whole insert. Does not commit, so callers can fold the insert into a
+    larger transaction. Returns transient Post objects (with their new IDs) for
+    the rows actually inserted.
+    """
+    captured_at = datetime.utcnow()
+    rows = []
+    seen = set()
+    for post_data in posts:
+        if post_data['platform_post_id'] in seen:
+            continue
+        if post_data.get('posted_at') is None:
+            print(f"⚠️ Skipping post {post_data['platform_post_id']} from {figure.name}: no posting date")
+            continue
+        seen.add(post_data['platform_post_id'])
+        rows.append({
+            'platform': figure.platform,
+            'platform_post_id': post_data['platform_post_id'],
+            'content': post_data['content'],
+            'posted_at': post_data['posted_at'],
+            'captured_at': captured_at,
+            'author_id': figure.id
+        })
+
+    inserted = []
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + INSERT_CHUNK_SIZE]
+        stmt = (
+            sqlite_insert(Post)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=['platform', 'platform_post_id'])
+            .returning(Post.id, Post.platform_post_id)
+        )
+        ids = {platform_post_id: post_id for post_id, platform_post_id in db.execute(stmt)}
+        inserted.extend(
+            Post(id=ids[row['platform_post_id']], **row)
+            for row in chunk if row['platform_post_id'] in ids
+        )
+    return inserted
+
+def save_analyses(db: Session, analyses: List[Tuple[int, Dict[str, Any]]]):
+    """Upsert the analyses of several posts, mark those posts enriched and link them to their clusters.
+
+    Does not commit. A post analyzed twice keeps only its latest analysis.
+    """
+    created_at = datetime.utcnow()
+    latest = {}
+    clusters = {}
+    for post_id, analysis in analyses:
+        clusters[post_id] = analysis.get('cluster_id')
+        sentiment = analysis.get('sentiment') or {}
+        latest[post_id] = {
+            'post_id': post_id,
+            'summary': analysis.get('summary'),
+            'context': analysis.get('context'),
+            'tags': json.dumps(analysis.get('tags') or []),
+            'sentiment_label': sentiment.get('label'),
+            'sentiment_score': sentiment.get('score'),
+            'created_at': created_at
+        }
+    rows = list(latest.values())
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + INSERT_CHUNK_SIZE]
+        stmt = sqlite_insert(PostAnalysis).values(chunk)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=['post_id'],
+            set_={name: stmt.excluded[name] for name in chunk[0] if name != 'post_id'}
+        ))
+        db.execute(update(Post), [
+            {'id': row['post_id'], 'status': POST_STATUS_ENRICHED, 'cluster_id': clusters[row['post_id']]}
+            for row in chunk
+        ])
+
+def save_scores(db: Session, scores: List[Tuple[int, float, Optional[str]]]):
+    """Set the impact score and its source of several posts and mark pending ones scored, in one executemany.
+
+    Rows are (post id, score, SCORE_SOURCE_*). Posts already enriched keep their status. Does not commit.
+    """
+    if not scores:
+        return
+    posts = Post.__table__
+    db.execute(
+        update(posts)
+        .where(posts.c.id == bindparam('b_id'))
+        .values(
+            impact_score=bindparam('b_score'),
+            impact_score_source=bindparam('b_source'),
+            status=case((posts.c.status == POST_STATUS_PENDING, POST_STATUS_SCORED), else_=posts.c.status)
+        ),
+        [{'b_id': post_id, 'b_score': score, 'b_source': source} for post_id, score, source in scores]
+    )
@@ -1,19 +1,136 @@
 # src/database/connection.py
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from ..config import settings
 import asyncio
 
-# Create engine with proper SQLite configuration
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={
-        "check_same_thread": False,
-        "timeout": 20
-    },
-    pool_pre_ping=True,
-    echo=False  # Set to True for debugging SQL queries
+# Pragmas that change the database file rather than the connection; only the writer sets them
+WRITER_ONLY_PRAGMAS = {"journal_mode"}
+
+def is_memory_url(url: str) -> bool:
+    """Whether a SQLite URL names a private in-memory database"""
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+def apply_pragmas(dbapi_connection, pragmas: Dict[str, Any]):
+    """Run PRAGMA statements on a raw DB-API connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def _on_connect(engine: Engine, pragmas: Dict[str, Any]):
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+def create_writer_engine(url: str, pragmas: Optional[Dict[str, Any]] = None, echo: bool = False) -> Engine:
+    """Engine with a single connection, so the process has exactly one SQLite writer"""
+    pragmas = settings.SQLITE_PRAGMAS if pragmas is None else pragmas
+    engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": 20
+        },
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        echo=echo  # Set to True for debugging SQL queries
+    )
+    _on_connect(engine, pragmas)
+    return engine
+
+def create_reader_engine(
+    url: str,
+    pragmas: Optional[Dict[str, Any]] = None,
+    pool_size: Optional[int] = None,
+    echo: bool = False
+) -> Engine:
+    """Pooled engine whose connections refuse writes, for API queries that run alongside ingest"""
+    pragmas = settings.SQLITE_PRAGMAS if pragmas is None else pragmas
+    pool_size = pool_size if pool_size is not None else settings.DB_READ_POOL_SIZE
+    engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": 20
+        },
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        echo=echo
+    )
+    reader_pragmas = {name: value for name, value in pragmas.items() if name not in WRITER_ONLY_PRAGMAS}
+    reader_pragmas["query_only"] = "ON"
+    _on_connect(engine, reader_pragmas)
+    return engine
+
+def async_url(url: str) -> str:
+    """The aiosqlite form of a SQLite URL"""
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+def create_async_writer_engine(url: str, pragmas: Optional[Dict[str, Any]] = None, echo: bool = False) -> AsyncEngine:
+    """Async counterpart of `create_writer_engine`, for the app's single writer connection"""
+    pragmas = settings.SQLITE_PRAGMAS if pragmas is None else pragmas
+    engine = create_async_engine(
+        async_url(url),
+        connect_args={"timeout": 20},
+        poolclass=AsyncAdaptedQueuePool,  # aiosqlite defaults to opening a connection per checkout
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        echo=echo
+    )
+    _on_connect(engine.sync_engine, pragmas)
+    return engine
+
+def create_async_reader_engine(
+    url: str,
+    pragmas: Optional[Dict[str, Any]] = None,
+    pool_size: Optional[int] = None,
+    echo: bool = False
+) -> AsyncEngine:
+    """Async counterpart of `create_reader_engine`, for API queries"""
+    pragmas = settings.SQLITE_PRAGMAS if pragmas is None else pragmas
+    pool_size = pool_size if pool_size is not None else settings.DB_READ_POOL_SIZE
+    engine = create_async_engine(
+        async_url(url),
+        connect_args={"timeout": 20},
+        poolclass=AsyncAdaptedQueuePool,  # aiosqlite defaults to opening a connection per checkout
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=30,
+        pool_pre_ping=True,
+        echo=echo
+    )
+    reader_pragmas = {name: value for name, value in pragmas.items() if name not in WRITER_ONLY_PRAGMAS}
+    reader_pragmas["query_only"] = "ON"
+    _on_connect(engine.sync_engine, reader_pragmas)
+    return engine
+
+# Jobs, scripts and migrations use the synchronous engines
+engine = create_writer_engine(settings.DATABASE_URL)
+# An in-memory database only exists on its own connection, so it can't be split
+read_engine = engine if is_memory_url(settings.DATABASE_URL) else create_reader_engine(settings.DATABASE_URL)
+
+# The app's event loop uses the async engines: the ingest pipeline writes through
+# `async_engine`, API requests read through `async_read_engine`
+async_engine = create_async_writer_engine(settings.DATABASE_URL)
+async_read_engine = (
+    async_engine if is_memory_url(settings.DATABASE_URL)
+    else create_async_reader_engine(settings.DATABASE_URL)
 )
 
 # Provide engine accessor for modules that need the raw engine
@@ -21,33 +138,54 @@ def get_engine():
     """Return the SQLAlchemy engine instance."""
     return engine
 
-# Create session factory
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+# Objects stay readable after commit: async sessions can't lazily reload them
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 # Create declarative base
 Base = declarative_base()
 
 def get_db():
-    """Get database session - synchronous version"""
-    db = SessionLocal()
+    """Get a read-only database session - synchronous version"""
+    db = ReadSessionLocal()
     try:
         yield db
     finally:
         db.close()
 
 async def get_db_async():
-    """Get database session - asynchronous version"""
-    db = SessionLocal()
-    try:
+    """Get a read-only database session - asynchronous version, for API endpoints"""
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 def init_db():
-    """Initialize database tables"""
-    from .models import Base
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade the database schema by running pending migrations"""
+    from .migrate import upgrade
+    upgrade(engine)
+
+async def init_db_async():
+    """Run pending migrations on the app's async writer connection"""
+    from .migrate import upgrade_connection
+    async with async_engine.begin() as connection:
+        await connection.run_sync(upgrade_connection)
+
+async def close_db():
+    """Close the async engines' pooled connections; each holds a non-daemon thread open until then"""
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
 
 def get_session() -> Session:
-    """Get a database session directly"""
+    """Get a database session directly, on the writer connection"""
     return SessionLocal()
+
+def get_read_session() -> Session:
+    """Get a read-only database session directly"""
+    return ReadSessionLocal()
+
+def get_async_session() -> AsyncSession:
+    """Get an async database session on the writer connection, for the ingest pipeline"""
+    return AsyncSessionLocal()
@@ -11,7 +11,8 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from src.config import settings
-from src.database.models import Base, MonitoredFigure, Watchlist
+from src.database.migrate import upgrade
+from src.database.models import MonitoredFigure, Watchlist
 
 def init_database():
     """Initialize the database and create all tables"""
@@ -19,12 +20,12 @@ def init_database():
     db_path = Path(settings.DATABASE_URL.replace('sqlite:///', '')).absolute()
     db_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Create engine and create all tables
+    # Create engine and create or upgrade the schema
     engine = create_engine(
         settings.DATABASE_URL,
         connect_args={"check_same_thread": False}
     )
-    Base.metadata.create_all(bind=engine)
+    upgrade(engine)
     
     # Create session
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -13,8 +13,8 @@ project_root = str(Path(__file__).parent)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from src.database.connection import get_engine
-from src.database.models import Base, MonitoredFigure, Watchlist
+from src.database.connection import get_engine, init_db
+from src.database.models import MonitoredFigure, Watchlist
 from sqlalchemy.orm import sessionmaker
 
 def init_database():
@@ -26,9 +26,9 @@ def init_database():
     db_path = Path(settings.DATABASE_URL.replace('sqlite:///', '')).absolute()
     db_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Create engine and create all tables
+    # Create or upgrade the schema
     engine = get_engine()
-    Base.metadata.create_all(bind=engine)
+    init_db()
     
     print(f"Database created at: {db_path}")
     
@@ -0,0 +1,52 @@
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+
+from .models import POSTS_FTS_TABLE
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+# Schema of databases made by create_all before migrations existed
+BASELINE_REVISION = "0001"
+
+def include_name(name: Optional[str], type_: str, parent_names) -> bool:
+    """Keep the full-text index and its FTS5 shadow tables out of autogenerate comparisons"""
+    return not (type_ == "table" and name is not None and name.startswith(POSTS_FTS_TABLE))
+
+def alembic_config(url: Optional[str] = None) -> Config:
+    """Alembic config pointing at the bundled migrations, independent of the working directory"""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if url:
+        config.set_main_option("sqlalchemy.url", url)
+    return config
+
+def current_revision(engine: Engine) -> Optional[str]:
+    """Revision the database is at, or None if it has never been migrated"""
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def upgrade_connection(connection: Connection, revision: str = "head"):
+    """Bring the database schema up to `revision`, adopting unversioned databases at the baseline"""
+    config = alembic_config()
+    config.attributes["connection"] = connection
+    tables = inspect(connection).get_table_names()
+    if "alembic_version" not in tables and "posts" in tables:
+        print(f"🗂️ Unversioned database found, stamping baseline revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
+def upgrade(engine: Engine, revision: str = "head"):
+    """Run `upgrade_connection` in a transaction on `engine`"""
+    with engine.begin() as connection:
+        upgrade_connection(connection, revision)
+
+def downgrade(engine: Engine, revision: str):
+    """Roll the database schema back to `revision`"""
+    with engine.begin() as connection:
+        config = alembic_config()
+        config.attributes["connection"] = connection
+        command.downgrade(config, revision)
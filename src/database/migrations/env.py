@@ -0,0 +1,41 @@
+from logging.config import fileConfig
+from alembic import context
+
+from src.config import settings
+from src.database.connection import create_writer_engine
+from src.database.migrate import include_name
+from src.database.models import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+target_metadata = Base.metadata
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,  # the FTS5 search index isn't modelled
+        render_as_batch=True  # SQLite can only alter most columns by copying the table
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    # init_db hands over a connection on the app's writer engine; the CLI opens its own
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    engine = create_writer_engine(config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL)
+    try:
+        with engine.connect() as connection:
+            run_migrations(connection)
+    finally:
+        engine.dispose()
+
+if context.is_offline_mode():
+    raise RuntimeError("Offline (--sql) migrations are not supported: upgrades inspect the existing schema")
+
+run_migrations_online()
@@ -0,0 +1,94 @@
+"""Baseline: the schema from before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+Databases created by `Base.metadata.create_all` without an alembic_version
+table are stamped at this revision and upgraded from here.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'monitored_figures',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('platform', sa.String(), nullable=False),
+        sa.Column('platform_id', sa.String(), nullable=False),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'watchlists',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('keywords', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'figure_watchlist',
+        sa.Column('figure_id', sa.Integer(), nullable=True),
+        sa.Column('watchlist_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['figure_id'], ['monitored_figures.id']),
+        sa.ForeignKeyConstraint(['watchlist_id'], ['watchlists.id'])
+    )
+    op.create_table(
+        'posts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('platform_post_id', sa.String(), nullable=False),
+        sa.Column('content', sa.String(), nullable=False),
+        sa.Column('author_id', sa.Integer(), nullable=True),
+        sa.Column('posted_at', sa.DateTime(), nullable=False),
+        sa.Column('captured_at', sa.DateTime(), nullable=True),
+        sa.Column('impact_score', sa.Float(), nullable=True),
+        sa.Column('market_relevance', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['author_id'], ['monitored_figures.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'post_analyses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('post_id', sa.Integer(), nullable=True),
+        sa.Column('summary', sa.String(), nullable=True),
+        sa.Column('context', sa.String(), nullable=True),
+        sa.Column('market_impact_analysis', sa.String(), nullable=True),
+        sa.Column('tags', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'alerts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('post_id', sa.Integer(), nullable=True),
+        sa.Column('alert_type', sa.String(), nullable=False),
+        sa.Column('message', sa.String(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('alerts')
+    op.drop_table('post_analyses')
+    op.drop_table('posts')
+    op.drop_table('figure_watchlist')
+    op.drop_table('watchlists')
+    op.drop_table('monitored_figures')
@@ -0,0 +1,100 @@
+"""Pipeline state: post platforms and statuses, fetch cursors, stored analyses, job checkpoints
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:00:00
+
+These tables and columns were first created by `create_all`, so a database
+stamped at the baseline may already have some of them; each step only runs
+when its column or table is missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    tables = _tables()
+    post_columns = _columns('posts')
+
+    if 'platform' not in post_columns:
+        op.add_column('posts', sa.Column('platform', sa.String(), nullable=False, server_default='twitter'))
+        op.execute(
+            "UPDATE posts SET platform = ("
+            "SELECT monitored_figures.platform FROM monitored_figures WHERE monitored_figures.id = posts.author_id"
+            ") WHERE author_id IN (SELECT id FROM monitored_figures)"
+        )
+    op.create_index('uq_posts_platform_post_id', 'posts', ['platform', 'platform_post_id'], unique=True, if_not_exists=True)
+
+    if 'status' not in post_columns:
+        op.add_column('posts', sa.Column('status', sa.String(), nullable=False, server_default='pending'))
+        # Posts scored before statuses existed were fully handled then; don't re-alert on them at startup
+        op.execute("UPDATE posts SET status = 'enriched' WHERE impact_score IS NOT NULL")
+    op.create_index('ix_posts_status', 'posts', ['status'], if_not_exists=True)
+
+    if 'cluster_id' not in post_columns:
+        op.add_column('posts', sa.Column('cluster_id', sa.Integer(), nullable=True))
+    op.create_index('ix_posts_cluster_id', 'posts', ['cluster_id'], if_not_exists=True)
+
+    analysis_columns = _columns('post_analyses')
+    if 'sentiment_label' not in analysis_columns:
+        op.add_column('post_analyses', sa.Column('sentiment_label', sa.String(), nullable=True))
+    if 'sentiment_score' not in analysis_columns:
+        op.add_column('post_analyses', sa.Column('sentiment_score', sa.Float(), nullable=True))
+    op.create_index('uq_post_analyses_post_id', 'post_analyses', ['post_id'], unique=True, if_not_exists=True)
+
+    if 'fetch_cursors' not in tables:
+        op.create_table(
+            'fetch_cursors',
+            sa.Column('figure_id', sa.Integer(), nullable=False),
+            sa.Column('last_post_id', sa.String(), nullable=True),
+            sa.Column('last_posted_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['figure_id'], ['monitored_figures.id']),
+            sa.PrimaryKeyConstraint('figure_id')
+        )
+
+    if 'job_checkpoints' not in tables:
+        op.create_table(
+            'job_checkpoints',
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('position', sa.String(), nullable=True),
+            sa.Column('processed', sa.Integer(), nullable=True),
+            sa.Column('done', sa.Boolean(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('name')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('job_checkpoints')
+    op.drop_table('fetch_cursors')
+
+    op.drop_index('uq_post_analyses_post_id', table_name='post_analyses')
+    with op.batch_alter_table('post_analyses') as batch_op:
+        batch_op.drop_column('sentiment_score')
+        batch_op.drop_column('sentiment_label')
+
+    op.drop_index('ix_posts_cluster_id', table_name='posts')
+    op.drop_index('ix_posts_status', table_name='posts')
+    op.drop_index('uq_posts_platform_post_id', table_name='posts')
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('cluster_id')
+        batch_op.drop_column('status')
+        batch_op.drop_column('platform')
@@ -0,0 +1,47 @@
+"""Indexes for the API and pipeline queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00
+
+- ix_posts_posted_at: /api/posts/latest, the dashboard and the seen-post
+  filter walk posts newest first; impact_score rides along so the
+  min_impact_score filter is checked without reading the row.
+- ix_posts_status_posted_at: the latest posts in one status, and resuming
+  pending/scored posts. Replaces ix_posts_status.
+- ix_posts_author_id_posted_at: a figure's posts (relationship loads,
+  backfill) and per-figure posting rates for the scheduler.
+- ix_alerts_sent_at, ix_alerts_alert_type_sent_at: /api/alerts with and
+  without its type filter.
+- ix_alerts_post_id: a post's alerts.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_posts_posted_at', 'posts', ['posted_at', 'impact_score'], if_not_exists=True)
+    op.create_index('ix_posts_status_posted_at', 'posts', ['status', 'posted_at'], if_not_exists=True)
+    op.drop_index('ix_posts_status', table_name='posts', if_exists=True)
+    op.create_index('ix_posts_author_id_posted_at', 'posts', ['author_id', 'posted_at'], if_not_exists=True)
+    op.create_index('ix_alerts_sent_at', 'alerts', ['sent_at'], if_not_exists=True)
+    op.create_index('ix_alerts_alert_type_sent_at', 'alerts', ['alert_type', 'sent_at'], if_not_exists=True)
+    op.create_index('ix_alerts_post_id', 'alerts', ['post_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_post_id', table_name='alerts')
+    op.drop_index('ix_alerts_alert_type_sent_at', table_name='alerts')
+    op.drop_index('ix_alerts_sent_at', table_name='alerts')
+    op.drop_index('ix_posts_author_id_posted_at', table_name='posts')
+    op.create_index('ix_posts_status', 'posts', ['status'])
+    op.drop_index('ix_posts_status_posted_at', table_name='posts')
+    op.drop_index('ix_posts_posted_at', table_name='posts')
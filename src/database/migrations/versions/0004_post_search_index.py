@@ -0,0 +1,66 @@
+"""Full-text search index over posts and their analyses
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:00:00
+
+posts_fts is an FTS5 table with one row per post (rowid = posts.id) holding
+the post's content, its analysis summary and tags, and filter tokens for its
+figure and posted_at year and month. Triggers on posts and post_analyses
+keep it in sync, so every write path is covered. Existing posts are indexed
+once on upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGGERS = {
+    'posts_fts_insert': "AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts (rowid, content, filters) VALUES (new.id, new.content, "
+    "coalesce('figure' || new.author_id || ' ', '') || strftime('year%Y month%Y%m', new.posted_at)); END",
+    'posts_fts_update': "AFTER UPDATE OF content, author_id, posted_at ON posts BEGIN "
+    "UPDATE posts_fts SET content = new.content, "
+    "filters = coalesce('figure' || new.author_id || ' ', '') || strftime('year%Y month%Y%m', new.posted_at) "
+    "WHERE rowid = new.id; END",
+    'posts_fts_delete': "AFTER DELETE ON posts BEGIN "
+    "DELETE FROM posts_fts WHERE rowid = old.id; END",
+    'post_analyses_fts_insert': "AFTER INSERT ON post_analyses BEGIN "
+    "UPDATE posts_fts SET summary = new.summary, tags = new.tags WHERE rowid = new.post_id; END",
+    'post_analyses_fts_update': "AFTER UPDATE OF summary, tags ON post_analyses BEGIN "
+    "UPDATE posts_fts SET summary = new.summary, tags = new.tags WHERE rowid = new.post_id; END",
+    'post_analyses_fts_delete': "AFTER DELETE ON post_analyses BEGIN "
+    "UPDATE posts_fts SET summary = NULL, tags = NULL WHERE rowid = old.post_id; END",
+}
+
+
+def upgrade() -> None:
+    # Databases created by create_all since this revision already have the index
+    if 'posts_fts' not in sa.inspect(op.get_bind()).get_table_names():
+        op.execute(
+            "CREATE VIRTUAL TABLE posts_fts USING fts5("
+            "content, summary, tags, filters, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        op.execute(
+            "INSERT INTO posts_fts (rowid, content, summary, tags, filters) "
+            "SELECT posts.id, posts.content, post_analyses.summary, post_analyses.tags, "
+            "coalesce('figure' || posts.author_id || ' ', '') || strftime('year%Y month%Y%m', posts.posted_at) "
+            "FROM posts LEFT JOIN post_analyses ON post_analyses.post_id = posts.id"
+        )
+        # Merge the b-tree segments written by the bulk load
+        op.execute("INSERT INTO posts_fts (posts_fts) VALUES ('optimize')")
+    for name, body in TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+def downgrade() -> None:
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS posts_fts")
@@ -0,0 +1,31 @@
+"""Record who produced each post's impact score
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 12:00:00
+
+posts.impact_score_source says whether a score came from a remote LLM or
+from the pre-filter, local model or neutral fallback, so the local model can
+be retrained on LLM judgements only. Scores saved before this revision are
+left NULL, since their source is unknown.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('impact_score_source', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('impact_score_source')
@@ -1,12 +1,21 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, Table, Index, DDL, event
 from sqlalchemy.orm import relationship, declarative_base
 
+# How far a stored post has got through analysis
+POST_STATUS_PENDING = 'pending'  # stored, not yet scored
+POST_STATUS_SCORED = 'scored'  # impact score saved, enrichment outstanding
+POST_STATUS_ENRICHED = 'enriched'  # full analysis saved in post_analyses
+
+# Who produced a post's impact score
+SCORE_SOURCE_MODEL = 'model'  # a remote LLM
+SCORE_SOURCE_LOCAL = 'local'  # the pre-filter, the local model or the neutral fallback
+
 # Create the declarative base
 Base = declarative_base()
 
 # Make sure the base class is available at the module level
-__all__ = ['Base', 'MonitoredFigure', 'Post', 'PostAnalysis', 'Alert', 'Watchlist']
+__all__ = ['Base', 'MonitoredFigure', 'Post', 'PostAnalysis', 'Alert', 'Watchlist', 'FetchCursor', 'JobCheckpoint']
 
 # Association tables
 figure_watchlist = Table(
@@ -29,22 +38,35 @@ class MonitoredFigure(Base):
     
     posts = relationship("Post", back_populates="author")
     watchlists = relationship("Watchlist", secondary=figure_watchlist, back_populates="figures")
+    fetch_cursor = relationship("FetchCursor", back_populates="figure", uselist=False)
 
 class Post(Base):
     __tablename__ = 'posts'
     
     id = Column(Integer, primary_key=True)
+    platform = Column(String, nullable=False, default='twitter')  # copied from the author
     platform_post_id = Column(String, nullable=False)
     content = Column(String, nullable=False)
     author_id = Column(Integer, ForeignKey('monitored_figures.id'))
     posted_at = Column(DateTime, nullable=False)
     captured_at = Column(DateTime, default=datetime.utcnow)
     impact_score = Column(Float)
+    impact_score_source = Column(String)  # SCORE_SOURCE_*; NULL for scores saved before it was recorded
     market_relevance = Column(Float)
+    status = Column(String, nullable=False, default=POST_STATUS_PENDING)
+    cluster_id = Column(Integer)  # first analyzed post with near-identical text
     
     author = relationship("MonitoredFigure", back_populates="posts")
     analysis = relationship("PostAnalysis", back_populates="post", uselist=False)
     alerts = relationship("Alert", back_populates="post")
+    
+    __table_args__ = (
+        Index('uq_posts_platform_post_id', 'platform', 'platform_post_id', unique=True),
+        Index('ix_posts_posted_at', 'posted_at', 'impact_score'),  # latest posts, optionally above an impact score
+        Index('ix_posts_status_posted_at', 'status', 'posted_at'),  # latest posts by status, resuming unfinished work
+        Index('ix_posts_author_id_posted_at', 'author_id', 'posted_at'),  # a figure's posts, posting rates
+        Index('ix_posts_cluster_id', 'cluster_id'),
+    )
 
 class PostAnalysis(Base):
     __tablename__ = 'post_analyses'
@@ -55,9 +77,15 @@ class PostAnalysis(Base):
     context = Column(String)
     market_impact_analysis = Column(String)
     tags = Column(String)  # JSON string of tags
+    sentiment_label = Column(String)
+    sentiment_score = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     post = relationship("Post", back_populates="analysis")
+    
+    __table_args__ = (
+        Index('uq_post_analyses_post_id', 'post_id', unique=True),
+    )
 
 class Alert(Base):
     __tablename__ = 'alerts'
@@ -69,6 +97,12 @@ class Alert(Base):
     sent_at = Column(DateTime, default=datetime.utcnow)
     
     post = relationship("Post", back_populates="alerts")
+    
+    __table_args__ = (
+        Index('ix_alerts_sent_at', 'sent_at'),  # recent alerts
+        Index('ix_alerts_alert_type_sent_at', 'alert_type', 'sent_at'),  # recent alerts of one type
+        Index('ix_alerts_post_id', 'post_id'),
+    )
 
 class Watchlist(Base):
     __tablename__ = 'watchlists'
@@ -80,3 +114,54 @@ class Watchlist(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     figures = relationship("MonitoredFigure", secondary=figure_watchlist, back_populates="watchlists")
+
+class FetchCursor(Base):
+    __tablename__ = 'fetch_cursors'
+    
+    figure_id = Column(Integer, ForeignKey('monitored_figures.id'), primary_key=True)
+    last_post_id = Column(String)  # newest platform_post_id fetched so far
+    last_posted_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    figure = relationship("MonitoredFigure", back_populates="fetch_cursor")
+
+class JobCheckpoint(Base):
+    __tablename__ = 'job_checkpoints'
+    
+    name = Column(String, primary_key=True)  # job name, plus the figure for per-figure progress
+    position = Column(String)  # where to pick up: a post id or a timeline cursor
+    processed = Column(Integer, default=0)
+    done = Column(Boolean, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Full-text index over post text and analyses, one row per post keyed by post id.
+# SQLAlchemy can't model virtual tables, so it is created by DDL and kept in sync
+# by triggers; migration 0004 creates the same for migrated databases. The
+# filters column holds figure<id>, year<YYYY> and month<YYYYMM> tokens so search
+# filters narrow the match inside the index.
+POSTS_FTS_TABLE = 'posts_fts'
+POSTS_FTS_DDL = [
+    # No stemming, so prefix queries match what was typed; prefix indexes keep short prefixes fast
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "content, summary, tags, filters, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts (rowid, content, filters) VALUES (new.id, new.content, "
+    "coalesce('figure' || new.author_id || ' ', '') || strftime('year%Y month%Y%m', new.posted_at)); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF content, author_id, posted_at ON posts BEGIN "
+    "UPDATE posts_fts SET content = new.content, "
+    "filters = coalesce('figure' || new.author_id || ' ', '') || strftime('year%Y month%Y%m', new.posted_at) "
+    "WHERE rowid = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN "
+    "DELETE FROM posts_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS post_analyses_fts_insert AFTER INSERT ON post_analyses BEGIN "
+    "UPDATE posts_fts SET summary = new.summary, tags = new.tags WHERE rowid = new.post_id; END",
+    "CREATE TRIGGER IF NOT EXISTS post_analyses_fts_update AFTER UPDATE OF summary, tags ON post_analyses BEGIN "
+    "UPDATE posts_fts SET summary = new.summary, tags = new.tags WHERE rowid = new.post_id; END",
+    "CREATE TRIGGER IF NOT EXISTS post_analyses_fts_delete AFTER DELETE ON post_analyses BEGIN "
+    "UPDATE posts_fts SET summary = NULL, tags = NULL WHERE rowid = old.post_id; END",
+]
+
+for statement in POSTS_FTS_DDL:
+    # DDL() %-formats its statement
+    event.listen(Base.metadata, 'after_create', DDL(statement.replace('%', '%%')).execute_if(dialect='sqlite'))
+event.listen(Base.metadata, 'before_drop', DDL(f"DROP TABLE IF EXISTS {POSTS_FTS_TABLE}").execute_if(dialect='sqlite'))
@@ -0,0 +1,145 @@
+# src/database/search.py
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, literal_column, select
+from sqlalchemy.orm import Session, selectinload
+
+from ..config import settings
+from .models import POSTS_FTS_TABLE, Post
+
+# The search index as a plain table for building queries; it stays out of Base.metadata
+posts_fts = Table(
+    POSTS_FTS_TABLE,
+    MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('content', String),
+    Column('summary', String),
+    Column('tags', String),
+    Column('filters', String)
+)
+# bm25 weights of the content, summary, tags and filters columns: the post's own words count most
+RANK_WEIGHTS = (1.0, 0.5, 0.5, 0.0)
+
+# A "quoted phrase" or a bare word
+_TERM = re.compile(r'"([^"]*)"?|(\S+)')
+# Bare words in most posts; bm25 gives them no weight, but ranking scans their whole doclist
+STOPWORDS = frozenset((
+    "a an and are as at be but by for from has have he in is it its of on or that the their they this to "
+    "was we were will with you"
+).split())
+
+def match_expression(query: str) -> Optional[str]:
+    """Turn a search box query into an FTS5 MATCH expression, or None if it has nothing to search for.
+
+    Every term must match: "quoted words" as a phrase, a word ending in * as a
+    prefix. Terms are quoted, so FTS5 operators and punctuation in the query
+    are searched for literally rather than parsed. Bare stopwords are dropped
+    unless there is nothing else to search for.
+    """
+    terms, stopwords = [], []
+    for phrase, word in _TERM.findall(query):
+        text, prefix = (phrase, False) if phrase else (word.rstrip('*'), word.endswith('*'))
+        if not re.search(r'\w', text):
+            continue
+        term = '"' + text.replace('"', '""') + '"'
+        term = term + '*' if prefix else term
+        (stopwords if word and not prefix and text.lower() in STOPWORDS else terms).append(term)
+    terms = terms or stopwords
+    return ' AND '.join(terms) if terms else None
+
+def _period_filters(since: datetime, until: datetime) -> List[str]:
+    """Filter tokens for every month from `since` through `until`, using year tokens for whole years"""
+    tokens = []
+    year, month = since.year, since.month
+    while (year, month) <= (until.year, until.month):
+        if month == 1 and (year, 12) <= (until.year, until.month):
+            tokens.append(f'"year{year}"')
+            year += 1
+        else:
+            tokens.append(f'"month{year}{month:02d}"')
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return tokens
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # posted_at is stored as naive UTC
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def search_posts(
+    db: Session,
+    expression: str,
+    figure_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 20,
+    offset: int = 0,
+    window: Optional[int] = None
+) -> Tuple[List[Tuple[Post, float]], bool]:
+    """Posts matching a MATCH expression, best BM25 rank first (lower is better), newest first among equals.
+
+    Only the `window` most recent matches (SEARCH_RANK_WINDOW) are ranked, which
+    bounds the cost of common terms; also returns whether older matches were
+    left out. Filters are applied before the window is taken; `until` is exclusive. Aware bounds are converted to UTC, naive ones
+    are taken as UTC.
+    """
+    window = window or settings.SEARCH_RANK_WINDOW
+    since, until = _naive_utc(since), _naive_utc(until)
+    fts = literal_column(POSTS_FTS_TABLE)
+    ranked = f"{{content summary tags}} : ({expression})"
+    if figure_id is not None:
+        ranked += f' AND filters : "figure{int(figure_id)}"'
+
+    candidates = ranked
+    if since is not None or until is not None:
+        start, end = since, until
+        if start is None or end is None:
+            first, last = db.execute(select(
+                select(func.min(Post.posted_at)).scalar_subquery(),
+                select(func.max(Post.posted_at)).scalar_subquery()
+            )).one()
+            if first is None:
+                return [], False
+            start, end = start or first, end or last
+        if start > end:
+            return [], False
+        candidates += f" AND filters : ({' OR '.join(_period_filters(start, end))})"
+
+    def in_period(query):
+        # Exact posted_at bounds; the filter tokens only narrow the match to whole months
+        if since is None and until is None:
+            return query
+        query = query.join(Post, Post.id == posts_fts.c.rowid)
+        if since is not None:
+            query = query.where(Post.posted_at >= since)
+        if until is not None:
+            query = query.where(Post.posted_at < until)
+        return query
+
+    # The rowid range of the newest `window` matches; FTS5 walks rowids newest first without ranking them
+    matches = in_period(select(posts_fts.c.rowid).where(fts.match(candidates)))
+    newest = matches.order_by(posts_fts.c.rowid.desc()).limit(window).subquery()
+    low, high, count = db.execute(
+        select(func.min(newest.c.rowid), func.max(newest.c.rowid), func.count())
+    ).one()
+    if low is None:
+        return [], False
+    truncated = count == window and db.execute(
+        matches.where(posts_fts.c.rowid < low).limit(1)
+    ).first() is not None
+
+    rank = func.bm25(fts, *RANK_WEIGHTS).label('rank')
+    ranked_ids = in_period(
+        select(posts_fts.c.rowid, rank)
+        .where(fts.match(ranked))
+        .where(posts_fts.c.rowid.between(low, high))
+    )
+    ranks = db.execute(ranked_ids.order_by(rank, posts_fts.c.rowid.desc()).limit(limit).offset(offset)).all()
+    posts = db.scalars(
+        select(Post)
+        .where(Post.id.in_([post_id for post_id, _ in ranks]))
+        .options(selectinload(Post.author), selectinload(Post.analysis))
+    )
+    by_id = {post.id: post for post in posts}
+    return [(by_id[post_id], score) for post_id, score in ranks], truncated
@@ -2,6 +2,9 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 from datetime import datetime
 
+class FetchError(Exception):
+    """A page could not be fetched, as opposed to a page that came back empty"""
+
 class SocialMediaFetcher(ABC):
     """Base class for all social media fetchers"""
     
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+import logging
+
+logger = logging.getLogger(__name__)
+
+def create_chrome_driver():
+    """Start a headless Chrome session"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    return webdriver.Chrome(options=chrome_options)
+
+@dataclass
+class BrowserSession:
+    driver: Any
+    pages: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+class BrowserPool:
+    """A capped pool of warm browser sessions, driven from a dedicated thread pool.
+
+    Every blocking WebDriver call runs on the pool's own threads, so scraping
+    never blocks the event loop. Sessions are leased one fetch at a time, closed
+    by a background reaper once they sit idle too long, and recycled after a
+    number of pages.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        idle_timeout: float,
+        max_pages: int,
+        driver_factory: Callable[[], Any] = create_chrome_driver
+    ):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_pages = max_pages
+        self.driver_factory = driver_factory
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="selenium")
+        self._slots = asyncio.Semaphore(size)
+        self._idle: deque = deque()
+        self._reaper: Optional[asyncio.Task] = None
+        self.in_use = 0
+        self.created = 0
+        self.recycled = 0
+        self.expired = 0
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Lease a session and run `fn(driver, *args)` on the pool's threads"""
+        async with self._slots:
+            session = await self._acquire()
+            self.in_use += 1
+            broken = False
+            try:
+                return await self._in_thread(fn, session.driver, *args)
+            except Exception:
+                broken = True
+                raise
+            finally:
+                self.in_use -= 1
+                await self._release(session, broken)
+
+    async def close(self):
+        """Quit every idle session and stop the threads"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+        while self._idle:
+            await self._quit(self._idle.popleft())
+        self.executor.shutdown(wait=False)
+
+    async def _in_thread(self, fn: Callable[..., Any], *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def _acquire(self) -> BrowserSession:
+        await self._expire_idle()
+        if self._idle:
+            return self._idle.pop()
+        driver = await self._in_thread(self.driver_factory)
+        self.created += 1
+        return BrowserSession(driver)
+
+    async def _release(self, session: BrowserSession, broken: bool):
+        session.pages += 1
+        session.last_used = time.monotonic()
+        if broken or session.pages >= self.max_pages:
+            self.recycled += 1
+            await self._quit(session)
+        else:
+            self._idle.append(session)
+            if self._reaper is None or self._reaper.done():
+                self._reaper = asyncio.create_task(self._reap())
+
+    async def _reap(self):
+        """Quit sessions as they pass the idle timeout, until none are left idle"""
+        while self._idle:
+            await asyncio.sleep(max(self._idle[0].last_used + self.idle_timeout - time.monotonic(), 0))
+            await self._expire_idle()
+
+    async def _expire_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0].last_used <= cutoff:
+            self.expired += 1
+            await self._quit(self._idle.popleft())
+
+    async def _quit(self, session: BrowserSession):
+        try:
+            await self._in_thread(session.driver.quit)
+        except Exception as e:
+            logger.warning(f"Error closing browser session: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "in_use": self.in_use,
+            "created": self.created,
+            "recycled": self.recycled,
+            "expired": self.expired
+        }
@@ -0,0 +1,105 @@
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import orjson
+
+logger = logging.getLogger(__name__)
+
+TWITTER_DATE_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
+}
+
+def decode_json(body: bytes) -> Any:
+    """Decode a raw response body"""
+    return orjson.loads(body)
+
+@lru_cache(maxsize=4096)
+def parse_twitter_date(value: str) -> Optional[datetime]:
+    """Parse Twitter's `created_at` format, e.g. 'Sat Jun 07 10:00:00 +0000 2025'.
+
+    Timestamps from the API are always UTC, so that layout is sliced directly;
+    anything else goes through strptime, then ISO 8601.
+    """
+    if len(value) == 30 and value[19:26] == ' +0000 ':
+        try:
+            return datetime(
+                int(value[26:30]), _MONTHS[value[4:7]], int(value[8:10]),
+                int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                tzinfo=timezone.utc
+            )
+        except (KeyError, ValueError):
+            pass
+    try:
+        return datetime.strptime(value, TWITTER_DATE_FORMAT)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        logger.warning(f"Could not parse datetime string '{value}'")
+        return None
+
+def _normalize_tweet(tweet: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if 'rest_id' in tweet or 'legacy' in tweet:
+        # GraphQL timeline shape
+        tweet_id = tweet.get('rest_id')
+        legacy = tweet.get('legacy') or {}
+        retweeted = tweet.get('retweeted_status_result')
+        if retweeted and retweeted.get('result'):
+            legacy = retweeted['result'].get('legacy', legacy)
+        content = legacy.get('full_text', '')
+        created_at = legacy.get('created_at')
+        metrics = {
+            'likes': legacy.get('favorite_count', 0),
+            'retweets': legacy.get('retweet_count', 0),
+            'replies': legacy.get('reply_count', 0)
+        }
+    else:
+        # Flattened shape
+        tweet_id = tweet.get('id')
+        content = tweet.get('text', '')
+        created_at = tweet.get('created_at')
+        metrics = {
+            'likes': tweet.get('likes', 0),
+            'retweets': tweet.get('retweets', 0),
+            'replies': tweet.get('replies', 0)
+        }
+
+    if not content or not tweet_id:
+        return None
+    return {
+        'platform_post_id': str(tweet_id),
+        'content': content,
+        'posted_at': parse_twitter_date(created_at) if created_at else None,
+        'metrics': metrics
+    }
+
+def normalize_tweets(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Extract posts from a decoded user-tweets response"""
+    debug = logger.isEnabledFor(logging.DEBUG)
+    tweets = data.get('tweets') or []
+    posts = []
+    for tweet in tweets:
+        if tweet is None:
+            continue
+        if not isinstance(tweet, dict):
+            logger.warning(f"Skipping invalid tweet format: {type(tweet)}")
+            continue
+        try:
+            post = _normalize_tweet(tweet)
+        except Exception as e:
+            logger.warning(f"Error parsing tweet {tweet.get('rest_id', 'unknown')}: {e}")
+            continue
+        if post is not None and post['posted_at'] is None:
+            # posts.posted_at is NOT NULL, so nothing downstream could store it
+            logger.warning(f"Skipping tweet {post['platform_post_id']} without a valid created_at")
+        elif post is not None:
+            posts.append(post)
+        elif debug:
+            logger.debug(f"Skipping tweet without id or text: {tweet.get('rest_id', tweet.get('id'))}")
+    if debug:
+        logger.debug(f"Extracted {len(posts)} of {len(tweets)} tweets")
+    return posts
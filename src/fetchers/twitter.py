@@ -1,19 +1,34 @@
 import httpx
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Any
-from selenium import webdriver
+from typing import List, Dict, Any, Optional, Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from .base import SocialMediaFetcher
+from .base import FetchError, SocialMediaFetcher
+from .browser_pool import BrowserPool
+from .normalizer import decode_json, normalize_tweets
+from .ratelimit import TokenBucket, CircuitBreaker, backoff_delay, parse_retry_after
 from ..config import settings
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
+TWEETS_ENDPOINT = "user-tweets"
+PROFILE_ENDPOINT = "user-profile"
+
+def is_newer_post_id(post_id: str, since_id: str) -> bool:
+    """Whether `post_id` was posted after `since_id`; tweet IDs are time-ordered snowflakes"""
+    if post_id.isdigit() and since_id.isdigit():
+        return int(post_id) > int(since_id)
+    return post_id != since_id
+
+def newest_post_id(post_ids: List[str]) -> Optional[str]:
+    """The most recent of a set of tweet IDs"""
+    numeric = [post_id for post_id in post_ids if post_id.isdigit()]
+    return max(numeric, key=int) if numeric else None
+
 class TwitterFetcher(SocialMediaFetcher):
     def __init__(self):
         super().__init__(settings.SCRAPE_CREATORS_API_KEY, None)
@@ -25,143 +40,226 @@ class TwitterFetcher(SocialMediaFetcher):
                 "Content-Type": "application/json"
             }
         )
-        self.retry_delay = 60  # seconds
         self.max_retries = 3
+        # Shared by every concurrent fetch through this fetcher
+        self.rate_limiter = TokenBucket(
+            settings.TWITTER_RATE_LIMIT_PER_SECOND,
+            settings.TWITTER_RATE_LIMIT_BURST
+        )
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.browser_pool = BrowserPool(
+            settings.SELENIUM_POOL_SIZE,
+            settings.SELENIUM_IDLE_TIMEOUT_SECONDS,
+            settings.SELENIUM_MAX_PAGES_PER_SESSION
+        )
+        self.page_size = 20
+        self.max_pages = settings.FETCH_MAX_PAGES
+
+    async def close(self):
+        """Close the HTTP client and any pooled browser sessions"""
+        await self.client.aclose()
+        await self.browser_pool.close()
 
     async def authenticate(self) -> bool:
         """Implement the abstract authenticate method"""
         # No authentication needed beyond API key which is handled in the constructor
         return True
 
-    async def fetch_posts(self, username: str, since: datetime = None, use_selenium: bool = False) -> List[Dict[str, Any]]:
-        """Fetch posts using ScrapeCreators API with fallback to Selenium"""
+    async def fetch_posts(
+        self,
+        username: str,
+        since: datetime = None,
+        use_selenium: bool = False,
+        since_id: str = None
+    ) -> List[Dict[str, Any]]:
+        """Fetch the first page of posts, or with a `since_id` every post newer than it.
+
+        Falls back to scraping the profile with Selenium if the API fails and
+        `use_selenium` is set.
+        """
+        if since_id is not None:
+            posts, complete = await self.fetch_posts_since(username, since_id, since)
+            if posts or complete or not use_selenium:
+                return posts
+        else:
+            try:
+                page, _ = await self._fetch_page(username, since)
+                return page
+            except FetchError:
+                if not use_selenium:
+                    return []
+        logger.warning(f"API failed for {username}, falling back to Selenium.")
+        return await self._fetch_via_selenium(username)
+
+    async def fetch_posts_since(
+        self,
+        username: str,
+        since_id: str,
+        since: datetime = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Fetch posts newer than `since_id`, paging forward until caught up.
+
+        Also returns whether paging got back to `since_id`. It doesn't if a page
+        fails to fetch or FETCH_MAX_PAGES runs out first, and then the posts
+        between `since_id` and the oldest one returned are missing.
+        """
+        posts = []
+        cursor = None
+        for _ in range(self.max_pages):
+            try:
+                page, cursor = await self._fetch_page(username, since, since_id, cursor)
+            except FetchError:
+                logger.warning(f"Paging {username} stopped at a page that failed; older posts may be missing")
+                return posts, False
+
+            fresh = [post for post in page if is_newer_post_id(post['platform_post_id'], since_id)]
+            posts.extend(fresh)
+            # Stop once the page reaches tweets we have already seen. A single
+            # older tweet may just be a pinned one, so it alone doesn't count.
+            older = len(page) - len(fresh)
+            reached = older > 1 or any(post['platform_post_id'] == since_id for post in page)
+            if reached or not page or not cursor:
+                return posts, True
+        logger.warning(f"Stopped paging {username} after {self.max_pages} pages; older posts may be missing")
+        return posts, False
+
+    async def fetch_history_page(
+        self,
+        username: str,
+        cursor: str = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one page of a figure's timeline, newest first, and the cursor for the next (older) page.
+
+        Raises FetchError if the page could not be fetched.
+        """
+        return await self._fetch_page(username, cursor=cursor)
+
+    async def _fetch_page(
+        self,
+        username: str,
+        since: datetime = None,
+        since_id: str = None,
+        cursor: str = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one page of tweets, returning them with the cursor for the next page.
+
+        Raises FetchError once retries are used up or the circuit is open.
+        """
+        breaker = self._breaker(TWEETS_ENDPOINT)
         for attempt in range(self.max_retries):
+            if not breaker.allow():
+                logger.warning(f"Circuit open for {TWEETS_ENDPOINT}, skipping API fetch for {username}")
+                break
             try:
                 params = {
                     "handle": username,
-                    "count": 20
+                    "count": self.page_size
                 }
                 if since:
                     params["start_time"] = since.isoformat()
-                
+                if since_id:
+                    params["since_id"] = since_id
+                if cursor:
+                    params["cursor"] = cursor
                 logger.debug(f"Fetching tweets for {username} with params: {params}")
+                await self.rate_limiter.acquire()
                 response = await self.client.get("", params=params)
 
                 if response.status_code != 200:
                     logger.error(f"API Error: {response.status_code} - {response.text}")
+                    if response.status_code != 429 and response.status_code < 500:
+                        # Other client errors won't succeed on retry
+                        break
+                    breaker.record_failure()
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if response.status_code == 429 and retry_after:
+                        # Everyone sharing the limiter waits, not just this caller
+                        self.rate_limiter.pause(retry_after)
                     if attempt < self.max_retries - 1:
-                        await asyncio.sleep(self.retry_delay)
+                        await asyncio.sleep(self._retry_delay(attempt, retry_after))
                         continue
-                    elif use_selenium:
-                        logger.warning(f"API failed for {username}, falling back to Selenium.")
-                        return await self._fetch_via_selenium(username)
-                    return []
+                    break
 
-                data = response.json()
-                logger.debug(f"API Response structure: {data.keys()}")
-                
-                # Get tweets directly from the response and filter out None values
-                tweets = [t for t in data.get('tweets', []) if t is not None]
-                logger.debug(f"Found {len(tweets)} valid tweets in response")
+                breaker.record_success()
+                data = decode_json(response.content)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"API Response structure: {list(data.keys())}")
                 
-                extracted_tweets = []
-                for tweet in tweets:
-                    try:
-                        if not isinstance(tweet, dict):
-                            logger.warning(f"Skipping invalid tweet format: {type(tweet)}")
-                            continue
-
-                        # Get the core tweet data
-                        tweet_id = tweet.get('rest_id')
-                        legacy_data = tweet.get('legacy', {})
-                        
-                        # Handle retweets
-                        if 'retweeted_status_result' in tweet and tweet['retweeted_status_result'] and tweet['retweeted_status_result'].get('result'):
-                            retweet_data = tweet['retweeted_status_result']['result']
-                            legacy_data = retweet_data.get('legacy', legacy_data)
-                        
-                        # Extract tweet content and metadata
-                        content = legacy_data.get('full_text', '')
-                        posted_at_str = legacy_data.get('created_at')
-                        
-                        # Only process valid tweets
-                        if content and tweet_id:
-                            posted_at = None
-                            if posted_at_str:
-                                try:
-                                    posted_at = datetime.strptime(posted_at_str, '%a %b %d %H:%M:%S %z %Y')
-                                except ValueError as e:
-                                    logger.warning(f"Could not parse datetime string '{posted_at_str}': {e}")
-
-                            extracted_tweets.append({
-                                'platform_post_id': str(tweet_id),
-                                'content': content,
-                                'posted_at': posted_at,
-                                'metrics': {
-                                    'likes': legacy_data.get('favorite_count', 0),
-                                    'retweets': legacy_data.get('retweet_count', 0),
-                                    'replies': legacy_data.get('reply_count', 0)
-                                }
-                            })
-                    except Exception as e:
-                        logger.warning(f"Error parsing tweet {tweet.get('rest_id', 'unknown')}: {str(e)}")
-                        continue
-
-                return extracted_tweets
+                extracted_tweets = normalize_tweets(data)
+                return extracted_tweets, data.get('next_cursor') or data.get('cursor')
 
             except Exception as e:
                 logger.error(f"Error fetching tweets: {e}", exc_info=True)
+                breaker.record_failure()
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay)
-                elif use_selenium:
-                    logger.warning(f"An error occurred for {username}, falling back to Selenium.")
-                    return await self._fetch_via_selenium(username)
-                return []
+                    await asyncio.sleep(self._retry_delay(attempt))
+
+        raise FetchError(f"Could not fetch tweets for {username}")
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        """Circuit breaker for one API endpoint"""
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(
+                settings.FETCH_BREAKER_FAILURE_THRESHOLD,
+                settings.FETCH_BREAKER_RESET_SECONDS
+            )
+        return self.breakers[endpoint]
+
+    def _retry_delay(self, attempt: int, retry_after: float = None) -> float:
+        return backoff_delay(
+            attempt,
+            settings.FETCH_BACKOFF_BASE_SECONDS,
+            settings.FETCH_BACKOFF_MAX_SECONDS,
+            retry_after
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Rate limiter waits, circuit breaker state per endpoint and browser pool usage"""
+        return {
+            "rate_limiter": self.rate_limiter.stats(),
+            "breakers": {endpoint: breaker.stats() for endpoint, breaker in self.breakers.items()},
+            "browser_pool": self.browser_pool.stats()
+        }
 
     async def _fetch_via_selenium(self, username: str) -> List[Dict[str, Any]]:
         """Fallback method to fetch posts using Selenium browser automation"""
         logger.info(f"Attempting to fetch posts for {username} via Selenium.")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
+        try:
+            return await self.browser_pool.run(self._scrape_profile, username)
+        except Exception as e:
+            logger.error(f"Error during Selenium fetching for {username}: {e}", exc_info=True)
+            return []
 
-        driver = webdriver.Chrome(options=chrome_options)
+    def _scrape_profile(self, driver, username: str) -> List[Dict[str, Any]]:
+        """Scrape a profile page with a leased browser; runs on the browser pool's threads"""
         posts = []
+        driver.get(f"https://twitter.com/{username}")
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='tweet']"))
+        )
 
-        try:
-            driver.get(f"https://twitter.com/{username}")
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='tweet']"))
-            )
-
-            tweets = driver.find_elements(By.CSS_SELECTOR, "[data-testid='tweet']")
-            for tweet in tweets[:10]:
-                try:
-                    content_element = tweet.find_element(By.CSS_SELECTOR, "[data-testid='tweetText']")
-                    content = content_element.text
-                    time_element = tweet.find_element(By.CSS_SELECTOR, "time")
-                    posted_at = datetime.fromisoformat(time_element.get_attribute("datetime"))
-                    tweet_id = tweet.get_attribute("data-testid")
-
-                    posts.append({
-                        'platform_post_id': tweet_id,
-                        'content': content,
-                        'posted_at': posted_at,
-                        'metrics': {
-                            'likes': 0,
-                            'retweets': 0,
-                            'replies': 0
-                        }
-                    })
-                except Exception as e:
-                    logger.warning(f"Error parsing tweet via Selenium: {e}")
-                    continue
+        tweets = driver.find_elements(By.CSS_SELECTOR, "[data-testid='tweet']")
+        for tweet in tweets[:10]:
+            try:
+                content_element = tweet.find_element(By.CSS_SELECTOR, "[data-testid='tweetText']")
+                content = content_element.text
+                time_element = tweet.find_element(By.CSS_SELECTOR, "time")
+                posted_at = datetime.fromisoformat(time_element.get_attribute("datetime"))
+                tweet_id = tweet.get_attribute("data-testid")
 
-        except Exception as e:
-            logger.error(f"Error during Selenium fetching for {username}: {e}", exc_info=True)
-        finally:
-            driver.quit()
+                posts.append({
+                    'platform_post_id': tweet_id,
+                    'content': content,
+                    'posted_at': posted_at,
+                    'metrics': {
+                        'likes': 0,
+                        'retweets': 0,
+                        'replies': 0
+                    }
+                })
+            except Exception as e:
+                logger.warning(f"Error parsing tweet via Selenium: {e}")
+                continue
 
         return posts
 
@@ -170,10 +268,20 @@ class TwitterFetcher(SocialMediaFetcher):
         try:
             # THIS IS ALSO A CRITICAL CHANGE: Use 'handle' instead of 'username'
             params = {"handle": username}
+            breaker = self._breaker(PROFILE_ENDPOINT)
+            if not breaker.allow():
+                logger.warning(f"Circuit open for {PROFILE_ENDPOINT}, skipping lookup for {username}")
+                return None
+            await self.rate_limiter.acquire()
             response = await self.client.get("/twitter/user-profile", params=params)
             
+            if response.status_code == 429 or response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            
             if response.status_code == 200:
-                data = response.json()
+                data = decode_json(response.content)
                 user = data.get("user", {})
                 user_result = user.get('core', {}).get('user_results', {}).get('result', {})
                 user_legacy = user_result.get('legacy', {})
@@ -2,37 +2,38 @@
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 from typing import List, Dict
-from ..database.connection import get_db
+from ..database.connection import get_db_async
 from ..database.models import Post, MonitoredFigure, Alert
 
 router = APIRouter()
 templates = Jinja2Templates(directory="src/frontend/templates")
 
 @router.get("/dashboard", response_class=HTMLResponse)
-async def dashboard(request: Request, db: Session = Depends(get_db)):
+async def dashboard(request: Request, db: AsyncSession = Depends(get_db_async)):
     """Main dashboard view"""
     try:
         # Get latest posts with authors
-        latest_posts = (
-            db.query(Post)
+        latest_posts = (await db.scalars(
+            select(Post)
             .join(MonitoredFigure)
+            .options(contains_eager(Post.author))
             .order_by(Post.posted_at.desc())
             .limit(10)
-            .all()
-        )
+        )).all()
         
         # Get recent alerts
-        recent_alerts = (
-            db.query(Alert)
+        recent_alerts = (await db.scalars(
+            select(Alert)
             .order_by(Alert.sent_at.desc())
             .limit(5)
-            .all()
-        )
+        )).all()
         
         # Get monitored figures
-        figures = db.query(MonitoredFigure).all()
+        figures = (await db.scalars(select(MonitoredFigure))).all()
         
         return templates.TemplateResponse(
             "dashboard.html",
@@ -42,8 +43,8 @@ async def dashboard(request: Request, db: Session = Depends(get_db)):
                 "recent_alerts": recent_alerts,
                 "monitored_figures": figures,
                 "total_figures": len(figures),
-                "total_posts": db.query(Post).count(),
-                "total_alerts": db.query(Alert).count()
+                "total_posts": await db.scalar(select(func.count()).select_from(Post)),
+                "total_alerts": await db.scalar(select(func.count()).select_from(Alert))
             }
         )
     except Exception as e:
@@ -63,16 +64,16 @@ async def dashboard(request: Request, db: Session = Depends(get_db)):
         )
 
 @router.get("/posts", response_class=HTMLResponse)
-async def posts_view(request: Request, db: Session = Depends(get_db)):
+async def posts_view(request: Request, db: AsyncSession = Depends(get_db_async)):
     """Posts listing and search view"""
     try:
-        posts = (
-            db.query(Post)
+        posts = (await db.scalars(
+            select(Post)
             .join(MonitoredFigure)
+            .options(contains_eager(Post.author))
             .order_by(Post.posted_at.desc())
             .limit(50)
-            .all()
-        )
+        )).all()
         
         return templates.TemplateResponse(
             "posts.html",
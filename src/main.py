@@ -1,7 +1,9 @@
 # src/main.py
-from fastapi import FastAPI, Depends, HTTPException, WebSocket
+from fastapi import FastAPI, Depends, HTTPException, Query, WebSocket
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
 import json
 from fastapi.responses import HTMLResponse
@@ -9,36 +11,56 @@ import asyncio
 import datetime
 from contextlib import asynccontextmanager
 
-from .database.connection import get_db, init_db, get_session
+from .database.connection import close_db, get_db_async, init_db_async, get_async_session
 from .database.models import MonitoredFigure, Post, Alert, Watchlist
+from .database.search import match_expression, search_posts
 from .fetchers.twitter import TwitterFetcher
 from .analyzers.ai_analyzer import AIAnalyzer
 from .notifiers.push_notifier import PushNotifier
 from .frontend import routes as frontend_routes
+from .pipeline.ingest import IngestPipeline, snapshot_figure
+from .pipeline.scheduler import PollScheduler
+
+# Longest the poll loop sleeps before re-reading the figure list
+SCHEDULER_MAX_SLEEP_SECONDS = 60
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Initialize database
     print("🔧 Initializing database...")
     try:
-        init_db()
+        await init_db_async()
         print("✅ Database initialized successfully")
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
     
+    try:
+        async with get_async_session() as db:
+            await db.run_sync(pipeline.seen_filter.warm)
+    except Exception as e:
+        print(f"⚠️ Could not warm seen-post filter: {e}")
+    
     # Start background tasks
     print("🔄 Starting background tasks...")
+    pipeline.start()
+    # Posts stored before the last shutdown but never fully analyzed
+    resume_task = asyncio.create_task(pipeline.resume())
     task = asyncio.create_task(fetch_and_analyze_posts())
     
     yield
     
     # Cleanup
     print("🧹 Cleaning up...")
-    task.cancel()
-    try:
-        await task
-    except asyncio.CancelledError:
-        pass
+    for background in (task, resume_task):
+        background.cancel()
+        try:
+            await background
+        except asyncio.CancelledError:
+            pass
+    await pipeline.stop()
+    await twitter_fetcher.close()
+    await ai_analyzer.close()
+    await close_db()
 
 app = FastAPI(
     title="Lambda Monitor", 
@@ -102,13 +124,24 @@ async def root():
 @app.get("/api/status")
 async def api_status():
     """API status endpoint"""
-    return {"status": "ok", "service": "Lambda Monitor"}
+    return {
+        "status": "ok",
+        "service": "Lambda Monitor",
+        "poller": scheduler.stats(),
+        "fetcher": twitter_fetcher.stats(),
+        "analyzer": ai_analyzer.stats()
+    }
+
+@app.get("/api/pipeline")
+async def api_pipeline():
+    """Queue depths and throughput of each ingest pipeline stage, plus seen-filter hit rates"""
+    return pipeline.stats()
 
 @app.get("/api/figures")
-async def get_monitored_figures(db: Session = Depends(get_db)):
+async def get_monitored_figures(db: AsyncSession = Depends(get_db_async)):
     """Get all monitored figures"""
     try:
-        figures = db.query(MonitoredFigure).all()
+        figures = (await db.scalars(select(MonitoredFigure))).all()
         return [
             {
                 "id": fig.id,
@@ -128,22 +161,27 @@ async def get_monitored_figures(db: Session = Depends(get_db)):
 async def get_latest_posts(
     limit: int = 10,
     min_impact_score: float = None,
-    db: Session = Depends(get_db)
+    status: str = None,
+    db: AsyncSession = Depends(get_db_async)
 ):
-    """Get latest posts with optional impact score filter"""
+    """Get latest posts with optional impact score and analysis status (pending, scored, enriched) filters"""
     try:
-        query = db.query(Post).order_by(Post.posted_at.desc())
+        query = select(Post).options(selectinload(Post.author)).order_by(Post.posted_at.desc())
         
         if min_impact_score is not None:
-            query = query.filter(Post.impact_score >= min_impact_score)
+            query = query.where(Post.impact_score >= min_impact_score)
+        if status:
+            query = query.where(Post.status == status)
         
-        posts = query.limit(limit).all()
+        posts = (await db.scalars(query.limit(limit))).all()
         return [
             {
                 "id": post.id,
                 "content": post.content,
                 "posted_at": post.posted_at.isoformat() if post.posted_at else None,
                 "impact_score": post.impact_score,
+                "status": post.status,
+                "cluster_id": post.cluster_id,
                 "author": {
                     "name": post.author.name,
                     "title": post.author.title
@@ -154,20 +192,73 @@ async def get_latest_posts(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/posts/search")
+async def get_post_search(
+    q: str,
+    figure_id: int = None,
+    since: datetime.datetime = None,
+    until: datetime.datetime = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db_async)
+):
+    """Full-text search of post content and analysis summaries and tags, best matches first.
+
+    Words must all match; use "quotes" for a phrase and a trailing * for a prefix.
+    Filter by figure and posted_at range (since inclusive, until exclusive).
+
+    Only the newest SEARCH_RANK_WINDOW matches (2000 by default) are ranked and
+    paged through; `truncated` is true when older matches were left out, and a
+    narrower query or date range reaches them.
+    """
+    expression = match_expression(q)
+    if expression is None:
+        raise HTTPException(status_code=400, detail="Query has no words to search for")
+    
+    try:
+        # One row past the page tells whether there is another
+        rows, truncated = await db.run_sync(search_posts, expression, figure_id, since, until, limit + 1, offset)
+        return {
+            "results": [
+                {
+                    "id": post.id,
+                    "content": post.content,
+                    "rank": rank,
+                    "posted_at": post.posted_at.isoformat() if post.posted_at else None,
+                    "impact_score": post.impact_score,
+                    "status": post.status,
+                    "summary": post.analysis.summary if post.analysis else None,
+                    "tags": json.loads(post.analysis.tags) if post.analysis and post.analysis.tags else [],
+                    "author": {
+                        "id": post.author.id,
+                        "name": post.author.name,
+                        "title": post.author.title
+                    } if post.author else None
+                }
+                for post, rank in rows[:limit]
+            ],
+            "limit": limit,
+            "offset": offset,
+            "has_more": len(rows) > limit,
+            "truncated": truncated
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/alerts")
 async def get_alerts(
     limit: int = 10,
     alert_type: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db_async)
 ):
     """Get recent alerts with optional type filter"""
     try:
-        query = db.query(Alert).order_by(Alert.sent_at.desc())
+        query = select(Alert).order_by(Alert.sent_at.desc())
         
         if alert_type:
-            query = query.filter(Alert.alert_type == alert_type)
+            query = query.where(Alert.alert_type == alert_type)
         
-        alerts = query.limit(limit).all()
+        alerts = (await db.scalars(query.limit(limit))).all()
         return [
             {
                 "id": alert.id,
@@ -182,10 +273,10 @@ async def get_alerts(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/watchlists")
-async def get_watchlists(db: Session = Depends(get_db)):
+async def get_watchlists(db: AsyncSession = Depends(get_db_async)):
     """Get all watchlists"""
     try:
-        watchlists = db.query(Watchlist).all()
+        watchlists = (await db.scalars(select(Watchlist))).all()
         return [
             {
                 "id": wl.id,
@@ -222,106 +313,42 @@ async def broadcast_update(update_type: str, data: dict):
     })
     await manager.broadcast(message)
 
+scheduler = PollScheduler()
+pipeline = IngestPipeline(
+    twitter_fetcher,
+    ai_analyzer,
+    notifier,
+    broadcast_update,
+    on_poll_result=scheduler.record
+)
+
 async def fetch_and_analyze_posts():
     """Background task to fetch and analyze new posts"""
     print("🔄 Background task started: fetching and analyzing posts")
+    warmed = False
     
     while True:
         try:
             # Get database session
-            db = get_session()
+            async with get_async_session() as db:
+                figures = [snapshot_figure(figure) for figure in await db.scalars(select(MonitoredFigure))]
+                scheduler.sync(figures)
+                if not warmed:
+                    await db.run_sync(scheduler.warm)
+                    warmed = True
             
-            try:
-                figures = db.query(MonitoredFigure).all()
-                print(f"📊 Monitoring {len(figures)} figures")
-                
-                for figure in figures:
-                    try:
-                        # Fetch new posts
-                        posts = await twitter_fetcher.fetch_posts(
-                            figure.platform_id,
-                            since=datetime.datetime.utcnow() - datetime.timedelta(hours=1)
-                        )
-                        
-                        print(f"📥 Found {len(posts)} posts for {figure.name}")
-                        
-                        for post_data in posts:
-                            # Check if post already exists
-                            existing = db.query(Post).filter_by(
-                                platform_post_id=post_data['platform_post_id']
-                            ).first()
-                            
-                            if not existing:
-                                # Create new post
-                                post = Post(
-                                    platform_post_id=post_data['platform_post_id'],
-                                    content=post_data['content'],
-                                    posted_at=post_data['posted_at'],
-                                    author_id=figure.id
-                                )
-                                db.add(post)
-                                db.commit()
-                                db.refresh(post)
-                                
-                                print(f"💾 Saved new post from {figure.name}")
-                                
-                                # Analyze post
-                                try:
-                                    analysis = await ai_analyzer.analyze_post(post)
-                                    post.impact_score = analysis['market_impact_score']
-                                    db.commit()
-                                    
-                                    print(f"🧠 Analysis complete - Impact score: {analysis['market_impact_score']}")
-                                    
-                                    # Create alert if high impact
-                                    if analysis['market_impact_score'] >= 0.7:
-                                        alert = Alert(
-                                            post_id=post.id,
-                                            alert_type='high_priority',
-                                            message=f"High impact post from {figure.name}: {post.content[:100]}..."
-                                        )
-                                        db.add(alert)
-                                        db.commit()
-                                        
-                                        print(f"🚨 High impact alert created for {figure.name}")
-                                        
-                                        # Send notification
-                                        try:
-                                            await notifier.send_notification(alert)
-                                        except Exception as e:
-                                            print(f"⚠️ Notification failed: {e}")
-                                        
-                                        # Broadcast update
-                                        await broadcast_update('new_alert', {
-                                            'id': alert.id,
-                                            'message': alert.message,
-                                            'alert_type': alert.alert_type
-                                        })
-                                    
-                                    # Broadcast new post
-                                    await broadcast_update('new_post', {
-                                        'id': post.id,
-                                        'content': post.content,
-                                        'author': figure.name,
-                                        'impact_score': post.impact_score
-                                    })
-                                    
-                                except Exception as e:
-                                    print(f"⚠️ Analysis failed for post {post.id}: {e}")
-                    
-                    except Exception as e:
-                        print(f"⚠️ Error processing {figure.name}: {e}")
-                        continue
+            due = scheduler.due()
+            if due:
+                print(f"📊 Polling {len(due)} of {len(figures)} figures")
             
-            finally:
-                db.close()
+            for figure in due:
+                await pipeline.submit(figure)
                 
         except Exception as e:
             print(f"❌ Error in background task: {e}")
         
-        # Wait before next iteration
-        print("⏳ Waiting 5 minutes before next check...")
-        await asyncio.sleep(300)  # Check every 5 minutes
+        # Wake for the next due figure, re-reading the figure list at least once a minute
+        await asyncio.sleep(min(scheduler.seconds_until_next(), SCHEDULER_MAX_SLEEP_SECONDS))
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,402 @@
+"""
+Bulk jobs over history: backfill a figure's older posts, or re-score stored posts.
+
+Both run with bounded concurrency, write each batch in one transaction together
+with their checkpoint, and pick up where they stopped when run again with the
+same arguments (or `--job` name).
+
+Options shared by both jobs go before the job name:
+
+    python -m src.pipeline.backfill [--figure NAME ...] [--since 2025-01-01] history
+    python -m src.pipeline.backfill [--figure NAME ...] [--since DATE] rescore [--until DATE] [--status pending ...]
+"""
+
+import argparse
+import asyncio
+import datetime
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database.bulk import existing_post_ids, insert_posts, save_analyses, save_scores
+from ..database.connection import get_session
+from ..database.models import JobCheckpoint, MonitoredFigure, Post
+from ..fetchers.base import FetchError
+from .ingest import attach_author, detached_post, snapshot_figure
+
+# Shortest gap between progress lines
+PROGRESS_INTERVAL_SECONDS = 5.0
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+class Progress:
+    """Prints items done, rate and ETA for a long-running job"""
+
+    def __init__(
+        self,
+        label: str,
+        total: Optional[int] = None,
+        done: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+        interval: float = PROGRESS_INTERVAL_SECONDS
+    ):
+        self.label = label
+        self.total = total
+        self.done = done
+        self.clock = clock
+        self.interval = interval
+        self._started = clock()
+        self._start_done = done
+        self._last_report = None
+
+    def rate(self) -> float:
+        """Items per second in this run"""
+        elapsed = self.clock() - self._started
+        return (self.done - self._start_done) / elapsed if elapsed > 0 else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        rate = self.rate()
+        if self.total is None or rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    def advance(self, count: int):
+        self.done += count
+        now = self.clock()
+        if self._last_report is None or now - self._last_report >= self.interval:
+            self.report()
+
+    def report(self):
+        self._last_report = self.clock()
+        line = f"⏳ {self.label}: {self.done}"
+        if self.total is not None:
+            line += f"/{self.total} ({self.done / self.total:.1%})" if self.total else "/0"
+        line += f", {self.rate():.1f}/s"
+        eta = self.eta_seconds()
+        if eta is not None:
+            line += f", ETA {_format_duration(eta)}"
+        print(line)
+
+def _checkpoint(db: Session, name: str) -> JobCheckpoint:
+    checkpoint = db.get(JobCheckpoint, name)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=name, processed=0, done=False)
+        db.add(checkpoint)
+    return checkpoint
+
+def reset_checkpoints(session_factory: Callable[[], Session], job: str):
+    """Forget a job's progress so it starts over"""
+    db = session_factory()
+    try:
+        db.query(JobCheckpoint).filter(
+            (JobCheckpoint.name == job) | JobCheckpoint.name.startswith(f"{job}:")
+        ).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+async def _analyze_all(analyzer, posts: Sequence[Post], limit: asyncio.Semaphore, use_cache: bool) -> List[Optional[Dict[str, Any]]]:
+    async def one(post: Post) -> Optional[Dict[str, Any]]:
+        async with limit:
+            return await analyzer.reanalyze_post(post, use_cache=use_cache)
+    return await asyncio.gather(*(one(post) for post in posts))
+
+def _save_results(db: Session, posts: Sequence[Post], analyses: Sequence[Optional[Dict[str, Any]]]) -> int:
+    """Stage scores and analyses for the posts that were analyzed; returns how many were"""
+    done = [(post.id, analysis) for post, analysis in zip(posts, analyses) if analysis is not None]
+    save_scores(db, [(post_id, analysis['market_impact_score'], analysis.get('score_source')) for post_id, analysis in done])
+    save_analyses(db, done)
+    return len(done)
+
+async def rescore(
+    analyzer,
+    job: str,
+    session_factory: Callable[[], Session] = get_session,
+    figure_ids: Optional[Sequence[int]] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    statuses: Optional[Sequence[str]] = None,
+    concurrency: int = 8,
+    batch_size: int = 100
+) -> int:
+    """Re-run analysis over the selected stored posts in id order; returns how many were re-scored"""
+    def selected(query):
+        if figure_ids:
+            query = query.filter(Post.author_id.in_(figure_ids))
+        if since is not None:
+            query = query.filter(Post.posted_at >= since)
+        if until is not None:
+            query = query.filter(Post.posted_at < until)
+        if statuses:
+            query = query.filter(Post.status.in_(statuses))
+        return query
+
+    db = session_factory()
+    try:
+        checkpoint = _checkpoint(db, job)
+        if checkpoint.done:
+            print(f"✅ {job} already finished; use --restart to run it again")
+            return 0
+        last_id = int(checkpoint.position or 0)
+        figures = {figure.id: snapshot_figure(figure) for figure in db.query(MonitoredFigure)}
+        remaining = selected(db.query(Post)).filter(Post.id > last_id).count()
+        progress = Progress(job, total=checkpoint.processed + remaining, done=checkpoint.processed)
+        db.commit()
+    finally:
+        db.close()
+
+    limit = asyncio.Semaphore(concurrency)
+    processed = rescored = 0
+    while True:
+        db = session_factory()
+        try:
+            posts = [
+                detached_post(post) for post in
+                selected(db.query(Post)).filter(Post.id > last_id).order_by(Post.id).limit(batch_size)
+            ]
+        finally:
+            db.close()
+        if not posts:
+            break
+        for post in posts:
+            if post.author_id in figures:
+                attach_author(figures[post.author_id], post)
+
+        analyses = await _analyze_all(analyzer, posts, limit, use_cache=False)
+
+        db = session_factory()
+        try:
+            # Results and the checkpoint that covers them commit together
+            rescored += _save_results(db, posts, analyses)
+            last_id = posts[-1].id
+            checkpoint = _checkpoint(db, job)
+            checkpoint.position = str(last_id)
+            checkpoint.processed = (checkpoint.processed or 0) + len(posts)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        processed += len(posts)
+        progress.advance(len(posts))
+
+    db = session_factory()
+    try:
+        _checkpoint(db, job).done = True
+        db.commit()
+    finally:
+        db.close()
+    progress.report()
+    if processed > rescored:
+        print(f"⚠️ {processed - rescored} posts kept their previous analysis because the models failed")
+    return rescored
+
+async def backfill_history(
+    fetcher,
+    analyzer,
+    job: str,
+    session_factory: Callable[[], Session] = get_session,
+    figure_ids: Optional[Sequence[int]] = None,
+    since: Optional[datetime.datetime] = None,
+    concurrency: int = 8
+) -> int:
+    """Page back through each figure's timeline to `since`, storing and analyzing posts not yet stored"""
+    db = session_factory()
+    try:
+        query = db.query(MonitoredFigure)
+        if figure_ids:
+            query = query.filter(MonitoredFigure.id.in_(figure_ids))
+        figures = [snapshot_figure(figure) for figure in query]
+    finally:
+        db.close()
+
+    progress = Progress(f"{job} posts")
+    limit = asyncio.Semaphore(concurrency)
+    pending = [0]
+    # The API rate limiter already paces requests; this keeps figures from crowding analysis out
+    figure_slots = asyncio.Semaphore(max(1, settings.FETCH_CONCURRENCY))
+
+    async def one_figure(figure: MonitoredFigure) -> int:
+        async with figure_slots:
+            return await _backfill_figure(
+                fetcher, analyzer, f"{job}:{figure.id}", figure, session_factory, since, limit, progress, pending
+            )
+
+    stored = sum(await asyncio.gather(*(one_figure(figure) for figure in figures)))
+    progress.report()
+    if pending[0]:
+        print(f"⚠️ {pending[0]} posts could not be analyzed and were left pending; "
+              f"re-score them with: python -m src.pipeline.backfill rescore --status pending")
+    return stored
+
+async def _backfill_figure(
+    fetcher,
+    analyzer,
+    name: str,
+    figure: MonitoredFigure,
+    session_factory: Callable[[], Session],
+    since: Optional[datetime.datetime],
+    limit: asyncio.Semaphore,
+    progress: Progress,
+    pending: List[int]
+) -> int:
+    db = session_factory()
+    try:
+        checkpoint = _checkpoint(db, name)
+        done, cursor = checkpoint.done, checkpoint.position
+        db.commit()
+    finally:
+        db.close()
+    if done:
+        return 0
+
+    stored = 0
+    while True:
+        try:
+            page, next_cursor = await fetcher.fetch_history_page(figure.platform_id, cursor=cursor)
+        except FetchError as e:
+            # The checkpoint stays open at this page, so the next run retries it
+            print(f"⚠️ {figure.name}: backfill stopped, {e}; run the job again to resume")
+            return stored
+        # An empty page ends the timeline; one emptied by the filters below does not
+        exhausted = not page
+        undated = [p['platform_post_id'] for p in page if p['posted_at'] is None]
+        if undated:
+            print(f"⚠️ {figure.name}: skipping {len(undated)} posts without a posting date")
+            page = [p for p in page if p['posted_at'] is not None]
+        reached_since = False
+        if since is not None:
+            in_range = [p for p in page if _naive_utc(p['posted_at']) >= since]
+            reached_since = len(in_range) < len(page)
+            page = in_range
+
+        db = session_factory()
+        try:
+            known = existing_post_ids(db, figure.platform, [p['platform_post_id'] for p in page])
+        finally:
+            db.close()
+        new_posts = [p for p in page if p['platform_post_id'] not in known]
+
+        # Analyze before opening the write transaction, so model calls never hold the lock
+        transient = [
+            attach_author(figure, Post(platform=figure.platform, author_id=figure.id, **{
+                k: p[k] for k in ('platform_post_id', 'content', 'posted_at')
+            }))
+            for p in new_posts
+        ]
+        analyses = await _analyze_all(analyzer, transient, limit, use_cache=True)
+        by_post_id = {post.platform_post_id: analysis for post, analysis in zip(transient, analyses)}
+
+        finished = reached_since or exhausted or not next_cursor
+        db = session_factory()
+        try:
+            inserted = insert_posts(db, figure, new_posts)
+            analyzed = _save_results(db, inserted, [by_post_id.get(post.platform_post_id) for post in inserted])
+            pending[0] += len(inserted) - analyzed
+            checkpoint = _checkpoint(db, name)
+            checkpoint.position = next_cursor
+            checkpoint.processed = (checkpoint.processed or 0) + len(inserted)
+            checkpoint.done = finished
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        stored += len(inserted)
+        progress.advance(len(inserted))
+
+        if finished:
+            print(f"📚 {figure.name}: backfill complete")
+            return stored
+        cursor = next_cursor
+
+def _naive_utc(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+def _parse_date(value: str) -> datetime.datetime:
+    # Stored posted_at values are naive UTC, so offsets are applied here once
+    return _naive_utc(datetime.datetime.fromisoformat(value))
+
+def _figure_ids(db: Session, names: Sequence[str]) -> List[int]:
+    ids = []
+    for name in names:
+        figure = (
+            db.query(MonitoredFigure)
+            .filter((MonitoredFigure.name == name) | (MonitoredFigure.platform_id == name))
+            .first()
+        )
+        if figure is None:
+            raise SystemExit(f"❌ Unknown figure: {name}")
+        ids.append(figure.id)
+    return ids
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill post history or re-score stored posts")
+    parser.add_argument("--job", help="checkpoint name; defaults to one derived from the arguments")
+    parser.add_argument("--restart", action="store_true", help="ignore any saved progress for this job")
+    parser.add_argument("--concurrency", type=int, default=8, help="analyses in flight at once")
+    parser.add_argument("--figure", action="append", default=[], help="figure name or handle; repeatable")
+    parser.add_argument("--since", type=_parse_date)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("history", help="store and analyze older posts from each figure's timeline")
+    rescore_parser = subcommands.add_parser("rescore", help="re-run analysis over stored posts")
+    rescore_parser.add_argument("--until", type=_parse_date)
+    rescore_parser.add_argument("--status", action="append", default=[], help="pending, scored or enriched; repeatable")
+    rescore_parser.add_argument("--batch-size", type=int, default=100, help="posts per transaction")
+    args = parser.parse_args(argv)
+
+    job = args.job or ":".join(str(part) for part in (
+        args.command, ",".join(sorted(args.figure)) or "all", args.since and args.since.date(),
+        getattr(args, "until", None) and args.until.date(), ",".join(sorted(getattr(args, "status", [])))
+    ) if part)
+
+    from ..analyzers.ai_analyzer import AIAnalyzer
+    from ..database.connection import init_db
+
+    init_db()
+    db = get_session()
+    try:
+        figure_ids = _figure_ids(db, args.figure)
+    finally:
+        db.close()
+    if args.restart:
+        reset_checkpoints(get_session, job)
+
+    async def run() -> int:
+        analyzer = AIAnalyzer()
+        try:
+            if args.command == "rescore":
+                return await rescore(
+                    analyzer, job, figure_ids=figure_ids, since=args.since, until=args.until,
+                    statuses=args.status, concurrency=args.concurrency, batch_size=args.batch_size
+                )
+            from ..fetchers.twitter import TwitterFetcher
+            fetcher = TwitterFetcher()
+            try:
+                return await backfill_history(
+                    fetcher, analyzer, job, figure_ids=figure_ids, since=args.since, concurrency=args.concurrency
+                )
+            finally:
+                await fetcher.close()
+        finally:
+            await analyzer.close()
+
+    print(f"🚚 Running {job}")
+    count = asyncio.run(run())
+    print(f"✅ {job}: {count} posts {'re-scored' if args.command == 'rescore' else 'stored'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+import datetime
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..config import settings
+from ..database.bulk import existing_post_ids, insert_posts, save_analyses, save_scores
+from ..database.connection import get_async_session
+from ..database.models import (
+    MonitoredFigure, Post, Alert, FetchCursor, POST_STATUS_PENDING, POST_STATUS_SCORED
+)
+from ..fetchers.twitter import is_newer_post_id, newest_post_id
+from .seen import SeenPostFilter
+from .stage import Stage
+from .writer import WriteBatcher
+
+# Stages in the order items flow through them
+STAGE_NAMES = ['fetch', 'dedupe', 'persist', 'score', 'alert', 'fanout', 'enrich']
+
+# Unfinished posts loaded per query when resuming
+RESUME_CHUNK_SIZE = 500
+
+# Number of recent time-to-alert and time-to-enrich samples kept for stats
+LATENCY_SAMPLES = 1000
+
+def _latency_stats(samples: deque) -> Dict[str, Any]:
+    if not samples:
+        return {"count": 0, "median": None, "p95": None}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "median": round(statistics.median(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3)
+    }
+
+@dataclass
+class PostBatch:
+    """Posts fetched for one figure in one poll"""
+    figure: MonitoredFigure
+    posts: List[Dict[str, Any]] = field(default_factory=list)
+    # New high-water mark to store once the posts are persisted
+    cursor_post_id: Optional[str] = None
+    cursor_posted_at: Optional[datetime.datetime] = None
+    fetched_at: float = field(default_factory=time.monotonic)
+
+@dataclass
+class PostItem:
+    """A single stored post travelling through the analysis stages"""
+    figure: MonitoredFigure
+    post: Post
+    analysis: Optional[Dict[str, Any]] = None
+    alert: Optional[Alert] = None
+    # When the post was fetched, for time-to-alert
+    fetched_at: float = field(default_factory=time.monotonic)
+
+def snapshot_figure(figure: MonitoredFigure) -> MonitoredFigure:
+    """Copy a figure into a transient instance that can be shared across stage workers"""
+    return MonitoredFigure(
+        id=figure.id,
+        name=figure.name,
+        title=figure.title,
+        platform=figure.platform,
+        platform_id=figure.platform_id,
+        category=figure.category
+    )
+
+def detached_post(post: Post) -> Post:
+    """Copy a stored post's columns into a transient instance"""
+    return Post(
+        id=post.id,
+        platform=post.platform,
+        platform_post_id=post.platform_post_id,
+        content=post.content,
+        author_id=post.author_id,
+        posted_at=post.posted_at,
+        captured_at=post.captured_at,
+        impact_score=post.impact_score,
+        status=post.status
+    )
+
+def _store_batch(db: Session, batch: PostBatch) -> List[Post]:
+    """Insert a batch's new posts and move the figure's cursor past them"""
+    posts = insert_posts(db, batch.figure, batch.posts)
+    if batch.cursor_post_id is not None:
+        db.merge(FetchCursor(
+            figure_id=batch.figure.id,
+            last_post_id=batch.cursor_post_id,
+            last_posted_at=batch.cursor_posted_at
+        ))
+    return posts
+
+def _store_alert(db: Session, alert: Alert) -> Alert:
+    """Insert an alert and return a detached copy carrying its new ID"""
+    db.add(alert)
+    db.flush()
+    return Alert(
+        id=alert.id,
+        post_id=alert.post_id,
+        alert_type=alert.alert_type,
+        message=alert.message,
+        sent_at=alert.sent_at
+    )
+
+def attach_author(figure: MonitoredFigure, post: Post) -> Post:
+    """Give a transient post its author for the analyzer"""
+    # Bypass the backref so the shared figure doesn't accumulate posts
+    set_committed_value(post, 'author', figure)
+    return post
+
+class IngestPipeline:
+    """Fetch → dedupe → persist → score → alert → fan-out → enrich, each stage with its own workers and queue.
+
+    Alerting is two-phase: only the impact score stands between a stored post
+    and its alert and `new_post` broadcast. Summary, tags and context are
+    filled in afterwards and announced with a `post_enriched` event.
+    """
+
+    def __init__(
+        self,
+        fetcher,
+        analyzer,
+        notifier,
+        broadcast: Callable[[str, dict], Awaitable[None]],
+        session_factory: Callable[[], AsyncSession] = get_async_session,
+        on_poll_result: Optional[Callable[[int, List[Any]], None]] = None,
+        seen_filter: Optional[SeenPostFilter] = None
+    ):
+        self.fetcher = fetcher
+        self.analyzer = analyzer
+        self.notifier = notifier
+        self.broadcast = broadcast
+        self.session_factory = session_factory
+        # Told (figure id, posted_at of new posts) after each poll, e.g. by the scheduler
+        self.on_poll_result = on_poll_result
+        self.seen_filter = seen_filter if seen_filter is not None else SeenPostFilter()
+        # Every stage's writes go through here, coalesced into group commits
+        self.writer = WriteBatcher(
+            session_factory,
+            settings.PIPELINE_WRITE_BATCH_SIZE,
+            settings.PIPELINE_WRITE_MAX_WAIT_MS
+        )
+
+        handlers = {
+            'fetch': self._fetch,
+            'dedupe': self._dedupe,
+            'persist': self._persist,
+            'score': self._score,
+            'alert': self._alert,
+            'fanout': self._fanout,
+            'enrich': self._enrich
+        }
+        self.stages: Dict[str, Stage] = {}
+        previous = None
+        for name in STAGE_NAMES:
+            workers = (
+                settings.FETCH_CONCURRENCY if name == 'fetch'
+                else settings.PIPELINE_STAGE_WORKERS.get(name, 1)
+            )
+            stage = Stage(name, handlers[name], workers, settings.PIPELINE_QUEUE_SIZE)
+            if previous is not None:
+                previous.next_stage = stage
+            self.stages[name] = stage
+            previous = stage
+
+        self.time_to_alert: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.time_to_enrich: deque = deque(maxlen=LATENCY_SAMPLES)
+
+    def start(self):
+        """Start workers for every stage"""
+        for stage in self.stages.values():
+            stage.start()
+
+    async def stop(self):
+        """Stop workers for every stage and commit any writes still waiting"""
+        for stage in self.stages.values():
+            await stage.stop()
+        await self.writer.flush()
+
+    async def resume(self) -> int:
+        """Re-queue stored posts whose scoring or enrichment never finished, e.g. before a restart"""
+        async with self.session_factory() as db:
+            figures = {figure.id: snapshot_figure(figure) for figure in await db.scalars(select(MonitoredFigure))}
+
+        resumed = 0
+        last_id = 0
+        while True:
+            async with self.session_factory() as db:
+                posts = [
+                    detached_post(post) for post in await db.scalars(
+                        select(Post)
+                        .where(Post.status.in_([POST_STATUS_PENDING, POST_STATUS_SCORED]))
+                        .where(Post.id > last_id)
+                        .order_by(Post.id)
+                        .limit(RESUME_CHUNK_SIZE)
+                    )
+                ]
+            if not posts:
+                break
+            last_id = posts[-1].id
+
+            for post in posts:
+                figure = figures.get(post.author_id)
+                if figure is None:
+                    continue
+                item = PostItem(figure, attach_author(figure, post))
+                if post.status == POST_STATUS_SCORED:
+                    # Its alert decision committed with the score; only the enrichment is missing
+                    item.analysis = {'market_impact_score': post.impact_score}
+                    await self.stages['enrich'].put(item)
+                else:
+                    await self.stages['score'].put(item)
+                resumed += 1
+        if resumed:
+            print(f"♻️ Resumed {resumed} posts with unfinished analysis")
+        return resumed
+
+    async def submit(self, figure: MonitoredFigure):
+        """Queue a figure for fetching, waiting if the fetch queue is full"""
+        await self.stages['fetch'].put(figure)
+
+    async def drain(self, through: str = STAGE_NAMES[-1]):
+        """Wait until every stage up to and including `through` has emptied"""
+        for name in STAGE_NAMES:
+            await self.stages[name].queue.join()
+            if name == through:
+                break
+        if through == STAGE_NAMES[-1]:
+            await self.writer.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depths and throughput of each stage, seen-filter hit rates, and seconds from fetch to alert and to enrichment"""
+        return {
+            "stages": {name: stage.stats() for name, stage in self.stages.items()},
+            "seen_filter": self.seen_filter.stats(),
+            "writer": self.writer.stats(),
+            "time_to_alert_seconds": _latency_stats(self.time_to_alert),
+            "time_to_enrich_seconds": _latency_stats(self.time_to_enrich)
+        }
+
+    async def _fetch(self, figure: MonitoredFigure) -> List[PostBatch]:
+        async with self.session_factory() as db:
+            cursor = await db.get(FetchCursor, figure.id)
+            since_id = cursor.last_post_id if cursor else None
+
+        complete = True
+        if since_id:
+            posts, complete = await self.fetcher.fetch_posts_since(figure.platform_id, since_id)
+        else:
+            # First poll for this figure: start from the last hour
+            posts = await self.fetcher.fetch_posts(
+                figure.platform_id,
+                since=datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+            )
+        print(f"📥 Found {len(posts)} posts for {figure.name}")
+
+        batch = PostBatch(figure, posts)
+        newest = newest_post_id([post_data['platform_post_id'] for post_data in posts])
+        if not complete:
+            # Posts between the cursor and the oldest one fetched were never seen, so
+            # the cursor stays put and the next poll pages back to it again
+            print(f"⚠️ Paging {figure.name} stopped short of the last seen post; keeping its cursor")
+        elif newest and (since_id is None or is_newer_post_id(newest, since_id)):
+            batch.cursor_post_id = newest
+            batch.cursor_posted_at = next(
+                post_data['posted_at'] for post_data in posts
+                if post_data['platform_post_id'] == newest
+            )
+        return [batch]
+
+    async def _dedupe(self, batch: PostBatch) -> List[PostBatch]:
+        if not batch.posts:
+            if self.on_poll_result is not None:
+                self.on_poll_result(batch.figure.id, [])
+            return []
+
+        figure = batch.figure
+        candidates = [
+            post_data for post_data in batch.posts
+            if not self.seen_filter.contains(figure.id, post_data['platform_post_id'])
+        ]
+
+        stored = set()
+        if candidates:
+            async with self.session_factory() as db:
+                stored = await db.run_sync(
+                    existing_post_ids,
+                    figure.platform,
+                    [post_data['platform_post_id'] for post_data in candidates]
+                )
+            self.seen_filter.add(figure.id, stored)
+        new_posts = [post_data for post_data in candidates if post_data['platform_post_id'] not in stored]
+
+        if self.on_poll_result is not None:
+            self.on_poll_result(batch.figure.id, [p['posted_at'] for p in new_posts])
+        if not new_posts and batch.cursor_post_id is None:
+            return []
+        return [PostBatch(batch.figure, new_posts, batch.cursor_post_id, batch.cursor_posted_at)]
+
+    async def _persist(self, batch: PostBatch) -> List[PostItem]:
+        figure = batch.figure
+        # Posts and the cursor that covers them go in the same transaction
+        posts = await self.writer.submit(lambda db: _store_batch(db, batch))
+
+        # Conflicting rows were stored by someone else, so they count as seen too
+        self.seen_filter.add(figure.id, [post_data['platform_post_id'] for post_data in batch.posts])
+        if posts:
+            print(f"💾 Saved {len(posts)} new posts from {figure.name}")
+        return [PostItem(figure, attach_author(figure, post), fetched_at=batch.fetched_at) for post in posts]
+
+    async def _score(self, item: PostItem) -> List[PostItem]:
+        analysis = await self.analyzer.score_post(item.post)
+        score = analysis['market_impact_score']
+
+        # Stored by the alert stage, together with the alert decision
+        item.post.impact_score = score
+        item.post.status = POST_STATUS_SCORED
+        item.analysis = analysis
+        print(f"🧠 Impact score: {score}")
+        return [item]
+
+    async def _alert(self, item: PostItem) -> List[PostItem]:
+        # A post is only marked scored in the same commit as its alert decision, so resume()
+        # never mistakes a post whose alert was lost for one already alerted on
+        score_row = (item.post.id, item.post.impact_score, item.analysis.get('score_source'))
+        if item.post.impact_score is not None and item.post.impact_score >= settings.ALERT_IMPACT_THRESHOLD:
+            alert = Alert(
+                post_id=item.post.id,
+                alert_type='high_priority',
+                message=f"High impact post from {item.figure.name}: {item.post.content[:100]}..."
+            )
+
+            def write(db: Session) -> Alert:
+                save_scores(db, [score_row])
+                return _store_alert(db, alert)
+
+            # The broadcast needs the alert's ID, so wait for its commit
+            item.alert = await self.writer.submit(write)
+            set_committed_value(item.alert, 'post', item.post)
+            print(f"🚨 High impact alert created for {item.figure.name}")
+        else:
+            # No alert to lose; if this write is lost the post stays pending and is resumed
+            self.writer.add_row(save_scores, score_row)
+        return [item]
+
+    async def _fanout(self, item: PostItem) -> List[PostItem]:
+        if item.alert is not None:
+            # Send notification
+            try:
+                await self.notifier.send_notification(item.alert)
+            except Exception as e:
+                print(f"⚠️ Notification failed: {e}")
+
+            await self.broadcast('new_alert', {
+                'id': item.alert.id,
+                'message': item.alert.message,
+                'alert_type': item.alert.alert_type
+            })
+            self.time_to_alert.append(time.monotonic() - item.fetched_at)
+
+        await self.broadcast('new_post', {
+            'id': item.post.id,
+            'content': item.post.content,
+            'author': item.figure.name,
+            'impact_score': item.post.impact_score
+        })
+        return [item]
+
+    async def _enrich(self, item: PostItem) -> None:
+        item.analysis = await self.analyzer.enrich_post(item.post, item.analysis)
+        self.writer.add_row(save_analyses, (item.post.id, item.analysis))
+        self.time_to_enrich.append(time.monotonic() - item.fetched_at)
+        print(f"📝 Enriched post {item.post.id} from {item.figure.name}")
+
+        await self.broadcast('post_enriched', {
+            'id': item.post.id,
+            'sentiment': item.analysis['sentiment'],
+            'summary': item.analysis['summary'],
+            'tags': item.analysis['tags'],
+            'context': item.analysis['context'],
+            'impact_score': item.post.impact_score
+        })
@@ -0,0 +1,171 @@
+import datetime
+import heapq
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database.models import MonitoredFigure, Post
+
+# Weight of the latest observation in the posting-rate moving average
+RATE_SMOOTHING = 0.3
+# Window of stored history used to seed posting rates at startup
+WARM_HISTORY_DAYS = 7
+# Number of recent detection latencies kept for the median
+LATENCY_SAMPLES = 500
+
+@dataclass
+class FigureSchedule:
+    """Polling state for one figure"""
+    figure: MonitoredFigure
+    priority: float
+    next_poll_at: float
+    posts_per_hour: float = 0.0
+    last_polled_at: Optional[float] = None
+    last_new_posts: int = 0
+    interval: float = 0.0
+    # When the poll handed out by due() started, until its result is recorded
+    in_flight_since: Optional[float] = None
+
+def _to_utc_naive(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+class PollScheduler:
+    """Decides when each figure is next polled from its posting rate, recent bursts and category priority"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.schedules: Dict[int, FigureSchedule] = {}
+        self.detection_latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.polls = 0
+
+    def priority_for(self, figure: MonitoredFigure) -> float:
+        """Priority multiplier from the figure's category"""
+        return settings.POLL_CATEGORY_PRIORITY.get(figure.category or "", 1.0)
+
+    def warm(self, db: Session):
+        """Seed posting rates from the posts stored over the last week"""
+        since = datetime.datetime.utcnow() - datetime.timedelta(days=WARM_HISTORY_DAYS)
+        counts = (
+            db.query(Post.author_id, func.count(Post.id))
+            .filter(Post.posted_at >= since)
+            .group_by(Post.author_id)
+            .all()
+        )
+        for author_id, count in counts:
+            schedule = self.schedules.get(author_id)
+            if schedule is not None:
+                schedule.posts_per_hour = count / (WARM_HISTORY_DAYS * 24)
+
+    def sync(self, figures: Iterable[MonitoredFigure]):
+        """Track newly added figures (due immediately) and forget removed ones"""
+        now = self.clock()
+        current = {}
+        for figure in figures:
+            schedule = self.schedules.get(figure.id)
+            if schedule is None:
+                schedule = FigureSchedule(
+                    figure=figure,
+                    priority=self.priority_for(figure),
+                    next_poll_at=now
+                )
+            else:
+                schedule.figure = figure
+                schedule.priority = self.priority_for(figure)
+            current[figure.id] = schedule
+        self.schedules = current
+
+    def due(self) -> List[MonitoredFigure]:
+        """Figures whose next poll time has passed and that have no poll outstanding, highest priority first.
+
+        A poll whose result never arrives stops holding its figure back after
+        POLL_MAX_INTERVAL_SECONDS.
+        """
+        now = self.clock()
+        due = [
+            s for s in self.schedules.values()
+            if s.next_poll_at <= now and (
+                s.in_flight_since is None or now - s.in_flight_since >= settings.POLL_MAX_INTERVAL_SECONDS
+            )
+        ]
+        due.sort(key=lambda s: (-s.priority, s.next_poll_at))
+        for schedule in due:
+            # Hold the figure back until its poll result comes in
+            schedule.in_flight_since = now
+            schedule.next_poll_at = now + self._interval(schedule)
+        return [s.figure for s in due]
+
+    def record(self, figure_id: int, new_posted_at: List[Optional[datetime.datetime]]):
+        """Update a figure's posting rate and next poll time after a poll"""
+        schedule = self.schedules.get(figure_id)
+        if schedule is None:
+            return
+        now = self.clock()
+        self.polls += 1
+
+        if schedule.last_polled_at is not None:
+            elapsed_hours = max(now - schedule.last_polled_at, 1.0) / 3600
+            observed = len(new_posted_at) / elapsed_hours
+            schedule.posts_per_hour = (
+                RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * schedule.posts_per_hour
+            )
+        schedule.last_polled_at = now
+        schedule.in_flight_since = None
+        schedule.last_new_posts = len(new_posted_at)
+        schedule.next_poll_at = now + self._interval(schedule)
+
+        utcnow = datetime.datetime.utcnow()
+        for posted_at in new_posted_at:
+            if posted_at is not None:
+                latency = (utcnow - _to_utc_naive(posted_at)).total_seconds()
+                self.detection_latencies.append(max(latency, 0.0))
+
+    def _interval(self, schedule: FigureSchedule) -> float:
+        if schedule.posts_per_hour > 0:
+            # Aim for roughly one new post per poll
+            interval = 3600 / schedule.posts_per_hour
+        else:
+            interval = settings.POLL_INTERVAL_SECONDS
+        if schedule.last_new_posts > 0:
+            # A figure that just posted is likely to post again soon
+            interval = min(interval, settings.POLL_BURST_INTERVAL_SECONDS)
+        interval /= schedule.priority
+        interval = min(max(interval, settings.POLL_MIN_INTERVAL_SECONDS), settings.POLL_MAX_INTERVAL_SECONDS)
+        schedule.interval = interval
+        return interval
+
+    def seconds_until_next(self) -> float:
+        """Time until the earliest scheduled poll"""
+        if not self.schedules:
+            return settings.POLL_INTERVAL_SECONDS
+        earliest = min(s.next_poll_at for s in self.schedules.values())
+        return max(earliest - self.clock(), 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Polling intervals and detection latency"""
+        intervals = [s.interval for s in self.schedules.values() if s.interval]
+        busiest = heapq.nlargest(5, self.schedules.values(), key=lambda s: s.posts_per_hour)
+        return {
+            "figures": len(self.schedules),
+            "polls": self.polls,
+            "median_interval_seconds": round(statistics.median(intervals), 1) if intervals else None,
+            "median_detection_latency_seconds": (
+                round(statistics.median(self.detection_latencies), 1)
+                if self.detection_latencies else None
+            ),
+            "next_poll_in_seconds": round(self.seconds_until_next(), 1),
+            "busiest": [
+                {
+                    "name": s.figure.name,
+                    "posts_per_hour": round(s.posts_per_hour, 3),
+                    "interval_seconds": round(s.interval, 1)
+                }
+                for s in busiest
+            ]
+        }
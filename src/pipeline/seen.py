@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database.models import Post
+
+class SeenPostFilter:
+    """Bounded LRU of (figure, platform_post_id) pairs known to be stored.
+
+    Consulted before the database in the dedupe stage. IDs are only added once
+    they are stored, so a hit can safely skip the post. Evicted IDs simply fall
+    through to the database check.
+    """
+
+    def __init__(self, max_ids: Optional[int] = None):
+        self.max_ids = max_ids if max_ids is not None else settings.SEEN_FILTER_MAX_IDS
+        self._ids: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def contains(self, figure_id: int, platform_post_id: str) -> bool:
+        """Check for a stored post, counting the hit or miss"""
+        key = (figure_id, platform_post_id)
+        if key in self._ids:
+            self._ids.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, figure_id: int, platform_post_ids: Iterable[str]):
+        """Record stored posts, evicting the least recently seen beyond the cap"""
+        for platform_post_id in platform_post_ids:
+            key = (figure_id, platform_post_id)
+            self._ids[key] = None
+            self._ids.move_to_end(key)
+        while len(self._ids) > self.max_ids:
+            self._ids.popitem(last=False)
+
+    def warm(self, db: Session):
+        """Load the most recent stored posts, newest ending up most recently used"""
+        rows = db.execute(
+            select(Post.author_id, Post.platform_post_id)
+            .order_by(Post.posted_at.desc())
+            .limit(self.max_ids)
+        ).all()
+        for author_id, platform_post_id in reversed(rows):
+            self._ids[(author_id, platform_post_id)] = None
+        print(f"🧮 Seen-post filter warmed with {len(self._ids)} IDs")
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, capacity and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._ids),
+            "max_ids": self.max_ids,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+# Window used for the rolling throughput figure in stage stats
+THROUGHPUT_WINDOW_SECONDS = 60.0
+
+class Stage:
+    """A pipeline stage: a bounded queue drained by a fixed number of workers.
+
+    The handler receives one item and returns the items to hand to the next
+    stage (or None). Handing off awaits the next stage's bounded queue, so a
+    slow downstream stage applies backpressure to everything in front of it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[Optional[Iterable[Any]]]],
+        workers: int = 1,
+        queue_size: int = 100
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.next_stage: Optional["Stage"] = None
+
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._completed_at: deque = deque()
+        self._tasks: List[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+
+    def start(self):
+        """Spawn the stage workers"""
+        if self._tasks:
+            return
+        self._started_at = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Cancel the stage workers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def put(self, item: Any):
+        """Enqueue an item, waiting while the queue is full"""
+        await self.queue.put(item)
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            started = time.monotonic()
+            try:
+                outputs = await self.handler(item)
+                if outputs and self.next_stage is not None:
+                    for output in outputs:
+                        await self.next_stage.put(output)
+                        self.emitted += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ {self.name} stage failed: {e}")
+            finally:
+                finished = time.monotonic()
+                self.processed += 1
+                self.busy_seconds += finished - started
+                self._completed_at.append(finished)
+                self._trim_completed(finished)
+                self.queue.task_done()
+
+    def _trim_completed(self, now: float):
+        # Trimmed on every append too, so the window stays bounded even if stats are never read
+        cutoff = now - THROUGHPUT_WINDOW_SECONDS
+        while self._completed_at and self._completed_at[0] < cutoff:
+            self._completed_at.popleft()
+
+    def _recent_throughput(self) -> float:
+        self._trim_completed(time.monotonic())
+        return len(self._completed_at) / THROUGHPUT_WINDOW_SECONDS
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth and throughput counters for this stage"""
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "items_per_sec": round(self._recent_throughput(), 3),
+            "avg_item_seconds": round(self.busy_seconds / self.processed, 4) if self.processed else None,
+            "uptime_seconds": round(uptime, 1)
+        }
@@ -0,0 +1,144 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# A write is a function run against the batch's session; its return value resolves the caller's future
+Write = Callable[[Session], Any]
+# A bulk write gets every row queued for it in a batch at once, e.g. to save them in one executemany
+BulkWrite = Callable[[Session, List[Any]], Any]
+
+class WriteBatcher:
+    """The ingest pipeline's single writer: coalesces writes from every stage into group commits.
+
+    An idle writer starts a transaction right away, taking every write queued
+    in the same loop iteration. While one is being written, writes pile into
+    the next batch, which goes once `max_items` are waiting or `max_wait_ms`
+    after the first arrived, whichever is first. Writes run in the order they
+    were queued, then each bulk write runs once with all of its rows. If a
+    batch fails, its writes and rows are retried one transaction each so one
+    bad row can't sink the rest.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], max_items: int, max_wait_ms: float):
+        self.session_factory = session_factory
+        self.max_items = max_items
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[Write, Optional[asyncio.Future]]] = []
+        self._rows: Dict[BulkWrite, List[Any]] = {}
+        self._row_count = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writes: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+
+        self.flushes = 0
+        self.rows = 0
+        self.retries = 0
+        self.errors = 0
+
+    def submit(self, write: Write) -> asyncio.Future:
+        """Queue a write; the future resolves with its result once its transaction commits"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((write, future))
+        self._queued()
+        return future
+
+    def add(self, write: Write):
+        """Queue a write nobody waits for; failures are reported and counted"""
+        self._pending.append((write, None))
+        self._queued()
+
+    def add_row(self, write: BulkWrite, row: Any):
+        """Queue a row nobody waits for, to be saved by one call of `write` with the rest of the batch's rows"""
+        self._rows.setdefault(write, []).append(row)
+        self._row_count += 1
+        self._queued()
+
+    def _queued(self):
+        idle = not self._lock.locked() and not self._writes
+        if idle or len(self._pending) + self._row_count >= self.max_items:
+            self._write_soon()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._write_soon)
+
+    async def flush(self):
+        """Write everything waiting now, and wait for batches already being written"""
+        await self._write_pending()
+        if self._writes:
+            await asyncio.gather(*self._writes)
+
+    def _write_soon(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = asyncio.create_task(self._write_pending())
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write_pending(self):
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending and not self._rows:
+                return
+            batch, self._pending = self._pending, []
+            rows, self._rows = self._rows, {}
+            size = len(batch) + self._row_count
+            self._row_count = 0
+
+            try:
+                results = await self._commit([write for write, _ in batch], rows)
+            except Exception as e:
+                print(f"⚠️ Writing a batch of {size} failed, retrying one at a time: {e}")
+                self.retries += 1
+                for write, future in batch:
+                    await self._write_one(write, future)
+                for write, bulk in rows.items():
+                    for row in bulk:
+                        await self._write_one(lambda db, row=row, write=write: write(db, [row]), None)
+                return
+
+            self.flushes += 1
+            self.rows += size
+            for (_, future), result in zip(batch, results):
+                if future is not None and not future.done():
+                    future.set_result(result)
+
+    async def _write_one(self, write: Write, future: Optional[asyncio.Future]):
+        try:
+            [result] = await self._commit([write], {})
+        except Exception as e:
+            self.errors += 1
+            if future is None:
+                print(f"⚠️ Pipeline write failed: {e}")
+            elif not future.done():
+                future.set_exception(e)
+            return
+        self.flushes += 1
+        self.rows += 1
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    async def _commit(self, writes: List[Write], rows: Dict[BulkWrite, List[Any]]) -> List[Any]:
+        def write_batch(session: Session) -> List[Any]:
+            results = [write(session) for write in writes]
+            for write, bulk in rows.items():
+                write(session, bulk)
+            return results
+
+        async with self.session_factory() as db:
+            results = await db.run_sync(write_batch)
+            await db.commit()
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Transactions written and how many writes each carried"""
+        return {
+            "pending": len(self._pending) + self._row_count,
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.flushes, 2) if self.flushes else None,
+            "retries": self.retries,
+            "errors": self.errors
+        }
@@ -1,8 +1,17 @@
 import os
 import pytest
+import pytest_asyncio
+
+# Keep analysis caches out of the working tree and fresh for every test run
+os.environ.setdefault("ANALYSIS_CACHE_PATH", ":memory:")
+# and locally trained impact models out of the tests
+os.environ.setdefault("LOCAL_MODEL_PATH", "")
+
 from unittest.mock import MagicMock
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from src.database.connection import async_url
 from src.database.models import Base
 from src.config import settings
 
@@ -22,6 +31,33 @@ def test_db():
         db.close()
         Base.metadata.drop_all(engine)
 
+@pytest.fixture
+def database_url(tmp_path):
+    """A fresh database file, shared by the sync and async session factories"""
+    return f"sqlite:///{tmp_path / 'test.db'}"
+
+@pytest.fixture
+def session_factory(database_url):
+    """Session factory over a fresh database, for code that opens its own sessions"""
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        # Test sessions left open for reading must not block the code under test writing
+        conn.exec_driver_sql("PRAGMA journal_mode=wal")
+    try:
+        yield sessionmaker(bind=engine)
+    finally:
+        engine.dispose()
+
+@pytest_asyncio.fixture
+async def async_session_factory(session_factory, database_url):
+    """Async session factory over the same database as `session_factory`"""
+    engine = create_async_engine(async_url(database_url))
+    try:
+        yield async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
 @pytest.fixture
 def mock_twitter_api():
     """Mock Twitter API responses"""
@@ -1,7 +1,20 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+import numpy as np
 import pytest
-from unittest.mock import patch
-from src.analyzers.ai_analyzer import AIAnalyzer
+from unittest.mock import patch, MagicMock
+from src.analyzers.ai_analyzer import AIAnalyzer, parse_batch_scores, parse_combined_analysis
+from src.analyzers.batcher import ImpactScoreBatcher
+from src.analyzers.cache import AnalysisCache, content_key
+from src.analyzers.executor import ModelExecutor
+from src.analyzers.local_model import ImpactModel, load_model, load_training_data, train
+from src.analyzers.neardup import NearDuplicateIndex
+from src.analyzers.prefilter import RelevancePrefilter
+from src.analyzers.router import Deadline, HedgedRouter
 from src.database.models import Post, MonitoredFigure
+from src.config import settings
 
 @pytest.mark.asyncio
 async def test_market_impact_analysis(mock_nemotron_response, test_db):
@@ -53,3 +66,339 @@ async def test_context_generation(mock_gemini_response):
         context = await analyzer._generate_context(post)
         assert len(context) > 0
         assert "market" in context.lower()
+
+@pytest.mark.asyncio
+async def test_repeated_content_served_from_cache(mock_nemotron_response, mock_gemini_response):
+    """Identical content from the same author is analyzed once"""
+    with patch('httpx.AsyncClient.post') as mock_post, \
+         patch('google.generativeai.GenerativeModel.generate_content') as mock_generate:
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = mock_nemotron_response
+        mock_generate.return_value = mock_gemini_response
+        
+        analyzer = AIAnalyzer()
+        author = MonitoredFigure(name="Jerome Powell", title="Federal Reserve Chairman", platform="twitter", platform_id="federalreserve")
+        first = Post(content="Rates are going up. https://t.co/abc", author=author)
+        repost = Post(content="RT @federalreserve: Rates are going  up. https://t.co/xyz", author=author)
+        
+        result = await analyzer.analyze_post(first)
+        calls = mock_post.call_count + mock_generate.call_count
+        cached = await analyzer.analyze_post(repost)
+        
+        assert cached == result
+        assert mock_post.call_count + mock_generate.call_count == calls
+        stats = analyzer.stats()['cache']
+        assert stats['memory_hits'] == 1
+        assert stats['dollars_saved'] > 0
+
+def test_analysis_cache_disk_tier(tmp_path):
+    """The SQLite tier survives restarts and honours its TTL"""
+    path = str(tmp_path / "cache.db")
+    key = content_key("Rates are going up", "twitter:federalreserve")
+    cache = AnalysisCache(path=path, memory_size=10, ttl_seconds=60, max_rows=10)
+    cache.put(key, {'market_impact_score': 0.9})
+    cache.close()
+    
+    restarted = AnalysisCache(path=path, memory_size=10, ttl_seconds=60, max_rows=10)
+    assert restarted.get(key) == {'market_impact_score': 0.9}
+    assert restarted.stats()['disk_hits'] == 1
+    restarted.close()
+    
+    expired = AnalysisCache(path=path, memory_size=10, ttl_seconds=0, max_rows=10)
+    assert expired.get(key) is None
+    expired.close()
+
+@pytest.mark.asyncio
+async def test_combined_analysis_single_call():
+    """Combined mode gets the whole analysis from one structured model call"""
+    combined = {
+        "sentiment": {"label": "negative", "score": 0.7},
+        "market_impact_score": 0.85,
+        "summary": "The Fed is raising rates by 25 basis points.",
+        "tags": ["interest rate", "Policy", "weather"],
+        "context": "Rate hikes tighten financial conditions and weigh on equity markets."
+    }
+    with patch('httpx.AsyncClient.post') as mock_post, \
+         patch('google.generativeai.GenerativeModel.generate_content') as mock_generate, \
+         patch.object(settings, 'ANALYSIS_MODE', 'combined'):
+        mock_post.return_value = MagicMock(
+            status_code=200,
+            json=lambda: {"choices": [{"message": {"content": json.dumps(combined)}}]}
+        )
+        
+        analyzer = AIAnalyzer()
+        author = MonitoredFigure(name="Jerome Powell", title="Federal Reserve Chairman")
+        post = Post(content="We are increasing interest rates by 25 basis points.", author=author)
+        
+        result = await analyzer.analyze_post(post)
+        
+        assert mock_post.call_count == 1
+        mock_generate.assert_not_called()
+        assert result['market_impact_score'] == 0.85
+        assert result['tags'] == ["interest rate", "policy"]
+        assert analyzer.stats()['modes']['combined']['posts'] == 1
+
+def test_combined_analysis_rejects_malformed_output():
+    """Responses that don't fit the schema fall back to per-field calls"""
+    assert parse_combined_analysis('{"label": "negative", "score": 0.8}') is None
+    assert parse_combined_analysis('not json') is None
+    fenced = '```json\n{"sentiment": {"label": "Positive", "score": 2}, "market_impact_score": 0.1, "summary": "s", "tags": [], "context": "c"}\n```'
+    result = parse_combined_analysis(fenced)
+    assert result['sentiment'] == {'label': 'positive', 'score': 1.0}
+
+@pytest.mark.asyncio
+async def test_impact_scores_micro_batched():
+    """Concurrent score requests share one multi-item call; a lone request goes straight out"""
+    batch_sizes = []
+    deadlines = {}
+    
+    async def score_one(post, deadline):
+        deadlines[post.content] = deadline
+        await asyncio.sleep(0.01)
+        return 0.1
+    
+    async def score_batch(posts, deadline):
+        batch_sizes.append(len(posts))
+        deadlines['batch'] = deadline
+        # Leave the last item unanswered to exercise the per-item fallback
+        return [0.9] * (len(posts) - 1) + [None]
+    
+    batcher = ImpactScoreBatcher(score_batch, score_one, max_items=8, max_wait_ms=5, deadline_seconds=10)
+    posts = [Post(content=f"Post {i}") for i in range(6)]
+    scores = await asyncio.gather(*(batcher.score(post) for post in posts))
+    
+    # The first request found the batcher idle and went alone
+    assert batch_sizes == [5]
+    assert scores == [0.1, 0.9, 0.9, 0.9, 0.9, 0.1]
+    assert batcher.stats()['fallbacks'] == 1
+    # The fallback spends what's left of the batch's deadline rather than starting a new one
+    assert deadlines["Post 5"] is deadlines['batch']
+    
+    assert parse_batch_scores("[0.2, 1.5]", 2) == [0.2, 1.0]
+    assert parse_batch_scores("[0.2]", 2) == [None, None]
+
+@pytest.mark.asyncio
+async def test_irrelevant_posts_scored_locally():
+    """The local tier answers plainly irrelevant posts without any network call"""
+    with patch('httpx.AsyncClient.post') as mock_post, \
+         patch('google.generativeai.GenerativeModel.generate_content') as mock_generate:
+        analyzer = AIAnalyzer()
+        author = MonitoredFigure(name="Tim Cook", title="CEO of Apple")
+        post = Post(content="Happy Thanksgiving to everyone celebrating today!", author=author)
+        
+        result = await analyzer.analyze_post(post)
+        
+        mock_post.assert_not_called()
+        mock_generate.assert_not_called()
+        assert result['market_impact_score'] < settings.PREFILTER_THRESHOLD
+        assert analyzer.stats()['tiers']['by_tier']['local'] == 1
+
+def test_prefilter_flags_market_content():
+    """Market vocabulary, cashtags and figures push posts to the model tier"""
+    prefilter = RelevancePrefilter(["interest rate", "AI"])
+    
+    assert prefilter.is_candidate("We are raising the interest rate by 25 basis points")[0]
+    assert prefilter.is_candidate("$TSLA up 5% after the announcement")[0]
+    assert prefilter.is_candidate("Our new AI model ships next week")[0]
+    assert not prefilter.is_candidate("Said hi to my dog this morning")[0]
+    # Whole words only
+    assert not prefilter.is_candidate("Feeding the fedora collection")[0]
+
+def test_local_model_learns_stored_scores(tmp_path):
+    """The hashed n-gram model ranks posts like the scores it was trained on and round-trips to disk"""
+    high = [f"Fed announces rate hike of {i} basis points, markets brace" for i in range(20)]
+    low = [f"Great game last night, congrats to team {i}" for i in range(20)]
+    model = train(high + low, [0.9] * 20 + [0.1] * 20, n_features=2 ** 12, epochs=200)
+    
+    scores = model.score_batch(["Fed signals another rate hike", "Congrats to the team on the game"])
+    assert scores[0] > 0.6 > 0.4 > scores[1]
+    
+    path = str(tmp_path / "impact_model.npz")
+    model.save(path)
+    loaded = load_model(path)
+    assert list(loaded.score_batch(["Fed signals another rate hike"])) == [scores[0]]
+    assert load_model(str(tmp_path / "missing.npz")) is None
+
+def test_local_model_trains_only_on_llm_scores(test_db):
+    """Scores from the pre-filter and the local model itself are left out of its training data"""
+    author = MonitoredFigure(name="Jerome Powell", title="Fed Chair", platform="twitter", platform_id="federalreserve")
+    test_db.add(author)
+    test_db.add_all(
+        Post(platform_post_id=str(i), content=f"Post {i}", author=author, posted_at=datetime(2025, 6, 7),
+             impact_score=score, impact_score_source=source)
+        for i, (score, source) in enumerate([(0.9, 'model'), (0.2, 'local'), (0.7, None), (0.5, None)])
+    )
+    test_db.commit()
+    
+    contents, targets, authors = load_training_data(test_db)
+    assert (contents, targets, authors) == (["Post 0"], [0.9], ["twitter:federalreserve"])
+    # Scores saved before sources were recorded can be let in, except the old neutral fallback
+    assert load_training_data(test_db, include_unlabelled=True)[1] == [0.9, 0.7]
+
+@pytest.mark.asyncio
+async def test_local_model_replaces_neutral_fallback():
+    """When Nemotron fails, impact scores come from the local model instead of a flat 0.5"""
+    model = ImpactModel(weights=np.zeros(16), bias=2.0)
+    with patch('httpx.AsyncClient.post', side_effect=Exception("timeout")) as mock_post, \
+         patch('google.generativeai.GenerativeModel.generate_content'):
+        analyzer = AIAnalyzer(local_model=model)
+        author = MonitoredFigure(name="Jerome Powell", title="Fed Chair")
+        posts = [Post(content=f"Inflation and interest rate outlook, part {i}", author=author) for i in range(3)]
+        
+        scores = await analyzer._score_batch(posts)
+        single = await analyzer._score_single(posts[0])
+        # With the batch's deadline nearly spent, the models aren't tried again
+        calls = mock_post.call_count
+        late = await analyzer._score_single(posts[1], Deadline(0.01))
+        assert mock_post.call_count == calls
+    
+    # Scores from the local model say so, and are never used to train it
+    assert scores == [(0.881, 'local')] * 3
+    assert single == late == (0.881, 'local')
+    assert analyzer.stats()['local_model']['posts'] == 5
+
+@pytest.mark.asyncio
+async def test_model_executor_caps_and_deadlines():
+    """Calls beyond a model's cap queue for a slot, and an overrun holds its slot until the thread ends"""
+    executor = ModelExecutor(max_workers=4, limits={"slow-model": 2}, timeout=1.0)
+    running, peak = [0], [0]
+    
+    def call(seconds):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        time.sleep(seconds)
+        running[0] -= 1
+        return seconds
+    
+    results = await asyncio.gather(*(executor.run("slow-model", call, 0.05) for _ in range(6)))
+    assert results == [0.05] * 6
+    assert peak[0] == 2
+    stats = executor.stats()["models"]["slow-model"]
+    assert stats["calls"] == 6 and stats["limit"] == 2
+    # The last pair waited for two earlier rounds to finish
+    assert stats["queue_wait_seconds"]["p95"] >= 0.08
+    
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.run("slow-model", call, 0.3, timeout=0.05)
+    assert executor.stats()["models"]["slow-model"]["running"] == 1
+    await asyncio.sleep(0.4)
+    assert executor.stats()["models"]["slow-model"]["running"] == 0
+    assert executor.stats()["models"]["slow-model"]["timeouts"] == 1
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_two_phase_scoring_then_enrichment():
+    """score_post makes only the impact call; enrich_post fills in the rest and keeps that score"""
+    with patch('httpx.AsyncClient.post'), patch('google.generativeai.GenerativeModel.generate_content'):
+        analyzer = AIAnalyzer()
+    author = MonitoredFigure(name="Jerome Powell", title="Fed Chair", platform="twitter", platform_id="federalreserve")
+    post = Post(content="The Fed will raise the interest rate by 50 basis points", author=author)
+    full = {
+        'sentiment': {'label': 'negative', 'score': 0.7}, 'summary': "Rate hike",
+        'tags': ['interest rate'], 'market_impact_score': 0.4, 'context': "Fed policy"
+    }
+    
+    with patch.object(analyzer, '_impact_score', return_value=(0.85, 'model')) as score_call, \
+         patch.object(analyzer, '_analyze_uncached', return_value=dict(full)) as enrich_call:
+        scored = await analyzer.score_post(post)
+        assert scored == {'market_impact_score': 0.85, 'score_source': 'model'}
+        enrich_call.assert_not_called()
+        
+        enriched = await analyzer.enrich_post(post, scored)
+        assert enriched['summary'] == "Rate hike"
+        assert (enriched['market_impact_score'], enriched['score_source']) == (0.85, 'model')
+        assert enrich_call.await_args.kwargs == {'impact_score': 0.85, 'score_source': 'model'}
+        
+        # The enriched analysis is cached, so the next copy is complete in phase one
+        assert await analyzer.score_post(post) == enriched
+        score_call.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_hedged_router_takes_first_answer_within_deadline():
+    """A slow primary is hedged after the delay and cancelled; failures fail over; the deadline bounds everything"""
+    cancelled = []
+    
+    def route(name, delay, result=None, error=None):
+        async def call(value, deadline):
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+            if error:
+                raise error
+            return result
+        return call
+    
+    router = HedgedRouter('test', route('slow', 1.0, 0.9), route('fast', 0.01, 0.4),
+                          deadline_seconds=2.0, quantile=0.95, default_delay=0.05)
+    started = time.monotonic()
+    assert await router.call("post") == 0.4
+    assert time.monotonic() - started < 0.5
+    await asyncio.sleep(0)
+    assert cancelled == ['slow']
+    assert router.stats()['hedges'] == 1 and router.stats()['wins']['secondary'] == 1
+    
+    # A primary that answers before the hedge delay never starts the secondary
+    router = HedgedRouter('test', route('quick', 0.01, 0.7), route('never', 0.01, 0.1),
+                          deadline_seconds=2.0, quantile=0.95, default_delay=0.5)
+    assert await router.call("post") == 0.7
+    assert router.stats()['hedges'] == 0
+    
+    # A failing primary hands over at once instead of waiting out the delay
+    router = HedgedRouter('test', route('down', 0, error=RuntimeError("503")), route('backup', 0.01, 0.3),
+                          deadline_seconds=2.0, quantile=0.95, default_delay=5.0)
+    assert await router.call("post") == 0.3
+    assert router.stats()['failovers'] == 1
+    
+    router = HedgedRouter('test', route('slow', 1.0, 0.9), route('slower', 1.0, 0.9),
+                          deadline_seconds=0.1, quantile=0.95, default_delay=0.02)
+    started = time.monotonic()
+    assert await router.call("post") is None
+    assert time.monotonic() - started < 0.3
+    assert router.stats()['deadline_exceeded'] == 1
+
+def test_near_duplicate_index_matches_and_evicts():
+    """Lightly edited text finds the earlier analysis; different text doesn't; entries expire and are capped"""
+    now = [0.0]
+    index = NearDuplicateIndex(max_distance=6, max_entries=2, ttl_seconds=60, clock=lambda: now[0])
+    statement = "We are raising the federal funds rate by 25 basis points to fight inflation. Markets should expect more."
+    index.add(statement, {'market_impact_score': 0.9}, cluster_id=7)
+    
+    match = index.lookup("RT @federalreserve: " + statement + " #Fed")
+    assert match is not None and match.cluster_id == 7
+    assert match.analysis == {'market_impact_score': 0.9}
+    assert index.lookup("We are cutting the federal funds rate by 50 basis points to support jobs.") is None
+    
+    now[0] = 61.0
+    assert index.lookup(statement) is None
+    assert len(index) == 0
+    
+    for i in range(3):
+        index.add(f"Statement number {i} about quarterly earnings guidance", {'i': i})
+    assert len(index) == 2
+    assert index.stats()['evicted'] == 2
+
+@pytest.mark.asyncio
+async def test_near_duplicate_posts_reuse_analysis():
+    """A repost of an analyzed statement by another figure gets its analysis and cluster without model calls"""
+    with patch('httpx.AsyncClient.post'), patch('google.generativeai.GenerativeModel.generate_content'):
+        analyzer = AIAnalyzer()
+    statement = "We are raising the federal funds rate by 25 basis points to fight inflation. Markets should expect more."
+    original = Post(id=11, content=statement,
+                    author=MonitoredFigure(name="Jerome Powell", title="Fed Chair", platform="twitter", platform_id="federalreserve"))
+    repost = Post(id=12, content=f"RT @federalreserve: {statement} #Fed",
+                  author=MonitoredFigure(name="Janet Yellen", title="Treasury Secretary", platform="twitter", platform_id="yellen"))
+    full = {
+        'sentiment': {'label': 'negative', 'score': 0.7}, 'summary': "Rate hike",
+        'tags': ['interest rate'], 'market_impact_score': 0.9, 'context': "Fed policy"
+    }
+    
+    with patch.object(analyzer, '_analyze_uncached', return_value=dict(full)) as model_call:
+        first = await analyzer.analyze_post(original)
+        second = await analyzer.analyze_post(repost)
+    
+    model_call.assert_awaited_once()
+    assert first['cluster_id'] == 11
+    assert second == first
+    assert analyzer.stats()['tiers']['by_tier']['near_duplicate'] == 1
@@ -1,7 +1,17 @@
 import pytest
 from datetime import datetime, timedelta
 from src.database.models import Post, MonitoredFigure, Watchlist, Alert
-from sqlalchemy import desc
+from sqlalchemy import desc, func, select, text
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy.exc import OperationalError
+from src.database.bulk import existing_post_ids, insert_posts, save_analyses, save_scores
+from src.database.connection import (
+    create_async_reader_engine, create_async_writer_engine, create_reader_engine, create_writer_engine
+)
+from src.database.migrate import current_revision, downgrade, include_name, upgrade
+from src.database.models import Base
+from src.database.search import match_expression, search_posts
 
 def test_post_logging(test_db):
     """Test real-time post logging (FR004)"""
@@ -96,3 +106,282 @@ def test_historical_search(test_db):
         desc(Post.impact_score)
     ).all()
     assert sorted_posts[0].impact_score > sorted_posts[-1].impact_score
+
+def test_bulk_insert_skips_existing_posts(test_db):
+    """Batched dedupe and insert-or-ignore of fetched posts"""
+    author = MonitoredFigure(
+        name="Jerome Powell",
+        title="Federal Reserve Chairman",
+        platform="twitter",
+        platform_id="federalreserve"
+    )
+    test_db.add(author)
+    test_db.commit()
+    
+    def fetched(post_id):
+        return {'platform_post_id': post_id, 'content': f"Post {post_id}", 'posted_at': datetime.utcnow()}
+    
+    inserted = insert_posts(test_db, author, [fetched("1"), fetched("2"), fetched("2")])
+    test_db.commit()
+    assert sorted(p.platform_post_id for p in inserted) == ["1", "2"]
+    assert all(p.id is not None for p in inserted)
+    
+    assert existing_post_ids(test_db, "twitter", ["1", "2", "3"]) == {"1", "2"}
+    
+    # Re-inserting an overlapping batch only adds the new post
+    inserted = insert_posts(test_db, author, [fetched("2"), fetched("3")])
+    test_db.commit()
+    assert [p.platform_post_id for p in inserted] == ["3"]
+    assert test_db.query(Post).count() == 3
+
+def test_save_scores_keeps_enriched_status(test_db):
+    """Scores saved after a post's analysis don't send it back to 'scored'"""
+    author = MonitoredFigure(name="Jerome Powell", title="Fed Chair", platform="twitter", platform_id="federalreserve")
+    test_db.add(author)
+    test_db.commit()
+    first, second = insert_posts(test_db, author, [
+        {'platform_post_id': post_id, 'content': f"Post {post_id}", 'posted_at': datetime.utcnow()}
+        for post_id in ("1", "2")
+    ])
+    save_analyses(test_db, [(second.id, {'summary': "Rates", 'tags': []})])
+    save_scores(test_db, [(first.id, 0.4, 'local'), (second.id, 0.9, 'model')])
+    test_db.commit()
+
+    first, second = test_db.get(Post, first.id), test_db.get(Post, second.id)
+    assert (first.impact_score, first.impact_score_source, first.status) == (0.4, 'local', 'scored')
+    assert (second.impact_score, second.impact_score_source, second.status) == (0.9, 'model', 'enriched')
+
+def test_engines_apply_pragmas_on_every_connection(tmp_path):
+    """The writer and the pooled readers both get the tuning pragmas; readers can't write"""
+    url = f"sqlite:///{tmp_path / 'monitor.db'}"
+    pragmas = {"journal_mode": "wal", "synchronous": "NORMAL", "mmap_size": 1 << 20, "busy_timeout": 1234}
+    writer = create_writer_engine(url, pragmas)
+    reader = create_reader_engine(url, pragmas, pool_size=2)
+    Base.metadata.create_all(writer)
+    
+    with writer.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA mmap_size")).scalar() == 1 << 20
+    
+    connections = [reader.connect() for _ in range(2)]
+    try:
+        for conn in connections:
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError):
+            connections[0].execute(text("INSERT INTO watchlists (name) VALUES ('blocked')"))
+    finally:
+        for conn in connections:
+            conn.close()
+        writer.dispose()
+        reader.dispose()
+
+@pytest.mark.asyncio
+async def test_async_engines_apply_pragmas(tmp_path):
+    """The aiosqlite engines get the same pragmas, and their readers can't write either"""
+    url = f"sqlite:///{tmp_path / 'monitor.db'}"
+    pragmas = {"journal_mode": "wal", "busy_timeout": 1234}
+    writer = create_async_writer_engine(url, pragmas)
+    reader = create_async_reader_engine(url, pragmas, pool_size=2)
+    try:
+        async with writer.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            await conn.execute(text("INSERT INTO watchlists (name) VALUES ('macro')"))
+        
+        async with reader.connect() as conn:
+            assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 1234
+            assert (await conn.execute(text("SELECT name FROM watchlists"))).scalar() == "macro"
+            with pytest.raises(OperationalError):
+                await conn.execute(text("INSERT INTO watchlists (name) VALUES ('blocked')"))
+    finally:
+        await writer.dispose()
+        await reader.dispose()
+
+def _query_plan(conn, statement):
+    sql = str(statement.compile(conn, compile_kwargs={"literal_binds": True}))
+    return " | ".join(row[3] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+def test_migrations_build_the_model_schema(tmp_path):
+    """Upgrading an empty database gives exactly the tables and indexes the models declare"""
+    engine = create_writer_engine(f"sqlite:///{tmp_path / 'monitor.db'}")
+    try:
+        upgrade(engine)
+        assert current_revision(engine) == "0005"
+        with engine.connect() as conn:
+            context = MigrationContext.configure(conn, opts={"include_name": include_name})
+            assert compare_metadata(context, Base.metadata) == []
+        
+        # and the chain downgrades cleanly
+        downgrade(engine, "0001")
+        assert current_revision(engine) == "0001"
+        upgrade(engine)
+        assert current_revision(engine) == "0005"
+    finally:
+        engine.dispose()
+
+def test_upgrade_adopts_unversioned_database(tmp_path):
+    """A database created by create_all before migrations is stamped at the baseline and upgraded in place"""
+    engine = create_writer_engine(f"sqlite:///{tmp_path / 'monitor.db'}")
+    try:
+        upgrade(engine, "0001")
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+            conn.execute(text(
+                "INSERT INTO monitored_figures (id, name, platform, platform_id) VALUES (1, 'Trump', 'truth_social', 'realDonaldTrump')"
+            ))
+            conn.execute(text(
+                "INSERT INTO posts (platform_post_id, content, author_id, posted_at, impact_score) VALUES "
+                "('1', 'Tariffs', 1, '2025-01-01 00:00:00', 0.9), ('2', 'Hello', 1, '2025-01-02 00:00:00', NULL)"
+            ))
+        assert current_revision(engine) is None
+        
+        upgrade(engine)
+        assert current_revision(engine) == "0005"
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT platform_post_id, platform, status FROM posts ORDER BY id")).all()
+            indexed = conn.execute(text("SELECT rowid FROM posts_fts WHERE posts_fts MATCH 'tariffs'")).scalars().all()
+        # Already scored posts aren't re-alerted on; unscored ones are picked up by resume
+        assert [tuple(row) for row in rows] == [("1", "truth_social", "enriched"), ("2", "truth_social", "pending")]
+        # Posts stored before the search index existed are searchable
+        assert indexed == [1]
+    finally:
+        engine.dispose()
+
+def test_hot_queries_use_indexes(tmp_path):
+    """The API and pipeline queries are answered from indexes, without sorting posts or alerts"""
+    engine = create_writer_engine(f"sqlite:///{tmp_path / 'monitor.db'}")
+    try:
+        upgrade(engine)
+        since = datetime(2025, 1, 1)
+        plans = {}
+        with engine.connect() as conn:
+            for name, statement in {
+                "latest": select(Post).order_by(Post.posted_at.desc()).limit(10),
+                "latest_min_impact": select(Post).where(Post.impact_score >= 0.5).order_by(Post.posted_at.desc()).limit(10),
+                "latest_by_status": select(Post).where(Post.status == "scored").order_by(Post.posted_at.desc()).limit(10),
+                "dashboard": select(Post).join(MonitoredFigure).order_by(Post.posted_at.desc()).limit(10),
+                "resume": select(Post).where(Post.status.in_(["pending", "scored"])).where(Post.id > 0).order_by(Post.id).limit(500),
+                "figure_posts": select(Post).where(Post.author_id == 1).order_by(Post.posted_at.desc()),
+                "posting_rates": select(Post.author_id, func.count(Post.id)).where(Post.posted_at >= since).group_by(Post.author_id),
+                "dedupe": select(Post.platform_post_id).where(Post.platform == "twitter").where(Post.platform_post_id.in_(["1", "2"])),
+                "alerts": select(Alert).order_by(Alert.sent_at.desc()).limit(10),
+                "alerts_by_type": select(Alert).where(Alert.alert_type == "market_impact").order_by(Alert.sent_at.desc()).limit(10),
+                "post_alerts": select(Alert).where(Alert.post_id == 1),
+            }.items():
+                plans[name] = _query_plan(conn, statement)
+        
+        assert plans["latest"] == "SCAN posts USING INDEX ix_posts_posted_at"
+        assert plans["latest_min_impact"] == "SCAN posts USING INDEX ix_posts_posted_at"
+        assert plans["latest_by_status"] == "SEARCH posts USING INDEX ix_posts_status_posted_at (status=?)"
+        assert plans["dashboard"].startswith("SCAN posts USING INDEX ix_posts_posted_at")
+        assert "SEARCH posts USING INDEX ix_posts_status_posted_at (status=?)" in plans["resume"]
+        assert plans["figure_posts"] == "SEARCH posts USING INDEX ix_posts_author_id_posted_at (author_id=?)"
+        assert "COVERING INDEX ix_posts_author_id_posted_at" in plans["posting_rates"]
+        assert plans["dedupe"] == "SEARCH posts USING COVERING INDEX uq_posts_platform_post_id (platform=? AND platform_post_id=?)"
+        assert plans["alerts"] == "SCAN alerts USING INDEX ix_alerts_sent_at"
+        assert plans["alerts_by_type"] == "SEARCH alerts USING INDEX ix_alerts_alert_type_sent_at (alert_type=?)"
+        assert plans["post_alerts"] == "SEARCH alerts USING INDEX ix_alerts_post_id (post_id=?)"
+    finally:
+        engine.dispose()
+
+def test_match_expression_quotes_terms():
+    """Phrases and prefixes are honoured; FTS5 syntax in the query is searched for literally"""
+    assert match_expression('"rate cut" infl* powell') == '"rate cut" AND "infl"* AND "powell"'
+    assert match_expression('NOT tariffs NEAR "') == '"NOT" AND "tariffs" AND "NEAR"'
+    assert match_expression('say "he said ""no"""') == '"say" AND "he said " AND "no"'
+    assert match_expression('* - "') is None
+    # Stopwords only count when they are all there is, or are part of a phrase
+    assert match_expression('cut the rate') == '"cut" AND "rate"'
+    assert match_expression('"cut the rate" the') == '"cut the rate"'
+    assert match_expression('To the') == '"To" AND "the"'
+
+def test_search_posts(test_db):
+    """Full-text search over post content and analyses, with figure and date filters, kept in sync by triggers"""
+    powell = MonitoredFigure(name="Jerome Powell", title="Fed Chair", platform="twitter", platform_id="federalreserve")
+    trump = MonitoredFigure(name="Donald Trump", title="President", platform="truth_social", platform_id="realDonaldTrump")
+    test_db.add_all([powell, trump])
+    test_db.commit()
+    start = datetime(2025, 1, 1)
+    posts = insert_posts(test_db, powell, [
+        {'platform_post_id': "1", 'content': "Rate cut likely as inflation cools", 'posted_at': start},
+        {'platform_post_id': "2", 'content': "Inflation inflation inflation", 'posted_at': start + timedelta(days=40)},
+        {'platform_post_id': "3", 'content': "We will cut the rate if needed", 'posted_at': start + timedelta(days=400)},
+    ]) + insert_posts(test_db, trump, [
+        {'platform_post_id': "4", 'content': "Tariffs on steel!", 'posted_at': start + timedelta(days=41)},
+    ])
+    ids = {post.platform_post_id: post.id for post in posts}
+    save_analyses(test_db, [(ids["4"], {'summary': "Trade policy raises inflation risk", 'tags': ["tariffs", "trade"]})])
+    test_db.commit()
+
+    def search(query, **filters):
+        results, truncated = search_posts(test_db, match_expression(query), **filters)
+        return [post.platform_post_id for post, rank in results]
+
+    # The post saying it most ranks first; analysis summaries count too, for less than content
+    assert search("inflation") == ["2", "1", "4"]
+    assert search('"rate cut"') == ["1"]
+    assert search("rate cut") == ["1", "3"]
+    assert search("infl*") == ["2", "1", "4"]
+    assert search("trade") == ["4"]
+    assert search("inflation", figure_id=powell.id) == ["2", "1"]
+    assert search("inflation", since=start + timedelta(days=1), until=start + timedelta(days=41)) == ["2"]
+    assert search("inflation", since=start + timedelta(days=41)) == ["4"]
+    assert search("rate", until=start + timedelta(days=1)) == ["1"]
+    assert search("inflation", limit=1, offset=1) == ["1"]
+    # Filter tokens aren't searchable
+    assert search(f"figure{powell.id}") == []
+    # Only the newest matches are ranked, and the caller is told when older ones were left out
+    assert search("inflation", window=2) == ["2", "4"]
+    assert search_posts(test_db, match_expression("inflation"), window=2)[1]
+    assert not search_posts(test_db, match_expression("inflation"), window=3)[1]
+    assert not search_posts(test_db, match_expression("inflation"), since=start + timedelta(days=1), window=2)[1]
+
+    # Edits, re-analysis and deletes reach the index
+    test_db.execute(text("UPDATE posts SET content = 'Steel tariffs' WHERE id = :id"), {'id': ids["2"]})
+    save_analyses(test_db, [(ids["4"], {'summary': "Trade war", 'tags': []})])
+    test_db.query(Post).filter(Post.id == ids["1"]).delete()
+    test_db.commit()
+    assert search("inflation") == []
+    assert search("steel") == ["2", "4"]
+
+@pytest.mark.asyncio
+async def test_search_endpoint_accepts_timezone_offsets(session_factory, async_session_factory):
+    """Z-suffixed and offset timestamps are compared in UTC with the stored naive UTC posted_at"""
+    import httpx
+    from src.database.connection import get_db_async
+    from src.main import app
+
+    db = session_factory()
+    figure = MonitoredFigure(name="Jerome Powell", title="Fed Chair", platform="twitter", platform_id="federalreserve")
+    db.add(figure)
+    db.commit()
+    insert_posts(db, figure, [
+        {'platform_post_id': "1", 'content': "Inflation is easing", 'posted_at': datetime(2025, 1, 1, 10)},
+        {'platform_post_id': "2", 'content': "Inflation is sticky", 'posted_at': datetime(2025, 1, 2, 10)},
+    ])
+    db.commit()
+    db.close()
+
+    async def get_db():
+        async with async_session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db_async] = get_db
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            async def search(**params):
+                response = await client.get("/api/posts/search", params={"q": "inflation", **params})
+                assert response.status_code == 200
+                return [result["content"] for result in response.json()["results"]]
+
+            assert await search(since="2025-01-02T00:00:00Z") == ["Inflation is sticky"]
+            assert not (await client.get("/api/posts/search", params={"q": "inflation"})).json()["truncated"]
+            assert await search(until="2025-01-02T00:00:00Z") == ["Inflation is easing"]
+            # 16:00 at +05:00 is 11:00 UTC, after the first post; 14:00 is 09:00 UTC, before the second
+            assert await search(since="2025-01-01T16:00:00+05:00", until="2025-01-02T14:00:00+05:00") == []
+            assert await search(since="2025-01-01T14:00:00+05:00", until="2025-01-02T16:00:00+05:00") == [
+                "Inflation is sticky", "Inflation is easing"
+            ]
+    finally:
+        app.dependency_overrides.pop(get_db_async)
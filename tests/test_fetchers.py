@@ -1,8 +1,13 @@
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
 import httpx
+import orjson
 from datetime import datetime
 from src.fetchers.twitter import TwitterFetcher
+from src.fetchers.browser_pool import BrowserPool
+from src.fetchers.normalizer import normalize_tweets, parse_twitter_date
+from src.fetchers.ratelimit import TokenBucket, CircuitBreaker, backoff_delay, parse_retry_after
 
 @pytest.fixture
 def mock_tweets_response():
@@ -25,7 +30,7 @@ async def test_twitter_fetcher_api(mock_tweets_response):
     with patch.object(httpx.AsyncClient, 'get') as mock_get:
         mock_get.return_value = MagicMock(
             status_code=200,
-            json=lambda: mock_tweets_response
+            content=orjson.dumps(mock_tweets_response)
         )
         
         fetcher = TwitterFetcher()
@@ -45,7 +50,7 @@ async def test_twitter_rate_limit_handling(mock_tweets_response):
             # Second call succeeds
             MagicMock(
                 status_code=200,
-                json=lambda: mock_tweets_response
+                content=orjson.dumps(mock_tweets_response)
             )
         ]
         
@@ -69,7 +74,158 @@ async def test_selenium_fallback():
             mock_driver.return_value.find_elements.return_value = [mock_element]
             
             fetcher = TwitterFetcher()
-            posts = await fetcher.fetch_posts("federalreserve", use_selenium=True)
+            try:
+                posts = await fetcher.fetch_posts("federalreserve", use_selenium=True)
+            finally:
+                await fetcher.close()
             
             assert len(posts) > 0
             assert "Test tweet content" in posts[0]['content']
+
+def make_tweet(tweet_id, text):
+    return {
+        "rest_id": tweet_id,
+        "legacy": {
+            "full_text": text,
+            "created_at": "Sat Jun 07 10:00:00 +0000 2025",
+            "favorite_count": 1
+        }
+    }
+
+@pytest.mark.asyncio
+async def test_fetch_pages_forward_from_cursor():
+    """Incremental fetches page forward until reaching the stored high-water mark"""
+    pages = [
+        {"tweets": [make_tweet("105", "e"), make_tweet("104", "d")], "next_cursor": "page2"},
+        {"tweets": [make_tweet("103", "c"), make_tweet("102", "b")], "next_cursor": "page3"},
+        {"tweets": [make_tweet("101", "a"), make_tweet("100", "old"), make_tweet("99", "older")], "next_cursor": "page4"}
+    ]
+    with patch.object(httpx.AsyncClient, 'get') as mock_get:
+        mock_get.side_effect = [MagicMock(status_code=200, content=orjson.dumps(page)) for page in pages]
+
+        fetcher = TwitterFetcher()
+        posts, complete = await fetcher.fetch_posts_since("federalreserve", "100")
+
+        assert [p['platform_post_id'] for p in posts] == ["105", "104", "103", "102", "101"]
+        assert complete
+        assert mock_get.call_count == 3
+        assert mock_get.call_args_list[1][1]['params']['cursor'] == "page2"
+        assert mock_get.call_args_list[0][1]['params']['since_id'] == "100"
+
+@pytest.mark.asyncio
+async def test_fetch_reports_paging_that_stops_short():
+    """A page failing before paging reaches the high-water mark marks the fetch incomplete"""
+    first = {"tweets": [make_tweet("105", "e"), make_tweet("104", "d")], "next_cursor": "page2"}
+    with patch.object(httpx.AsyncClient, 'get') as mock_get:
+        mock_get.side_effect = [
+            MagicMock(status_code=200, content=orjson.dumps(first)),
+            MagicMock(status_code=400, text="Bad request")
+        ]
+
+        fetcher = TwitterFetcher()
+        posts, complete = await fetcher.fetch_posts_since("federalreserve", "100")
+
+        assert [p['platform_post_id'] for p in posts] == ["105", "104"]
+        assert not complete
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_request_rate():
+    """Requests beyond the burst wait for tokens and the wait is reported"""
+    bucket = TokenBucket(rate=50.0, burst=2)
+    waits = [await bucket.acquire() for _ in range(4)]
+    
+    assert waits[:2] == [0, 0]
+    assert all(wait > 0 for wait in waits[2:])
+    assert bucket.stats()['waited'] == 2
+
+def test_circuit_breaker_opens_and_recovers():
+    """An endpoint is skipped after repeated failures and probed again after the cool-down"""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=lambda: now[0])
+    
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    
+    now[0] = 31
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_failure()
+    assert not breaker.allow()
+    
+    now[0] = 62
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_backoff_honors_retry_after():
+    """Backoff is jittered and never shorter than Retry-After"""
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert 0 <= backoff_delay(3, base=1.0, cap=5.0) <= 5.0
+    assert backoff_delay(0, base=1.0, cap=5.0, retry_after=7.0) >= 7.0
+
+@pytest.mark.asyncio
+async def test_browser_pool_reuses_and_recycles_sessions():
+    """Browser sessions are reused across fetches and recycled after N pages"""
+    drivers = []
+    
+    def factory():
+        drivers.append(MagicMock())
+        return drivers[-1]
+    
+    pool = BrowserPool(size=1, idle_timeout=60, max_pages=2, driver_factory=factory)
+    try:
+        for _ in range(3):
+            await pool.run(lambda driver: driver.get("https://twitter.com/federalreserve"))
+        
+        # Two pages on the first browser, then a fresh one
+        assert len(drivers) == 2
+        drivers[0].quit.assert_called_once()
+        assert pool.stats()['recycled'] == 1
+        assert pool.stats()['idle'] == 1
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_browser_pool_closes_idle_sessions():
+    """Sessions left idle are quit in the background, without waiting for another fetch"""
+    driver = MagicMock()
+    pool = BrowserPool(size=1, idle_timeout=0.05, max_pages=10, driver_factory=lambda: driver)
+    try:
+        await pool.run(lambda driver: driver.get("https://twitter.com/federalreserve"))
+        assert pool.stats()['idle'] == 1
+
+        await asyncio.sleep(0.2)
+        driver.quit.assert_called_once()
+        assert pool.stats()['idle'] == 0
+        assert pool.stats()['expired'] == 1
+    finally:
+        await pool.close()
+
+def test_normalizer_parses_dates_and_retweets():
+    """The fast date path matches strptime and retweets use the original tweet's text"""
+    value = "Sat Jun 07 10:00:00 +0000 2025"
+    assert parse_twitter_date(value) == datetime.strptime(value, '%a %b %d %H:%M:%S %z %Y')
+    assert parse_twitter_date("Sat Jun 07 10:00:00 -0500 2025").utcoffset().total_seconds() == -5 * 3600
+    assert parse_twitter_date("not a date") is None
+    
+    retweet = make_tweet("200", "RT @someone: original")
+    retweet["retweeted_status_result"] = {"result": make_tweet("150", "original text in full")}
+    posts = normalize_tweets({"tweets": [retweet, None, make_tweet("201", "")]})
+    
+    assert len(posts) == 1
+    assert posts[0]['platform_post_id'] == "200"
+    assert posts[0]['content'] == "original text in full"
+
+def test_normalizer_skips_tweets_without_a_valid_date():
+    """Tweets whose created_at is missing or unparseable are dropped, since posted_at can't be stored empty"""
+    bad_date = make_tweet("300", "Bad date")
+    bad_date["legacy"]["created_at"] = "not a date"
+    no_date = make_tweet("301", "No date")
+    del no_date["legacy"]["created_at"]
+    flattened = {"id": "302", "text": "Flattened, no date"}
+
+    posts = normalize_tweets({"tweets": [bad_date, no_date, flattened, make_tweet("303", "Dated")]})
+
+    assert [post['platform_post_id'] for post in posts] == ["303"]
+    assert posts[0]['posted_at'] is not None
@@ -0,0 +1,616 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from unittest.mock import AsyncMock
+from src.config import settings
+from src.database.models import MonitoredFigure, Post, PostAnalysis, Alert, FetchCursor, JobCheckpoint, Watchlist
+from src.fetchers.base import FetchError
+from src.pipeline.backfill import Progress, _parse_date, backfill_history, rescore
+from src.pipeline.ingest import IngestPipeline, snapshot_figure
+from src.pipeline.scheduler import PollScheduler
+from src.pipeline.seen import SeenPostFilter
+from src.pipeline.stage import Stage
+from src.pipeline.writer import WriteBatcher
+
+def make_figure(db):
+    figure = MonitoredFigure(
+        name="Jerome Powell",
+        title="Federal Reserve Chair",
+        platform="twitter",
+        platform_id="federalreserve",
+        category="financial"
+    )
+    db.add(figure)
+    db.commit()
+    db.refresh(figure)
+    return snapshot_figure(figure)
+
+def make_post_data(post_id, content):
+    return {
+        'platform_post_id': post_id,
+        'content': content,
+        'posted_at': datetime(2025, 6, 7, 12, 0, 0),
+        'metrics': {'likes': 0, 'retweets': 0, 'replies': 0}
+    }
+
+@pytest.mark.asyncio
+async def test_pipeline_stores_analyzes_and_alerts(session_factory, async_session_factory):
+    """Posts flow through every stage and high-impact posts raise alerts"""
+    db = session_factory()
+    figure = make_figure(db)
+
+    fetcher = AsyncMock()
+    fetcher.fetch_posts.return_value = [
+        make_post_data("1", "We are raising interest rates."),
+        make_post_data("2", "Happy holidays everyone.")
+    ]
+    fetcher.fetch_posts_since.return_value = (fetcher.fetch_posts.return_value, True)
+    analyzer = AsyncMock()
+    analyzer.score_post.side_effect = lambda post: {
+        'market_impact_score': 0.9 if "rates" in post.content else 0.1
+    }
+    analyzer.enrich_post.side_effect = lambda post, scored: {
+        **scored, 'sentiment': {'label': 'neutral', 'score': 0.5},
+        'summary': post.content, 'tags': [], 'context': ""
+    }
+    notifier = AsyncMock()
+    broadcasts = []
+
+    async def broadcast(update_type, data):
+        broadcasts.append((update_type, data))
+
+    pipeline = IngestPipeline(fetcher, analyzer, notifier, broadcast, session_factory=async_session_factory)
+    pipeline.start()
+    try:
+        await pipeline.submit(figure)
+        await pipeline.drain()
+
+        # A second poll returning the same posts must not store duplicates
+        await pipeline.submit(figure)
+        await pipeline.drain()
+    finally:
+        await pipeline.stop()
+
+    assert db.query(Post).count() == 2
+    # The second poll pages forward from the stored high-water mark
+    assert fetcher.fetch_posts_since.await_args.args == (figure.platform_id, '2')
+    assert db.get(FetchCursor, figure.id).last_post_id == "2"
+    alerts = db.query(Alert).all()
+    assert len(alerts) == 1
+    assert alerts[0].post.platform_post_id == "1"
+    notifier.send_notification.assert_awaited_once()
+    assert [t for t, _ in broadcasts].count('new_post') == 2
+    assert [t for t, _ in broadcasts].count('new_alert') == 1
+    assert [t for t, _ in broadcasts].count('post_enriched') == 2
+    # Full analyses are saved
+    assert db.query(PostAnalysis).count() == 2
+    assert {post.status for post in db.query(Post)} == {'enriched'}
+    # The stored batch, the low score, the high score with its alert and two analyses shared fewer commits
+    writer = pipeline.stats()['writer']
+    assert writer['rows'] == 5
+    assert writer['flushes'] < 5
+
+    stats = pipeline.stats()
+    assert stats['stages']['fetch']['processed'] == 2
+    assert stats['stages']['score']['processed'] == 2
+    assert stats['stages']['enrich']['processed'] == 2
+    assert stats['time_to_alert_seconds']['count'] == 1
+    assert all(stage['errors'] == 0 for stage in stats['stages'].values())
+    # The second poll's posts were recognised without a database lookup
+    assert stats['seen_filter']['hits'] == 2
+    db.close()
+
+@pytest.mark.asyncio
+async def test_incomplete_fetch_keeps_cursor(session_factory, async_session_factory):
+    """Posts from paging that stopped short of the cursor are stored, but the cursor isn't moved past the gap"""
+    db = session_factory()
+    figure = make_figure(db)
+    db.add(FetchCursor(figure_id=figure.id, last_post_id="2"))
+    db.commit()
+
+    fetcher = AsyncMock()
+    fetcher.fetch_posts_since.return_value = ([make_post_data("5", "Newest")], False)
+    analyzer = AsyncMock()
+    analyzer.score_post.return_value = {'market_impact_score': 0.1}
+    analyzer.enrich_post.side_effect = lambda post, scored: {
+        **scored, 'sentiment': {'label': 'neutral', 'score': 0.5}, 'summary': "", 'tags': [], 'context': ""
+    }
+    pipeline = IngestPipeline(fetcher, analyzer, AsyncMock(), AsyncMock(), session_factory=async_session_factory)
+    pipeline.start()
+    try:
+        await pipeline.submit(figure)
+        await pipeline.drain()
+        db.expire_all()
+        assert db.query(Post).count() == 1
+        assert db.get(FetchCursor, figure.id).last_post_id == "2"
+
+        # The next poll pages back to the old cursor and fills the gap
+        fetcher.fetch_posts_since.return_value = (
+            [make_post_data(post_id, f"Post {post_id}") for post_id in ("5", "4", "3")], True
+        )
+        await pipeline.submit(figure)
+        await pipeline.drain()
+    finally:
+        await pipeline.stop()
+
+    assert fetcher.fetch_posts_since.await_args.args == (figure.platform_id, '2')
+    db.expire_all()
+    assert db.query(Post).count() == 3
+    assert db.get(FetchCursor, figure.id).last_post_id == "5"
+    db.close()
+
+@pytest.mark.asyncio
+async def test_undated_post_does_not_sink_its_batch(session_factory, async_session_factory):
+    """A post without a posting date is skipped; the rest of its batch and the cursor are still stored"""
+    db = session_factory()
+    figure = make_figure(db)
+
+    undated = make_post_data("2", "No date on this one")
+    undated['posted_at'] = None
+    fetcher = AsyncMock()
+    fetcher.fetch_posts.return_value = [make_post_data("3", "Newest"), undated, make_post_data("1", "Oldest")]
+    analyzer = AsyncMock()
+    analyzer.score_post.return_value = {'market_impact_score': 0.1}
+    analyzer.enrich_post.side_effect = lambda post, scored: {
+        **scored, 'sentiment': {'label': 'neutral', 'score': 0.5}, 'summary': "", 'tags': [], 'context': ""
+    }
+    pipeline = IngestPipeline(fetcher, analyzer, AsyncMock(), AsyncMock(), session_factory=async_session_factory)
+    pipeline.start()
+    try:
+        await pipeline.submit(figure)
+        await pipeline.drain()
+    finally:
+        await pipeline.stop()
+
+    db.expire_all()
+    assert sorted(post.platform_post_id for post in db.query(Post)) == ["1", "3"]
+    assert db.get(FetchCursor, figure.id).last_post_id == "3"
+    db.close()
+
+@pytest.mark.asyncio
+async def test_write_batcher_group_commits_and_isolates_failures(session_factory, async_session_factory):
+    """Queued writes share one commit and resolve with their results; a failing write only fails itself"""
+    def add_watchlist(name):
+        def write(db):
+            watchlist = Watchlist(name=name)
+            db.add(watchlist)
+            db.flush()
+            return watchlist.id
+        return write
+
+    writer = WriteBatcher(async_session_factory, max_items=10, max_wait_ms=20)
+    ids = await asyncio.gather(*(writer.submit(add_watchlist(f"list {i}")) for i in range(3)))
+    assert ids == [1, 2, 3]
+    assert writer.stats()['flushes'] == 1
+
+    good = writer.submit(add_watchlist("list 3"))
+    bad = writer.submit(lambda db: db.execute(text("INSERT INTO missing_table VALUES (1)")))
+    writer.add(add_watchlist("list 4"))
+    assert await good == 4
+    with pytest.raises(OperationalError):
+        await bad
+    await writer.flush()
+
+    stats = writer.stats()
+    assert stats['retries'] == 1
+    assert stats['errors'] == 1
+    assert stats['rows'] == 5
+    db = session_factory()
+    assert db.query(Watchlist).count() == 5
+    db.close()
+
+    # A batch's rows for one bulk write go in a single call
+    calls = []
+    def add_watchlists(db, names):
+        calls.append(names)
+        db.add_all(Watchlist(name=name) for name in names)
+
+    for i in range(5, 8):
+        writer.add_row(add_watchlists, f"list {i}")
+    await writer.flush()
+    assert calls == [["list 5", "list 6", "list 7"]]
+    db = session_factory()
+    assert db.query(Watchlist).count() == 8
+    db.close()
+
+@pytest.mark.asyncio
+async def test_alert_does_not_wait_for_enrichment(session_factory, async_session_factory):
+    """The alert and new_post go out on the impact score alone; enrichment follows separately"""
+    db = session_factory()
+    figure = make_figure(db)
+
+    fetcher = AsyncMock()
+    fetcher.fetch_posts.return_value = [make_post_data("1", "We are raising interest rates.")]
+    enrichment_started = asyncio.Event()
+    release_enrichment = asyncio.Event()
+
+    async def enrich_post(post, scored):
+        enrichment_started.set()
+        await release_enrichment.wait()
+        return {**scored, 'sentiment': {'label': 'negative', 'score': 0.8},
+                'summary': "Rates up", 'tags': ['interest rate'], 'context': "Fed policy"}
+
+    analyzer = AsyncMock()
+    analyzer.score_post.return_value = {'market_impact_score': 0.9}
+    analyzer.enrich_post.side_effect = enrich_post
+    broadcasts = []
+
+    async def broadcast(update_type, data):
+        broadcasts.append((update_type, data))
+
+    pipeline = IngestPipeline(fetcher, analyzer, AsyncMock(), broadcast, session_factory=async_session_factory)
+    pipeline.start()
+    try:
+        await pipeline.submit(figure)
+        await asyncio.wait_for(enrichment_started.wait(), 1)
+
+        # Slow enrichment is still running, but the desk already has the alert
+        assert [t for t, _ in broadcasts] == ['new_alert', 'new_post']
+        assert pipeline.stats()['time_to_alert_seconds']['count'] == 1
+
+        release_enrichment.set()
+        await pipeline.drain()
+    finally:
+        await pipeline.stop()
+
+    update_type, data = broadcasts[-1]
+    assert update_type == 'post_enriched'
+    assert data['summary'] == "Rates up" and data['impact_score'] == 0.9
+    db.close()
+
+@pytest.mark.asyncio
+async def test_resume_finishes_only_unfinished_posts(session_factory, async_session_factory):
+    """On startup pending posts are scored and scored posts enriched; enriched posts are left alone"""
+    db = session_factory()
+    figure = make_figure(db)
+    for i, (status, score) in enumerate([('pending', None), ('scored', 0.8), ('enriched', 0.2)]):
+        db.add(Post(platform='twitter', platform_post_id=str(i), content=f"Post {i}", author_id=figure.id,
+                    posted_at=datetime(2025, 6, 7), impact_score=score, status=status))
+    db.commit()
+
+    analyzer = AsyncMock()
+    analyzer.score_post.return_value = {'market_impact_score': 0.1}
+    analyzer.enrich_post.side_effect = lambda post, scored: {
+        **scored, 'sentiment': {'label': 'neutral', 'score': 0.5},
+        'summary': post.content, 'tags': ['economy'], 'context': ""
+    }
+
+    async def broadcast(update_type, data):
+        pass
+
+    pipeline = IngestPipeline(AsyncMock(), analyzer, AsyncMock(), broadcast, session_factory=async_session_factory)
+    pipeline.start()
+    try:
+        assert await pipeline.resume() == 2
+        await pipeline.drain()
+    finally:
+        await pipeline.stop()
+
+    analyzer.score_post.assert_awaited_once()
+    assert analyzer.enrich_post.await_count == 2
+    # The scored post kept the score it was alerted on
+    scored_call = next(c for c in analyzer.enrich_post.await_args_list if c.args[0].platform_post_id == "1")
+    assert scored_call.args[1] == {'market_impact_score': 0.8}
+    db.expire_all()
+    assert {post.status for post in db.query(Post)} == {'enriched'}
+    analysis = db.query(PostAnalysis).join(Post).filter(Post.platform_post_id == "1").one()
+    assert analysis.tags == '["economy"]' and analysis.sentiment_label == 'neutral'
+    db.close()
+
+@pytest.mark.asyncio
+async def test_resume_alerts_on_post_whose_alert_write_failed(session_factory, async_session_factory, monkeypatch):
+    """A post whose alert never committed isn't left scored without an alert; resuming alerts on it"""
+    db = session_factory()
+    figure = make_figure(db)
+
+    fetcher = AsyncMock()
+    fetcher.fetch_posts.return_value = [make_post_data("1", "We are raising interest rates.")]
+    analyzer = AsyncMock()
+    analyzer.score_post.return_value = {'market_impact_score': 0.9}
+    analyzer.enrich_post.side_effect = lambda post, scored: {
+        **scored, 'sentiment': {'label': 'neutral', 'score': 0.5}, 'summary': "", 'tags': [], 'context': ""
+    }
+
+    def failing_store_alert(db, alert):
+        raise OperationalError("INSERT INTO alerts", {}, Exception("disk I/O error"))
+
+    monkeypatch.setattr("src.pipeline.ingest._store_alert", failing_store_alert)
+    pipeline = IngestPipeline(fetcher, analyzer, AsyncMock(), AsyncMock(), session_factory=async_session_factory)
+    pipeline.start()
+    try:
+        await pipeline.submit(figure)
+        await pipeline.drain()
+    finally:
+        await pipeline.stop()
+
+    db.expire_all()
+    post = db.query(Post).one()
+    assert post.status == 'pending' and post.impact_score is None
+    assert db.query(Alert).count() == 0
+
+    monkeypatch.undo()
+    pipeline = IngestPipeline(fetcher, analyzer, AsyncMock(), AsyncMock(), session_factory=async_session_factory)
+    pipeline.start()
+    try:
+        assert await pipeline.resume() == 1
+        await pipeline.drain()
+    finally:
+        await pipeline.stop()
+
+    db.expire_all()
+    assert db.query(Alert).one().post_id == post.id
+    assert db.get(Post, post.id).status == 'enriched'
+    db.close()
+
+@pytest.mark.asyncio
+async def test_rescore_is_checkpointed_and_resumable(session_factory):
+    """A re-score that dies part way picks up after the last committed batch"""
+    db = session_factory()
+    figure = make_figure(db)
+    for i in range(5):
+        db.add(Post(platform='twitter', platform_post_id=str(i), content=f"Post {i}", author_id=figure.id,
+                    posted_at=datetime(2025, 6, 7), impact_score=0.5, status='enriched'))
+    db.commit()
+
+    analyzed = []
+
+    async def reanalyze_post(post, use_cache=False):
+        if post.platform_post_id == "3" and len(analyzed) < 4:
+            raise RuntimeError("crash")
+        analyzed.append(post.platform_post_id)
+        return {'market_impact_score': 0.25, 'sentiment': {'label': 'neutral', 'score': 0.5},
+                'summary': "s", 'tags': [], 'context': "c"}
+
+    analyzer = AsyncMock()
+    analyzer.reanalyze_post.side_effect = reanalyze_post
+
+    with pytest.raises(RuntimeError):
+        await rescore(analyzer, "rescore:test", session_factory, batch_size=2, concurrency=2)
+    assert db.get(JobCheckpoint, "rescore:test").position == "2"
+
+    assert await rescore(analyzer, "rescore:test", session_factory, batch_size=2, concurrency=2) == 3
+    # Only the uncommitted batch was analyzed again
+    assert sorted(analyzed) == ["0", "1", "2", "2", "3", "4"]
+    db.expire_all()
+    assert {post.impact_score for post in db.query(Post)} == {0.25}
+    assert db.query(PostAnalysis).count() == 5
+    assert db.get(JobCheckpoint, "rescore:test").done
+    assert await rescore(analyzer, "rescore:test", session_factory) == 0
+    db.close()
+
+@pytest.mark.asyncio
+async def test_history_backfill_pages_back_to_since(session_factory):
+    """Backfill pages through the timeline until `since`, storing and analyzing only new posts"""
+    db = session_factory()
+    figure = make_figure(db)
+    db.add(Post(platform='twitter', platform_post_id="9", content="Stored already", author_id=figure.id,
+                posted_at=datetime(2025, 6, 9), status='enriched'))
+    db.commit()
+
+    def post_on(post_id, day):
+        return {**make_post_data(post_id, f"Post {post_id}"), 'posted_at': datetime(2025, 6, day)}
+
+    pages = {
+        None: ([post_on("10", 10), post_on("9", 9)], "c1"),
+        "c1": ([post_on("8", 8), post_on("7", 7)], "c2"),
+        "c2": ([post_on("6", 6), post_on("5", 5)], "c3")
+    }
+    fetcher = AsyncMock()
+    fetcher.fetch_history_page.side_effect = lambda handle, cursor=None: pages[cursor]
+    analyzer = AsyncMock()
+    analyzer.reanalyze_post.side_effect = lambda post, use_cache=False: {
+        'market_impact_score': 0.3, 'sentiment': {'label': 'neutral', 'score': 0.5},
+        'summary': post.content, 'tags': [], 'context': ""
+    }
+
+    stored = await backfill_history(fetcher, analyzer, "history:test", session_factory, since=datetime(2025, 6, 6))
+
+    assert stored == 4
+    assert fetcher.fetch_history_page.await_count == 3
+    assert analyzer.reanalyze_post.await_count == 4
+    assert sorted(p.platform_post_id for p in db.query(Post).filter(Post.status == 'enriched')) == ["10", "6", "7", "8", "9"]
+    checkpoint = db.get(JobCheckpoint, f"history:test:{figure.id}")
+    assert checkpoint.done and checkpoint.processed == 4
+
+    # Finished figures are skipped when the job is run again
+    assert await backfill_history(fetcher, analyzer, "history:test", session_factory) == 0
+    db.close()
+
+@pytest.mark.asyncio
+async def test_history_backfill_resumes_after_fetch_failure(session_factory):
+    """A page that fails to fetch leaves the checkpoint open, and the next run resumes from it"""
+    db = session_factory()
+    figure = make_figure(db)
+    pages = {
+        None: ([make_post_data("4", "Post 4"), make_post_data("3", "Post 3")], "c1"),
+        "c1": ([make_post_data("2", "Post 2"), make_post_data("1", "Post 1")], None)
+    }
+    failing = {"c1"}
+
+    async def fetch_history_page(handle, cursor=None):
+        if cursor in failing:
+            raise FetchError("Could not fetch tweets")
+        return pages[cursor]
+
+    fetcher = AsyncMock()
+    fetcher.fetch_history_page.side_effect = fetch_history_page
+    analyzer = AsyncMock()
+    analyzer.reanalyze_post.side_effect = lambda post, use_cache=False: {
+        'market_impact_score': 0.3, 'sentiment': {'label': 'neutral', 'score': 0.5},
+        'summary': post.content, 'tags': [], 'context': ""
+    }
+
+    assert await backfill_history(fetcher, analyzer, "history:test", session_factory) == 2
+    checkpoint = db.get(JobCheckpoint, f"history:test:{figure.id}")
+    assert not checkpoint.done and checkpoint.position == "c1"
+
+    failing.clear()
+    fetcher.fetch_history_page.reset_mock()
+    assert await backfill_history(fetcher, analyzer, "history:test", session_factory) == 2
+    assert fetcher.fetch_history_page.await_args_list[0].kwargs == {'cursor': "c1"}
+    db.expire_all()
+    assert db.get(JobCheckpoint, f"history:test:{figure.id}").done
+    assert db.query(Post).count() == 4
+    db.close()
+
+@pytest.mark.asyncio
+async def test_history_backfill_skips_undated_posts_and_accepts_offset_since(session_factory):
+    """An offset --since is compared in UTC, and posts without a date are skipped without ending the job"""
+    db = session_factory()
+    figure = make_figure(db)
+
+    def post_on(post_id, day):
+        return {**make_post_data(post_id, f"Post {post_id}"), 'posted_at': datetime(2025, 6, day, tzinfo=timezone.utc)}
+
+    undated = {**make_post_data("undated", "No date"), 'posted_at': None}
+    pages = {
+        None: ([post_on("8", 8), undated], "c1"),
+        "c1": ([undated], "c2"),
+        "c2": ([post_on("7", 7), post_on("5", 5)], "c3")
+    }
+    fetcher = AsyncMock()
+    fetcher.fetch_history_page.side_effect = lambda handle, cursor=None: pages[cursor]
+    analyzer = AsyncMock()
+    analyzer.reanalyze_post.side_effect = lambda post, use_cache=False: {
+        'market_impact_score': 0.3, 'sentiment': {'label': 'neutral', 'score': 0.5},
+        'summary': post.content, 'tags': [], 'context': ""
+    }
+
+    since = _parse_date("2025-06-06T02:00:00+02:00")
+    assert since == datetime(2025, 6, 6)
+    assert await backfill_history(fetcher, analyzer, "history:test", session_factory, since=since) == 2
+
+    assert fetcher.fetch_history_page.await_count == 3
+    assert sorted(post.platform_post_id for post in db.query(Post)) == ["7", "8"]
+    assert db.get(JobCheckpoint, f"history:test:{figure.id}").done
+    db.close()
+
+def test_progress_reports_rate_and_eta(capsys):
+    now = [0.0]
+    progress = Progress("job", total=100, clock=lambda: now[0], interval=0)
+    now[0] = 10.0
+    progress.advance(25)
+    assert progress.eta_seconds() == 30.0
+    assert "25/100 (25.0%), 2.5/s, ETA 30s" in capsys.readouterr().out
+
+@pytest.mark.asyncio
+async def test_stage_backpressure():
+    """A full downstream queue holds upstream workers instead of dropping items"""
+    release = asyncio.Event()
+
+    async def slow(item):
+        await release.wait()
+
+    async def passthrough(item):
+        return [item]
+
+    upstream = Stage('upstream', passthrough, workers=1, queue_size=10)
+    downstream = Stage('downstream', slow, workers=1, queue_size=1)
+    upstream.next_stage = downstream
+    upstream.start()
+    downstream.start()
+    try:
+        for i in range(5):
+            await upstream.put(i)
+        await asyncio.sleep(0.05)
+
+        # One item in the slow worker, one queued, one held by the upstream worker
+        assert downstream.stats()['queue_depth'] == 1
+        assert upstream.stats()['queue_depth'] == 2
+
+        release.set()
+        await upstream.queue.join()
+        await downstream.queue.join()
+        assert downstream.stats()['processed'] == 5
+    finally:
+        await upstream.stop()
+        await downstream.stop()
+
+@pytest.mark.asyncio
+async def test_stage_trims_throughput_window_without_stats():
+    """Completion times older than the throughput window are dropped as items finish"""
+    async def passthrough(item):
+        return [item]
+
+    stage = Stage('trim', passthrough, workers=1, queue_size=10)
+    stage._completed_at.extend([-1000.0, -999.0, -998.0])
+    stage.start()
+    try:
+        await stage.put(1)
+        await stage.queue.join()
+        assert len(stage._completed_at) == 1
+    finally:
+        await stage.stop()
+
+def test_scheduler_adapts_to_posting_rate():
+    """Busy and high-priority figures are polled more often than quiet ones"""
+    now = [0.0]
+    scheduler = PollScheduler(clock=lambda: now[0])
+    busy = MonitoredFigure(id=1, name="Busy", platform="twitter", platform_id="busy", category="industry_leader")
+    quiet = MonitoredFigure(id=2, name="Quiet", platform="twitter", platform_id="quiet", category="industry_leader")
+    political = MonitoredFigure(id=3, name="Political", platform="twitter", platform_id="pol", category="political")
+    scheduler.sync([busy, quiet, political])
+
+    # Everyone is due on the first tick, highest priority first
+    due = scheduler.due()
+    assert [f.id for f in due][0] == 3
+    assert scheduler.due() == []
+
+    for _ in range(5):
+        scheduler.record(busy.id, [datetime.utcnow()] * 4)
+        scheduler.record(quiet.id, [])
+        scheduler.record(political.id, [])
+        now[0] += 600
+
+    intervals = {s.figure.id: s.interval for s in scheduler.schedules.values()}
+    assert intervals[1] < intervals[2]
+    assert intervals[3] < intervals[2]
+    assert scheduler.stats()['median_detection_latency_seconds'] is not None
+
+def test_scheduler_holds_figures_with_a_poll_in_flight():
+    """A figure isn't handed out again while its last poll is still running, however long that takes"""
+    now = [0.0]
+    scheduler = PollScheduler(clock=lambda: now[0])
+    figure = MonitoredFigure(id=1, name="Slow", platform="twitter", platform_id="slow")
+    scheduler.sync([figure])
+    assert scheduler.due() == [figure]
+
+    # The fetch is still backing off well past the figure's interval
+    now[0] += settings.POLL_INTERVAL_SECONDS * 2
+    assert scheduler.due() == []
+
+    scheduler.record(figure.id, [])
+    now[0] += settings.POLL_MAX_INTERVAL_SECONDS
+    assert scheduler.due() == [figure]
+
+    # A result that never arrives stops holding the figure back eventually
+    now[0] += settings.POLL_MAX_INTERVAL_SECONDS
+    assert scheduler.due() == [figure]
+
+def test_seen_filter_is_bounded(session_factory):
+    """The seen-post filter warms from stored posts and evicts beyond its cap"""
+    db = session_factory()
+    figure = make_figure(db)
+    for i in range(5):
+        db.add(Post(
+            platform_post_id=str(i),
+            content=f"Post {i}",
+            author_id=figure.id,
+            posted_at=datetime(2025, 6, i + 1)
+        ))
+    db.commit()
+
+    seen = SeenPostFilter(max_ids=3)
+    seen.warm(db)
+    assert len(seen) == 3
+    assert seen.contains(figure.id, "4")
+    assert not seen.contains(figure.id, "0")
+
+    seen.add(figure.id, ["5", "6"])
+    assert len(seen) == 3
+    assert seen.contains(figure.id, "4")
+    assert seen.stats()['hits'] == 2
+    assert seen.stats()['misses'] == 1
+    db.close()